@@ -0,0 +1,348 @@
+"""Ingest and rendering benchmarks.
+
+    python -m benchmarks.bench                 # run everything, compare with the baseline
+    python -m benchmarks.bench --save          # run and record a new baseline
+    python -m benchmarks.bench --only parser   # just the serial parsing path
+
+Run from the UI directory. The parser benchmarks push synthetic byte streams
+(text lines, binary frames, photo bursts, corrupted input) through
+SerialReader.process() in serial-read-sized chunks, without a port. The
+dashboard benchmarks build OceanDashboard offscreen and time _ingest,
+_render and the cube for several MAX_POINTS sizes.
+
+Results are written as JSON. With a baseline (benchmarks/baseline.json by
+default) any metric that got worse by more than --tolerance is reported and
+the exit status is 1. Baselines only mean something on the machine that
+recorded them.
+"""
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import config
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# Metrics checked against the baseline; max_us is reported but too noisy to gate on
+HIGHER_IS_BETTER = ("MBps", "frames_per_s", "fps")
+LOWER_IS_BETTER = ("p50_us", "p99_us")
+
+
+# ----------------------------------------------------------------------
+# Synthetic streams
+def _samples(n, rng):
+    from utils.telemetry_queue import CHANNELS
+    t = np.arange(n) * 0.01
+    values = {c: rng.normal(0.0, 1.0, n) for c in CHANNELS}
+    values["Temperature_C"] += 4.0
+    values["TDS_ppm"] = 200.0 + 5.0 * values["TDS_ppm"]
+    values["AccelZ"] += 0.09 + 0.1 * np.sin(t)
+    return values
+
+
+def text_stream(n, rng):
+    """`n` samples formatted exactly like the sketch's Key:value lines."""
+    v = _samples(n, rng)
+    keys = ["Temperature_C", "TDS_ppm", "Flex Voltage", "AccelX", "AccelY", "AccelZ",
+            "GyroX", "GyroY", "GyroZ"]
+    lines = []
+    for i in range(n):
+        lines.append(f"Temperature_C:{v['Temperature_C'][i]:.2f}\r\nTDS_ADC:402\r\nVoltage:0.32\r\n")
+        lines.extend(f"{k}:{v[k][i]:.2f}\r\n" for k in keys[1:])
+    return "".join(lines).encode()
+
+
+def binary_stream(n, rng):
+    from utils.protocol import SYNC, FRAME_TELEMETRY, TELEMETRY_FRAME_DTYPE, TELEMETRY_FRAME_SIZE, OVERHEAD, crc16
+    v = _samples(n, rng)
+    frames = np.zeros(n, dtype=TELEMETRY_FRAME_DTYPE)
+    frames["sync"] = int.from_bytes(SYNC, "little")
+    frames["type"] = FRAME_TELEMETRY
+    frames["len"] = TELEMETRY_FRAME_SIZE - OVERHEAD
+    frames["seq"] = np.arange(n) & 0xFFFF
+    frames["payload"]["millis"] = np.arange(n) * 10
+    for k, col in v.items():
+        frames["payload"][k] = col
+    raw = frames.view(np.uint8).reshape(n, TELEMETRY_FRAME_SIZE)
+    frames["crc"] = [crc16(row[2:-2].tobytes()) for row in raw]
+    return frames.tobytes()
+
+
+def _photo_bytes(rng):
+    photos = sorted(glob.glob(os.path.join(config.PHOTO_DIR, "*.jpg")))
+    if photos:
+        with open(photos[0], "rb") as f:
+            return f.read()
+    return rng.integers(0, 256, 16000, dtype=np.uint8).tobytes()
+
+
+def text_photo_stream(n, rng, every=500):
+    """Text telemetry with a raw PHOTO_START/PHOTO_END burst every `every` samples."""
+    photo = b"PHOTO_START\r\n" + _photo_bytes(rng) + b"\nPHOTO_END\r\n"
+    block = text_stream(every, rng)
+    return (block + photo) * (n // every)
+
+
+def binary_photo_stream(n, rng, every=500, chunk_size=200):
+    """Binary telemetry with a chunked photo interleaved, one chunk per frame, every `every` samples."""
+    from utils.protocol import encode_photo, TELEMETRY_FRAME_SIZE
+    telemetry = bytearray(binary_stream(n, rng))
+    photo = _photo_bytes(rng)
+    out = bytearray()
+    seq = n
+    for start in range(0, n, every):
+        chunks, seq = encode_photo(seq, start // every, photo, chunk_size)
+        for i in range(every):
+            k = start + i
+            if k >= n:
+                break
+            out += telemetry[k * TELEMETRY_FRAME_SIZE:(k + 1) * TELEMETRY_FRAME_SIZE]
+            if i < len(chunks):
+                out += chunks[i]
+    return _renumber(out)
+
+
+def _renumber(stream):
+    """Rewrite sequence numbers (and CRCs) so interleaved frames count up without gaps."""
+    from utils.protocol import HEADER, CRC, OVERHEAD, crc16
+    out = bytearray(stream)
+    pos, seq = 0, 0
+    while pos + HEADER.size <= len(out):
+        _, frame_type, length, _ = HEADER.unpack_from(out, pos)
+        end = pos + length + OVERHEAD
+        HEADER.pack_into(out, pos, out[pos:pos + 2], frame_type, length, seq & 0xFFFF)
+        CRC.pack_into(out, end - CRC.size, crc16(bytes(out[pos + 2:end - CRC.size])))
+        pos, seq = end, seq + 1
+    return bytes(out)
+
+
+def corrupt(stream, rate, rng):
+    """Flip one random bit in roughly `rate` of the bytes."""
+    data = np.frombuffer(stream, dtype=np.uint8).copy()
+    hit = np.flatnonzero(rng.random(len(data)) < rate)
+    data[hit] ^= (1 << rng.integers(0, 8, len(hit))).astype(np.uint8)
+    return data.tobytes()
+
+
+# ----------------------------------------------------------------------
+def _percentiles(ns):
+    ns = np.asarray(ns, dtype=np.float64) / 1000.0
+    return {"p50_us": float(np.percentile(ns, 50)), "p99_us": float(np.percentile(ns, 99)),
+            "max_us": float(ns.max())}
+
+
+def bench_parser(name, stream, chunk, binary):
+    """Feed `stream` to a portless SerialReader in `chunk`-byte reads."""
+    import utils.serial_reader as sr
+    from utils.bus import Bus, TOPIC_TELEMETRY
+    from utils.telemetry_queue import TelemetryRing
+
+    bus = Bus()
+    ring = bus.subscribe(TOPIC_TELEMETRY, TelemetryRing(capacity=1 << 20))
+    reader = sr.SerialReader(bus, port=None)      # unopened port: nothing is read or written
+    reader.send_command = lambda command: None
+    tmp = tempfile.mkdtemp(prefix="jellybot-bench-")
+    reader.photos.out_dir = tmp
+    if binary:
+        reader.parser.feed(b"BIN_OK\r\n")
+
+    times = []
+    view = memoryview(stream)
+    with contextlib.redirect_stdout(io.StringIO()):
+        t0 = time.perf_counter()
+        for pos in range(0, len(stream), chunk):
+            a = time.perf_counter_ns()
+            reader.process(bytes(view[pos:pos + chunk]))
+            times.append(time.perf_counter_ns() - a)
+        elapsed = time.perf_counter() - t0
+    shutil.rmtree(tmp, ignore_errors=True)
+
+    stats = ring.stats()
+    result = {
+        "bytes": len(stream),
+        "frames": stats["received"],
+        "MBps": len(stream) / elapsed / 1e6,
+        "frames_per_s": stats["received"] / elapsed,
+        **_percentiles(times),
+        "drops": reader.link_stats()["dropped"],
+    }
+    print(f"  {name:<22} {result['MBps']:8.2f} MB/s {result['frames_per_s']:11.0f} frames/s "
+          f"p50 {result['p50_us']:7.1f} us  p99 {result['p99_us']:7.1f} us")
+    return result
+
+
+def run_parser(n, chunk, seed):
+    rng = np.random.default_rng(seed)
+    print(f"Parser ({n} samples, {chunk}-byte reads)")
+    binary = binary_stream(n, rng)
+    return {
+        "parser.text": bench_parser("text", text_stream(n, rng), chunk, False),
+        "parser.binary": bench_parser("binary", binary, chunk, True),
+        "parser.text_photos": bench_parser("text + photos", text_photo_stream(n, rng), chunk, False),
+        "parser.binary_photos": bench_parser("binary + photos", binary_photo_stream(n, rng), chunk, True),
+        "parser.text_corrupt": bench_parser("text, corrupted", corrupt(text_stream(n, rng), 1e-3, rng), chunk, False),
+        "parser.binary_corrupt": bench_parser("binary, corrupted", corrupt(binary, 1e-3, rng), chunk, True),
+    }
+
+
+# ----------------------------------------------------------------------
+def _time_calls(fn, repeats):
+    times = []
+    for _ in range(repeats):
+        a = time.perf_counter_ns()
+        fn()
+        times.append(time.perf_counter_ns() - a)
+    return times
+
+
+def run_dashboard(max_points_list, batch, repeats, seed):
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication(sys.argv)
+    import widgets.dashboard as dash
+    from utils.data import RobotLink
+    from utils.synthetic import SyntheticReader
+    from utils.recorder import MissionRecorder
+    from utils.telemetry_queue import CHANNELS
+    rng = np.random.default_rng(seed)
+    results = {}
+
+    print(f"Dashboard ({batch} frames per ingest, {repeats} repeats)")
+    link = RobotLink("Bench", make_reader=SyntheticReader)   # never started: only the frames pushed below arrive
+    telemetry = link.telemetry
+    w = dash.OceanDashboard([link])
+    w.show()
+    w.ingest_timer.stop()
+    w.render_timer.stop()
+    tmp = tempfile.mkdtemp(prefix="jellybot-bench-")
+    w.robot.recorder = MissionRecorder(root=tmp)
+    w.robot.recorder.start()
+    dash.running = True
+
+    def ingest():
+        values = rng.normal(0.0, 1.0, (batch, len(CHANNELS)))
+        now = time.monotonic()
+        for row in values:
+            telemetry.push(row, now)
+        w._ingest()
+
+    def render():
+        w._dirty = True
+        w._render()
+        app.processEvents()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        for max_points in max_points_list:
+            dash.MAX_POINTS = max_points
+            w._init_buffers()
+            w.robot.init_buffers()
+            dash.sample_count = 0
+            while dash.sample_count < max_points:   # start with a full plot window
+                ingest()
+            r_ingest, r_render = _percentiles(_time_calls(ingest, repeats)), _percentiles(_time_calls(render, repeats))
+            r_render["fps"] = 1e6 / r_render["p50_us"]
+            results[f"dashboard.ingest[{max_points}]"] = r_ingest
+            results[f"dashboard.render[{max_points}]"] = r_render
+            print(f"  MAX_POINTS={max_points:<7} ingest p50 {r_ingest['p50_us']:8.0f} us p99 {r_ingest['p99_us']:8.0f} us"
+                  f" | render p50 {r_render['p50_us']:8.0f} us p99 {r_render['p99_us']:8.0f} us", file=sys.__stdout__)
+
+        cube = w.cube
+        angles = rng.normal(0.0, 30.0, (repeats, 3))
+        it = iter(angles)
+        r_update = _percentiles(_time_calls(lambda: cube.update_orientation(*next(it)), repeats))
+        r_paint = _percentiles(_time_calls(cube.grab, repeats))
+        r_paint["fps"] = 1e6 / r_paint["p50_us"]
+        results["cube.update_orientation"] = r_update
+        results["cube.paint"] = r_paint
+        print(f"  cube update_orientation p50 {r_update['p50_us']:.0f} us | paint p50 {r_paint['p50_us']:.0f} us",
+              file=sys.__stdout__)
+
+        w.close()
+    shutil.rmtree(tmp, ignore_errors=True)
+    return results
+
+
+# ----------------------------------------------------------------------
+def compare(results, baseline, tolerance):
+    """List of (name, metric, old, new) for metrics that regressed by more than `tolerance`."""
+    regressions = []
+    for name, metrics in results.items():
+        old = baseline.get("results", {}).get(name)
+        if not old:
+            continue
+        for metric, new in metrics.items():
+            if metric not in old or not old[metric]:
+                continue
+            if metric in HIGHER_IS_BETTER:
+                worse = new < old[metric] * (1 - tolerance)
+            elif metric in LOWER_IS_BETTER:
+                worse = new > old[metric] * (1 + tolerance)
+            else:
+                continue
+            if worse:
+                regressions.append((name, metric, old[metric], new))
+    return regressions
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="JellyBot ingest/render benchmarks")
+    ap.add_argument("--only", choices=["parser", "dashboard"])
+    ap.add_argument("--samples", type=int, default=20000, help="samples per parser stream")
+    ap.add_argument("--chunk", type=int, default=512, help="bytes per simulated serial read")
+    ap.add_argument("--max-points", type=int, nargs="+", default=[2000, 20000, 100000])
+    ap.add_argument("--batch", type=int, default=10, help="frames per _ingest call")
+    ap.add_argument("--repeats", type=int, default=200)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--baseline", default=BASELINE)
+    ap.add_argument("--save", action="store_true", help="write the results as the new baseline")
+    ap.add_argument("--out", help="also write the results to this JSON file")
+    ap.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slowdown")
+    args = ap.parse_args(argv)
+
+    results = {}
+    if args.only in (None, "parser"):
+        results.update(run_parser(args.samples, args.chunk, args.seed))
+    if args.only in (None, "dashboard"):
+        results.update(run_dashboard(args.max_points, args.batch, args.repeats, args.seed))
+
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "machine": {"python": platform.python_version(), "platform": platform.platform(),
+                    "processor": platform.processor(), "numpy": np.__version__},
+        "params": vars(args),
+        "results": results,
+    }
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+
+    status = 0
+    if args.save:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for name, metric, old, new in regressions:
+            print(f"REGRESSION {name} {metric}: {old:.2f} -> {new:.2f}")
+        if regressions:
+            status = 1
+        else:
+            print(f"No regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,5 @@
 from PyQt5.QtGui import QFont, QColor
+from settings import *   # everything that does not need Qt
 
 # Colors
 COLOR_BG        = QColor(7, 25, 43)      
@@ -42,10 +43,3 @@ GRAPH_Y_LIMITS = {
     "Accel": (-5, 5),             # -2g to 2g
     "Gyro": (-200, 200),          # -200°/s to 200°/s
 }
-
-USE_MOCK_DATA = False
-
-# If not using mock, configure serial connection
-SERIAL_PORT = "COM3" 
-SERIAL_BAUDRATE = 115200
-
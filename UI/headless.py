@@ -0,0 +1,168 @@
+"""Headless ground station: record and score a dive with no GUI.
+
+Runs the serial link, attitude fusion, the mission recorder and the
+interest detector in one small process that never imports PyQt5,
+pyqtgraph or matplotlib, for long unattended deployments. Interest events
+and robot replies are logged to stdout and to events.jsonl in the mission
+directory; photos are saved in its photos/ folder.
+
+    python headless.py --port /dev/ttyUSB0 --baud 115200 --out missions
+
+SIGTERM or Ctrl+C flushes the recording and exits cleanly.
+"""
+import argparse
+import json
+import os
+import signal
+import sys
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+import serial
+from settings import (SERIAL_PORT, SERIAL_BAUDRATE, RECORD_DIR, DETECTOR_BACKEND, INGEST_INTERVAL_MS,
+                      HEADLESS_EVENT_THRESHOLD, HEADLESS_STATUS_S)
+from utils.bus import TOPIC_TELEMETRY, TOPIC_PHOTO, TOPIC_ACK, TOPIC_LINK, COALESCE, Bus
+from utils.life_detector import DETECTORS, make_detector, features
+from utils.orientation import OrientationFilter
+from utils.profiler import profiler
+from utils.recorder import MissionRecorder, record_frames
+from utils.serial_reader import open_reader
+from utils.telemetry_queue import TelemetryRing
+
+
+class HeadlessStation:
+    """Consumes one robot's bus: fuses attitude, records, scores and logs events."""
+
+    def __init__(self, bus, out_dir=RECORD_DIR, backend=None, threshold=HEADLESS_EVENT_THRESHOLD):
+        self.telemetry = bus.subscribe(TOPIC_TELEMETRY, TelemetryRing())
+        self.photo_sub = bus.subscribe(TOPIC_PHOTO, maxsize=8, name="headless")
+        self.ack_sub = bus.subscribe(TOPIC_ACK, maxsize=32, name="headless")
+        self.link_sub = bus.subscribe(TOPIC_LINK, maxsize=1, policy=COALESCE, name="headless")
+        self.orientation = OrientationFilter()
+        self.detector = make_detector(backend)
+        self.threshold = threshold
+        self.recorder = MissionRecorder(out_dir)
+        self.recorder.start()
+        self.events = open(os.path.join(self.recorder.path, "events.jsonl"), "a", buffering=1)
+        self.frames = 0
+        self.photos = 0
+        self.score = 0.0
+        self.event_count = 0
+        self.link = {}
+        self._ring_overflows = 0
+        print(f"[Headless] Recording to {self.recorder.path}")
+
+    def step(self):
+        for photo in self.photo_sub.drain():
+            self._save_photo(photo)
+        for text in self.ack_sub.drain():
+            self._log_event("reply", text=text)
+        for stats in self.link_sub.drain():
+            if stats["dropped"] > self.link.get("dropped", 0):
+                print(f"[Headless] Link dropped {stats['dropped'] - self.link.get('dropped', 0)} frames")
+            self.link = stats
+
+        frames = self.telemetry.drain()
+        if len(frames) == 0:
+            return
+        overflows = self.telemetry.overflows
+        if overflows != self._ring_overflows:
+            print(f"[Headless] Telemetry ring overflow: {overflows - self._ring_overflows} frames lost")
+            self._ring_overflows = overflows
+
+        with profiler.stage("headless.orientation"):
+            quats = self.orientation.update_batch(
+                np.column_stack([frames['AccelX'], frames['AccelY'], frames['AccelZ']]),
+                np.column_stack([frames['GyroX'], frames['GyroY'], frames['GyroZ']]),
+                frames['t'],
+            )
+        self.recorder.write(record_frames(frames, quats))
+
+        with profiler.stage("detector.score"):
+            scores = self.detector.process(features(frames))
+
+        # One event per excursion above the threshold, at its first frame
+        above = scores >= self.threshold
+        rising = above & ~np.r_[self.score >= self.threshold, above[:-1]]
+        for i in np.flatnonzero(rising):
+            self._log_event("interest", row=self.frames + int(i), millis=int(frames['millis'][i]),
+                            score=round(float(scores[i]), 3))
+        self.frames += len(frames)
+        self.score = float(scores[-1])
+
+    def status(self):
+        return (f"{self.frames} frames, score {self.score:.2f}, {self.event_count} events, "
+                f"{self.photos} photos, link dropped {self.link.get('dropped', 0)}")
+
+    def close(self):
+        self.step()
+        self.recorder.close()
+        self.events.close()
+
+    def _log_event(self, kind, **fields):
+        event = {"kind": kind, "time": datetime.now().isoformat(timespec="milliseconds"), **fields}
+        if kind == "interest":
+            self.event_count += 1
+        print(f"[Headless] {kind}: {fields}")
+        self.events.write(json.dumps(event) + "\n")
+
+    def _save_photo(self, photo):
+        folder = os.path.join(self.recorder.path, "photos")
+        os.makedirs(folder, exist_ok=True)
+        self.photos += 1
+        path = os.path.join(folder, f"photo_{self.photos}.jpg")
+        try:
+            if isinstance(photo, str):
+                os.replace(photo, path)   # chunked transfer: already on disk
+            else:
+                with open(path, "wb") as f:
+                    f.write(photo)
+        except OSError as e:
+            print("[Headless] Error saving photo:", e)
+            return
+        self._log_event("photo", path=path, row=self.frames)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Record and score a JellyBot dive without the GUI.")
+    parser.add_argument("--port", default=SERIAL_PORT, help=f"serial port (default {SERIAL_PORT})")
+    parser.add_argument("--baud", type=int, default=SERIAL_BAUDRATE, help=f"baud rate (default {SERIAL_BAUDRATE})")
+    parser.add_argument("--out", default=RECORD_DIR, help=f"directory for mission recordings (default {RECORD_DIR})")
+    parser.add_argument("--detector", choices=sorted(DETECTORS), default=DETECTOR_BACKEND,
+                        help="interest detector; zscore is the lightest")
+    parser.add_argument("--threshold", type=float, default=HEADLESS_EVENT_THRESHOLD,
+                        help="interest score that logs an event")
+    args = parser.parse_args(argv)
+
+    bus = Bus()
+    try:
+        reader = open_reader(bus, args.port, args.baud)
+    except serial.SerialException as e:
+        print(f"[Headless] Cannot open {args.port}: {e}")
+        return 1
+    station = HeadlessStation(bus, args.out, args.detector, args.threshold)
+
+    stop = threading.Event()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, lambda signum, frame: stop.set())
+
+    reader.start()
+    next_status = time.monotonic() + HEADLESS_STATUS_S
+    while not stop.wait(INGEST_INTERVAL_MS / 1000):
+        station.step()
+        if time.monotonic() >= next_status:
+            next_status += HEADLESS_STATUS_S
+            print(f"[Headless] {station.status()}")
+
+    print("[Headless] Stopping")
+    reader.stop()
+    reader.join(timeout=2.0)
+    station.close()
+    print(f"[Headless] {station.status()}; saved {station.recorder.path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,17 +1,17 @@
 import sys
 from PyQt5.QtWidgets import QApplication
 from widgets.dashboard import OceanDashboard
-from config import USE_MOCK_DATA
-
-if not USE_MOCK_DATA:
-    from utils.data import reader
+from utils.data import make_links
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     app.setStyle('Fusion')
-    win = OceanDashboard()
+    links = make_links()
+    win = OceanDashboard(links)
     win.showMaximized()
+    for link in links:
+        link.start()
     exit_code = app.exec_()
-    if not USE_MOCK_DATA:
-        reader.stop()
+    for link in links:
+        link.stop()
     sys.exit(exit_code)
@@ -0,0 +1,86 @@
+# Settings that need no Qt: the link, detector, recorder and profiler.
+# config.py re-exports all of them for the GUI; headless.py imports only this file.
+
+USE_MOCK_DATA = False
+MOCK_RATE_HZ = 100.0       # synthetic IMU frames per second (1000+ to load-test the pipeline)
+MOCK_ENV_RATE_HZ = 1.0     # synthetic temperature/TDS/flex readings per second
+MOCK_SCENARIO = "dive"     # scripted events, see utils.synthetic.SCENARIOS
+MOCK_SEED = 0              # same seed, same frames; None for a different run every time
+
+# If not using mock, configure serial connection
+SERIAL_PORT = "COM3" 
+SERIAL_PORTS = {}        # several robots at once, e.g. {"Jelly 1": "COM3", "Jelly 2": "COM4"}; overrides SERIAL_PORT
+SERIAL_BAUDRATE = 115200
+SERIAL_BINARY = True     # negotiate compact binary frames (falls back to text)
+BIN_RETRY_S = 1.0        # "BIN" is repeated this often until the robot switches, and after every "Ready"
+BIN_MAX_TRIES = 10       # then the robot is taken to be text-only firmware
+SERIAL_ECHO = False      # print every received line (slow at high rates)
+INGEST_PROCESS = False   # read the link in a separate process; frames arrive via shared memory
+SERIAL_TRANSPORT = "thread"  # "thread": one blocking reader per port; "asyncio": every port on one event loop
+COMMAND_TIMEOUT_S = 2.0      # asyncio transport: a command with no reply by then fails
+PHOTO_TIMEOUT_S = 5
+PHOTO_DIR = "captured_photos"
+PHOTO_RESEND_AFTER_S = 1.0   # chunked photos: request missing chunks after this much silence
+PHOTO_MAX_RETRIES = 10
+
+# Align the robot's millis() to the host clock (binary frames only)
+CLOCK_ALIGN = True
+CLOCK_WINDOW_S = 60.0        # history used for the offset/drift fit
+CLOCK_BUCKET_S = 1.0         # one minimum-delay sample kept per bucket of device time
+
+# Replay a recorded mission directory (or a CSV log) instead of the live link
+REPLAY_PATH = None           # e.g. "missions/20250425-101500"
+REPLAY_SPEED = 1.0           # 1, 10, 100, ... or None for as fast as possible
+REPLAY_BLOCK = 512           # max frames released per step
+REPLAY_SPEEDS = [("1×", 1.0), ("10×", 10.0), ("100×", 100.0), ("Max", None)]
+
+# Frames buffered between the reader thread and the dashboard
+TELEMETRY_RING_SIZE = 4096
+
+# Telemetry bus (utils/bus.py): default per-subscriber queue length and BLOCK wait
+BUS_QUEUE_SIZE = 64
+BUS_BLOCK_TIMEOUT_S = 1.0
+LINK_STATS_PERIOD_S = 1.0    # how often readers publish link_stats
+
+# Dashboard pacing: how often the queue is drained vs. how often the screen is repainted
+INGEST_INTERVAL_MS = 20
+RENDER_FPS = 30
+
+# IMU sensor fusion (Madgwick filter)
+ORIENTATION_BETA = 0.1       # accelerometer correction gain; higher trusts gravity more
+ORIENTATION_MAX_DT = 1.0     # seconds; longer gaps are not integrated blindly
+ACCEL_Z_OFFSET_G = 0.91      # the firmware subtracts this from AccelZ, add it back for gravity
+
+# Interest detector: "isolation_forest" or "zscore" (streaming, adapts to drift)
+DETECTOR_BACKEND = "isolation_forest"
+DETECTOR_WINDOW = 2000       # IsolationForest training window (samples)
+DETECTOR_MIN_SAMPLES = 30    # samples before the first fit
+DETECTOR_REFIT_EVERY = 500   # background refit period (samples)
+DETECTOR_DRIFT_SPAN = 50     # samples averaged for the drift check
+DETECTOR_DRIFT_Z = 3.0       # refit early when the recent mean moves this many training stds
+ZSCORE_HALFLIFE = 300        # samples for the baseline to forget half of its history
+ZSCORE_WARMUP = 30           # samples before scores are reported
+ZSCORE_RANGE = (2.0, 6.0)    # robust |z| mapped linearly onto interest 0..1
+DETECTOR_QUEUE_SIZE = 64     # feature batches waiting for the scoring thread
+
+# Mission recorder (columnar files under RECORD_DIR/<start time>/)
+RECORD_DIR = "missions"
+RECORDER_CHUNK_ROWS = 1024   # frames per written chunk
+RECORDER_FLUSH_S = 1.0       # write a partial chunk after this long
+RECORDER_FSYNC_S = 5.0       # fsync period; bounds what a crash can lose
+
+# Mission overview (whole-dive min/max pyramid)
+PYRAMID_FACTOR = 4           # buckets of the level below summarised per bucket
+OVERVIEW_REFRESH_S = 0.5     # how often the overview follows new data
+
+
+# Stage profiler and on-screen performance overlay
+PROFILER_ENABLED = True
+PROFILER_HISTORY = 1000      # timings kept per stage
+PERF_OVERLAY_KEY = "F12"     # toggle the overlay
+PERF_DUMP_KEY = "Ctrl+Shift+P"  # write the timings to PERF_DUMP_DIR
+PERF_DUMP_DIR = "perf_dumps"
+
+# Headless daemon (headless.py)
+HEADLESS_EVENT_THRESHOLD = 0.7   # interest score that logs an event
+HEADLESS_STATUS_S = 10.0         # period of the one-line status report
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The app imports its modules flat (settings, utils.*) from the UI directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,95 @@
+import asyncio
+import time
+
+import pytest
+
+pytest.importorskip("serial")
+from utils.async_transport import AsyncSerialTransport
+from utils.bus import Bus, TOPIC_ACK
+from utils.profiler import profiler
+
+
+class FakePort:
+    def __init__(self):
+        self.written = []
+        self.timeout = 0
+
+    def write(self, data):
+        self.written.append(data)
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def transport():
+    bus = Bus()
+    link = AsyncSerialTransport(bus, port=None)   # unopened port
+    link.ser = FakePort()
+    link.loop = asyncio.new_event_loop()          # driven by the test, not the shared link loop
+    link.acks = bus.subscribe(TOPIC_ACK)
+    yield link
+    link.loop.close()
+
+
+def run(link, scenario):
+    """Run `scenario()` on the link's loop with the command writer going."""
+    async def main():
+        link._outbox = asyncio.Queue()
+        writer = asyncio.ensure_future(link._writer())
+        try:
+            return await scenario()
+        finally:
+            writer.cancel()
+            await asyncio.gather(writer, return_exceptions=True)
+    return link.loop.run_until_complete(main())
+
+
+def test_not_alive_until_opened(transport):
+    assert not transport.is_alive()
+
+
+def test_oldest_waiting_command_gets_the_reply(transport):
+    async def scenario():
+        first = asyncio.ensure_future(transport._command("LEFT", 1.0))
+        second = asyncio.ensure_future(transport._command("LEFT", 1.0))
+        snap = asyncio.ensure_future(transport._command("SNAP", 1.0))
+        while len(transport._waiting) < 3:
+            await asyncio.sleep(0)
+        waiting = [cmd.future for cmd in transport._waiting]
+        time.sleep(0.01)
+        transport._on_reply("Servo turned left to: 75", time.monotonic_ns())
+        done = tuple(f.done() for f in waiting)
+        transport._on_reply("Servo turned left to: 60", time.monotonic_ns())
+        transport._on_reply("SNAP command received", time.monotonic_ns())
+        return done, await asyncio.gather(first, second, snap)
+
+    before = profiler.stages.get("link.command_rtt")
+    n_before = before.n if before else 0
+    done, results = run(transport, scenario)
+    assert done == (True, False, False)
+    assert results == ["Servo turned left to: 75", "Servo turned left to: 60", "SNAP command received"]
+    assert transport.ser.written == [b"LEFT\n", b"LEFT\n", b"SNAP\n"]
+    assert transport.commands_sent == 3 and transport.commands_acked == 3
+    assert transport.last_rtt_ms > 0
+    assert profiler.stages["link.command_rtt"].n == n_before + 3
+    assert len(transport.acks.drain()) == 3   # replies are still published
+
+
+def test_command_without_reply_times_out(transport):
+    async def scenario():
+        with pytest.raises(TimeoutError):
+            await transport._command("SNAP", 0.05)
+
+    run(transport, scenario)
+    assert transport.commands_timed_out == 1
+    assert transport._waiting == []
+    assert transport.acks.drain() == ["SNAP: no reply after 0.1 s"]
+
+
+def test_commands_without_a_known_reply_complete_once_written(transport):
+    async def scenario():
+        return await transport._command("BIN", 1.0)
+
+    assert run(transport, scenario) is None
+    assert transport.ser.written == [b"BIN\n"]
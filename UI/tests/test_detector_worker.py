@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("PyQt5")
+from utils.detector_worker import DetectorWorker
+
+
+class RecordingDetector:
+    """Remembers the first column of every batch it is asked to score."""
+
+    def __init__(self):
+        self.seen = []
+
+    def process(self, X):
+        self.seen.extend(X[:, 0].tolist())
+        return X[:, 0]
+
+
+def batch(value, n=2):
+    return np.full((n, 8), float(value))
+
+
+def test_scores_everything_queued_in_one_call():
+    old = RecordingDetector()
+    worker = DetectorWorker(old)
+    worker.submit(batch(1))
+    worker.submit(batch(2))
+    assert worker._step() == 2.0
+    assert old.seen == [1, 1, 2, 2]
+    assert worker._step() is None   # nothing left
+
+
+def test_reset_drops_only_batches_from_before_it():
+    old, new = RecordingDetector(), RecordingDetector()
+    worker = DetectorWorker(old)
+    worker.submit(batch(1))
+    worker.reset(new)
+    worker.submit(batch(2))
+    assert worker._step() == 2.0
+    assert old.seen == []
+    assert new.seen == [2, 2]
+    assert worker.detector is new
+
+
+def test_reset_with_only_stale_batches_scores_nothing():
+    old, new = RecordingDetector(), RecordingDetector()
+    worker = DetectorWorker(old)
+    worker.submit(batch(1))
+    worker.reset(new)
+    assert worker._step() is None
+    assert worker.detector is new and new.seen == []
+    worker.submit(batch(3))
+    assert worker._step() == 3.0
+
+
+def test_full_queue_drops_oldest():
+    det = RecordingDetector()
+    worker = DetectorWorker(det)
+    size = worker.inbox.maxsize
+    for i in range(size + 3):
+        worker.submit(batch(i, n=1))
+    assert worker.dropped_batches == 3
+    worker._step()
+    assert det.seen == list(range(3, size + 3))
@@ -0,0 +1,92 @@
+import numpy as np
+from utils.frame_parser import (FrameParser, EVENT_LINE, EVENT_PHOTO, EVENT_FRAMES,
+                                MODE_TEXT, MODE_BINARY)
+from utils.protocol import encode_telemetry, encode_text
+
+
+def telemetry(seq, value=0.0):
+    return encode_telemetry(seq, seq * 10, np.full(9, value))
+
+
+def lines(events):
+    return [payload for kind, payload in events if kind == EVENT_LINE]
+
+
+def n_frames(events):
+    return sum(len(payload) for kind, payload in events if kind == EVENT_FRAMES)
+
+
+def test_photo_split_at_every_offset():
+    photo = bytes(range(256)) * 4
+    stream = b"GyroX:1.0\r\nPHOTO_START\r\n" + photo + b"PHOTO_END\r\nGyroY:2.0\r\n"
+    for cut in range(1, len(stream)):
+        parser = FrameParser()
+        events = parser.feed(stream[:cut]) + parser.feed(stream[cut:])
+        assert [p for k, p in events if k == EVENT_PHOTO] == [photo], cut
+        assert lines(events) == ["GyroX:1.0", "GyroY:2.0"], cut
+        assert not parser.in_photo_mode
+
+
+def test_switches_to_binary_on_first_valid_frame():
+    parser = FrameParser()
+    events = parser.feed(b"Ready\r\n" + telemetry(0) + telemetry(1))
+    assert parser.mode == MODE_BINARY
+    assert lines(events) == ["Ready"]
+    assert n_frames(events) == 2
+
+
+def test_switches_to_binary_on_valid_frame_fed_byte_by_byte():
+    parser = FrameParser()
+    count = 0
+    for b in telemetry(0) + telemetry(1):
+        count += n_frames(parser.feed(bytes([b])))
+    assert parser.mode == MODE_BINARY
+    assert count == 2
+
+
+def test_sync_word_noise_stays_in_text_mode():
+    parser = FrameParser()
+    events = parser.feed(b"\xa5\x5a\x00garbage\r\nGyroX:1.0\r\n" + b"x" * 300 + b"\r\nTDS_ppm:200\r\n")
+    assert parser.mode == MODE_TEXT
+    assert lines(events)[1:] == ["GyroX:1.0", "x" * 300, "TDS_ppm:200"]
+
+
+def test_falls_back_to_text_after_reset():
+    parser = FrameParser()
+    parser.feed(b"BIN_OK\r\n" + telemetry(0))
+    assert parser.mode == MODE_BINARY
+    events = parser.feed(b"\x00\x13ets Jun  8 2016\r\nReady\r\nGyroX:2.0\r\n")
+    assert parser.mode == MODE_TEXT
+    assert lines(events)[-2:] == ["Ready", "GyroX:2.0"]
+
+
+def test_falls_back_to_text_after_garbage():
+    parser = FrameParser()
+    parser.feed(b"BIN_OK\r\n")
+    parser.feed(bytes(range(0x80, 0xa0)) * 20)    # 640 bytes, no frame and no text line
+    assert parser.mode == MODE_TEXT
+
+
+def test_lost_frames_across_seq_wrap():
+    parser = FrameParser()
+    events = parser.feed(b"BIN_OK\r\n" + telemetry(65534) + telemetry(65535) + telemetry(0) + telemetry(2))
+    assert n_frames(events) == 4
+    assert parser.stats()["lost_frames"] == 1
+
+
+def test_bad_crc_resyncs():
+    parser = FrameParser()
+    bad = bytearray(telemetry(1))
+    bad[10] ^= 0xFF
+    events = parser.feed(b"BIN_OK\r\n" + telemetry(0) + bytes(bad) + telemetry(2))
+    assert n_frames(events) == 2
+    assert parser.stats()["crc_errors"] >= 1
+    assert parser.stats()["lost_frames"] == 1
+
+
+def test_frames_reported_before_text_of_the_same_read():
+    parser = FrameParser()
+    parser.feed(b"BIN_OK\r\n")
+    events = parser.feed(encode_text(0, "SNAP command received") + telemetry(1, 3.0))
+    assert [kind for kind, _ in events] == [EVENT_FRAMES, EVENT_LINE]
+    assert events[0][1]["payload"]["GyroX"][0] == 3.0
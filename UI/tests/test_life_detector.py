@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+from utils.life_detector import (BaseDetector, LifeDetector, StreamingZScoreDetector, make_detector,
+                                 FEATURES)
+
+
+def test_base_detector_is_abstract():
+    with pytest.raises(TypeError):
+        BaseDetector()
+
+
+def test_make_detector_backends(monkeypatch):
+    assert isinstance(make_detector("zscore"), StreamingZScoreDetector)
+    assert isinstance(make_detector("isolation_forest"), LifeDetector)
+    import utils.life_detector as life_detector
+    monkeypatch.setattr(life_detector, "DETECTOR_BACKEND", "zscore")
+    assert isinstance(make_detector(), StreamingZScoreDetector)
+    with pytest.raises(KeyError):
+        make_detector("nope")
+
+
+def test_warmup_is_per_feature():
+    rng = np.random.default_rng(0)
+    det = StreamingZScoreDetector(halflife=100, warmup=5)
+    for i in range(20):
+        fresh = np.array([True, i % 10 == 0])   # feature 1 is sampled every tenth row
+        det.add_sample(rng.normal(size=2), fresh)
+    assert list(det.n) == [20, 2]
+    assert det.score_batch(np.array([[0.0, 100.0]]))[0] == 0.0   # feature 1 still warming up
+    assert det.score_batch(np.array([[100.0, 0.0]]))[0] == 1.0
+
+
+def test_held_slow_channel_keeps_its_spread():
+    rng = np.random.default_rng(1)
+    masked = StreamingZScoreDetector(halflife=50, warmup=5)
+    unmasked = StreamingZScoreDetector(halflife=50, warmup=5)
+    value = 0.0
+    for i in range(2000):
+        fresh = i % 100 == 0   # 1 Hz channel among 100 Hz rows, held in between
+        if fresh:
+            value = rng.normal()
+        masked.add_sample([value], [fresh])
+        unmasked.add_sample([value])
+    assert masked.spread[0] > 0.3   # ~0.8 for unit Gaussian noise
+    assert unmasked.spread[0] < masked.spread[0] / 2   # held rows look like zero deviation
+
+
+def test_spike_is_winsorized():
+    rng = np.random.default_rng(2)
+    det = StreamingZScoreDetector(halflife=100, warmup=10)
+    for _ in range(500):
+        det.add_sample(rng.normal(size=1))
+    loc, scale = det.loc.copy(), det._scale().copy()
+    det.add_sample([1000.0])
+    assert abs(det.loc[0] - loc[0]) <= det.alpha * det.CLIP * scale[0] + 1e-9
+    assert det.score_batch(np.array([[1000.0]]))[0] == 1.0
+
+
+def test_process_joins_rows_before_scoring():
+    det = StreamingZScoreDetector(warmup=2)
+    X = np.zeros((5, len(FEATURES)))
+    X[1:, 0] = np.nan   # the first feature is only sampled in the first row
+    scores = det.process(X)
+    assert scores.shape == (5,)
+    assert det.n[0] == 1 and det.n[1] == 5
@@ -0,0 +1,88 @@
+import os
+
+import pytest
+import utils.photo_transfer as photo_transfer
+from utils.photo_transfer import PhotoAssembler
+from utils.protocol import PHOTO_HEADER, PHOTO_CHUNK
+
+CHUNK = 4
+PHOTO = bytes(range(10))   # three chunks: 4 + 4 + 2 bytes
+
+
+def header(photo_id, data=PHOTO):
+    n = (len(data) + CHUNK - 1) // CHUNK
+    return PHOTO_HEADER.pack(photo_id, len(data), CHUNK, n)
+
+
+def chunk(photo_id, index, data=PHOTO):
+    return PHOTO_CHUNK.pack(photo_id, index) + data[index * CHUNK:(index + 1) * CHUNK]
+
+
+@pytest.fixture
+def assembler(tmp_path):
+    sent, done = [], []
+    return PhotoAssembler(sent.append, done.append, str(tmp_path)), sent, done
+
+
+def test_out_of_order_chunks_and_ack(assembler):
+    asm, sent, done = assembler
+    asm.on_header(header(1))
+    for i in (2, 0, 0, 1):
+        asm.on_chunk(chunk(1, i))
+    assert len(done) == 1
+    with open(done[0], "rb") as f:
+        assert f.read() == PHOTO
+    assert sent == ["PHOTO_ACK 1"]
+
+
+def test_bad_chunk_is_ignored(assembler):
+    asm, sent, done = assembler
+    asm.on_header(header(1))
+    asm.on_chunk(PHOTO_CHUNK.pack(1, 7) + b"junk")   # index past the last chunk
+    assert not asm.received.any()
+    assert sent == [] and done == []
+
+
+def test_resend_lists_missing_chunks(assembler, monkeypatch):
+    asm, sent, done = assembler
+    monkeypatch.setattr(photo_transfer, "PHOTO_RESEND_AFTER_S", 0.0)
+    asm.on_header(header(1))
+    asm.on_chunk(chunk(1, 1))
+    asm.poll()
+    assert sent == ["PHOTO_RESEND 1 0 2"]
+    asm.on_chunk(chunk(1, 0))
+    assert asm.retries == 0   # progress resets the retry count
+    asm.poll()
+    assert sent[-1] == "PHOTO_RESEND 1 2"
+    asm.on_chunk(chunk(1, 2))
+    assert sent[-1] == "PHOTO_ACK 1" and len(done) == 1
+
+
+def test_new_header_abandons_unfinished_photo(assembler, tmp_path):
+    asm, sent, done = assembler
+    asm.on_header(header(1))
+    asm.on_chunk(chunk(1, 0))
+    asm.on_header(header(2))
+    assert not os.path.exists(tmp_path / "incoming_1.part")
+    assert asm.photo_id == 2
+    for i in range(3):
+        asm.on_chunk(chunk(2, i))
+    assert [os.path.basename(p) for p in done] == ["incoming_2.jpg"]
+
+
+def test_new_photo_chunk_abandons_and_requests_header(assembler, tmp_path):
+    asm, sent, done = assembler
+    asm.on_header(header(1))
+    asm.on_chunk(chunk(2, 0))
+    assert not os.path.exists(tmp_path / "incoming_1.part")
+    assert sent == ["PHOTO_RESEND 2"]
+
+
+def test_header_requests_are_rate_limited(assembler, monkeypatch):
+    asm, sent, done = assembler
+    for i in range(3):
+        asm.on_chunk(chunk(5, i))
+    assert sent == ["PHOTO_RESEND 5"]
+    monkeypatch.setattr(photo_transfer, "PHOTO_RESEND_AFTER_S", 0.0)
+    asm.on_chunk(chunk(5, 0))
+    assert sent == ["PHOTO_RESEND 5", "PHOTO_RESEND 5"]
@@ -0,0 +1,53 @@
+import numpy as np
+from utils.pyramid import MinMaxPyramid
+
+
+def build(rng, n_batches=60, n_channels=2):
+    pyramid = MinMaxPyramid(n_channels)
+    ts, ys = [], []
+    t0 = 0.0
+    for n in rng.integers(0, 200, n_batches):
+        t = t0 + np.arange(n) * 0.01
+        t0 += n * 0.01
+        y = rng.normal(size=(n_channels, n)).astype(np.float32)
+        pyramid.append(t, y)
+        ts.append(t)
+        ys.append(y)
+    return pyramid, np.concatenate(ts), np.concatenate(ys, axis=1)
+
+
+def test_query_envelope_matches_raw_data():
+    rng = np.random.default_rng(0)
+    pyramid, t, y = build(rng)
+    assert len(pyramid) == len(t)
+    for _ in range(200):
+        t0, t1 = np.sort(rng.uniform(-1.0, t[-1] + 1.0, 2))
+        max_points = int(rng.integers(4, 400))
+        channel = int(rng.integers(0, 2))
+        x, env = pyramid.query(channel, t0, t1, max_points)
+
+        inside = (t >= t0) & (t <= t1)
+        if not inside.any():
+            continue
+        assert len(x) <= 2 * max_points + 2 * pyramid.factor * len(pyramid.levels)
+        assert np.all(np.diff(x) >= 0)
+        # The envelope covers every sample in range and only holds real samples from its span
+        assert env.min() <= y[channel, inside].min()
+        assert env.max() >= y[channel, inside].max()
+        covered = y[channel, t >= x[0]]
+        assert np.isin(env, covered).all()
+
+
+def test_query_returns_raw_samples_when_they_fit():
+    rng = np.random.default_rng(1)
+    pyramid, t, y = build(rng, n_batches=5)
+    x, v = pyramid.query(1, t[0], t[-1], len(t))
+    assert np.array_equal(x, t)
+    assert np.array_equal(v, y[1])
+
+
+def test_clear():
+    rng = np.random.default_rng(2)
+    pyramid, _, _ = build(rng, n_batches=5)
+    pyramid.clear()
+    assert len(pyramid) == 0 and pyramid.time_span() == (0.0, 0.0)
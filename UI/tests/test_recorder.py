@@ -0,0 +1,75 @@
+import os
+
+import numpy as np
+import pytest
+from utils.recorder import MissionRecorder, RECORD_DTYPE, INDEX_DTYPE, load_mission, export_csv, _column_file
+
+
+def make_rows(n, start=0):
+    rows = np.zeros(n, dtype=RECORD_DTYPE)
+    rows["t"] = np.arange(start, start + n, dtype=float)
+    rows["TDS_ppm"] = rows["t"] * 2
+    rows["qw"] = 1.0
+    return rows
+
+
+def write_chunk(recorder, rows):
+    recorder._pending, recorder._pending_rows = [rows], len(rows)
+    recorder._write_chunk()
+
+
+class FailingFile:
+    """Writes half of what it is given, then fails like a full disk."""
+
+    def __init__(self, f):
+        self.f = f
+
+    def write(self, data):
+        self.f.write(data[:len(data) // 2])
+        raise OSError(28, "No space left on device")
+
+    def fileno(self):
+        return self.f.fileno()
+
+
+def test_failed_write_rolls_back_every_column(tmp_path):
+    rec = MissionRecorder(root=str(tmp_path))
+    write_chunk(rec, make_rows(10))
+    name = RECORD_DTYPE.names[5]
+    good = rec.files[name]
+    rec.files[name] = FailingFile(good)
+    write_chunk(rec, make_rows(10, start=10))
+    rec.files[name] = good
+    write_chunk(rec, make_rows(5, start=20))
+    rec.running = False
+    rec.run()
+
+    assert rec.rows == 15 and not rec.failed
+    for col in RECORD_DTYPE.names:
+        size = os.path.getsize(os.path.join(rec.path, _column_file(col)))
+        assert size == 15 * RECORD_DTYPE[col].itemsize, col
+    assert os.path.getsize(os.path.join(rec.path, "index.bin")) == 2 * INDEX_DTYPE.itemsize
+
+    columns, index = load_mission(rec.path)
+    assert list(columns["t"]) == list(range(10)) + list(range(20, 25))
+    assert list(index["first_row"]) == [0, 10]
+
+
+def test_round_trip_and_csv_export(tmp_path):
+    pd = pytest.importorskip("pandas")
+    rec = MissionRecorder(root=str(tmp_path))
+    rec.start()
+    rows = make_rows(100)
+    rec.write(rows[:60])
+    rec.write(rows[60:])
+    rec.close()
+
+    columns, index = load_mission(rec.path)
+    assert int(index["rows"].sum()) == 100
+    for col in RECORD_DTYPE.names:
+        assert np.array_equal(np.asarray(columns[col]), rows[col]), col
+
+    out = export_csv(rec.path, str(tmp_path / "mission.csv"))
+    df = pd.read_csv(out)
+    assert len(df) == 100
+    assert np.allclose(df["TDS_ppm"], rows["TDS_ppm"])
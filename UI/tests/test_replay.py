@@ -0,0 +1,86 @@
+import time
+
+import numpy as np
+import pytest
+from utils.bus import Bus, TOPIC_TELEMETRY
+from utils.recorder import MissionRecorder, RECORD_DTYPE
+from utils.replay import ReplayReader
+from utils.telemetry_queue import TelemetryRing
+
+N = 100
+PERIOD_S = 0.1
+
+
+@pytest.fixture
+def mission(tmp_path):
+    rows = np.zeros(N, dtype=RECORD_DTYPE)
+    rows["t"] = 1000.0 + np.arange(N) * PERIOD_S
+    rows["TDS_ppm"] = np.arange(N)   # frame index, to tell which frames were replayed
+    rec = MissionRecorder(root=str(tmp_path))
+    rec.start()
+    rec.write(rows)
+    rec.close()
+    return rec.path
+
+
+@pytest.fixture
+def replay(mission):
+    bus = Bus()
+    ring = bus.subscribe(TOPIC_TELEMETRY, TelemetryRing(1024))
+    reader = ReplayReader(bus, mission, speed=None)
+    yield reader, ring
+    reader.stop()
+    reader.join(1.0)
+
+
+def wait_for(condition, timeout=3.0):
+    end = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < end, "timed out"
+        time.sleep(0.01)
+
+
+def test_flat_out_replay(replay):
+    reader, ring = replay
+    assert reader.duration == pytest.approx((N - 1) * PERIOD_S)
+    assert reader.position() == 0.0
+    reader.start()
+    wait_for(lambda: reader.pos >= N)
+    frames = ring.drain()
+    assert list(frames["TDS_ppm"]) == list(range(N))
+    assert np.all(np.diff(frames["t"]) >= 0)
+    assert frames["t"][-1] <= time.monotonic()
+    assert reader.position() == pytest.approx(reader.duration)
+
+
+def test_seek_replays_from_there_without_going_back_in_time(replay):
+    reader, ring = replay
+    reader.start()
+    wait_for(lambda: reader.pos >= N)
+    before = ring.drain()
+    reader.seek(5.0)
+    wait_for(lambda: len(ring) >= N // 2)
+    after = ring.drain()
+    assert after["TDS_ppm"][0] == 50
+    assert after["t"][0] >= before["t"][-1]
+    reader.seek(-3.0)   # clamped to the start
+    wait_for(lambda: len(ring) >= N)
+    assert ring.drain()["TDS_ppm"][0] == 0
+
+
+def test_set_speed_tracks_wall_time(replay):
+    reader, ring = replay
+    reader.set_speed(10.0)
+    reader.start()
+    time.sleep(0.3)   # ~3 s of mission at 10x
+    frames = ring.drain()
+    assert 1.5 < reader.position() < 5.0
+    now = time.monotonic()
+    assert frames["t"][-1] <= now
+    # Frames are stamped at their due time: 10x plays 0.1 s frames every 10 ms
+    assert np.median(np.diff(frames["t"])) == pytest.approx(PERIOD_S / 10, rel=0.2)
+    reader.set_speed(1.0)
+    position = reader.position()
+    time.sleep(0.3)
+    assert reader.position() - position < 0.6
+    assert ring.drain()["t"][0] >= frames["t"][-1]
@@ -0,0 +1,45 @@
+import numpy as np
+from utils.telemetry_queue import TelemetryRing, FRAME_DTYPE
+
+
+def make_frames(n, start=0):
+    frames = np.zeros(n, dtype=FRAME_DTYPE)
+    frames["t"] = np.arange(start, start + n, dtype=float)
+    return frames
+
+
+def test_push_many_within_capacity():
+    ring = TelemetryRing(capacity=10)
+    ring.push_many(make_frames(4))
+    out = ring.drain()
+    assert list(out["t"]) == [0, 1, 2, 3]
+    assert list(out["seq"]) == [0, 1, 2, 3]
+    assert ring.stats()["overflows"] == 0
+
+
+def test_push_many_larger_than_capacity_counts_overflow_once():
+    ring = TelemetryRing(capacity=10)
+    ring.push_many(make_frames(15))
+    assert ring.stats()["overflows"] == 5
+    out = ring.drain()
+    assert list(out["t"]) == list(range(5, 15))
+    assert list(out["seq"]) == list(range(5, 15))
+    assert ring.stats()["received"] == 15
+
+
+def test_push_many_larger_than_capacity_with_unread_frames():
+    ring = TelemetryRing(capacity=10)
+    ring.push_many(make_frames(3))
+    ring.push_many(make_frames(12, start=3))
+    # 15 frames pushed, 10 kept: the 3 unread ones and 2 of the new batch are lost
+    assert ring.stats()["overflows"] == 5
+    assert list(ring.drain()["t"]) == list(range(5, 15))
+
+
+def test_lapping_reader_drops_oldest():
+    ring = TelemetryRing(capacity=10)
+    for start in range(0, 24, 6):
+        ring.push_many(make_frames(6, start))
+    assert ring.stats()["overflows"] == 14
+    assert list(ring.drain()["t"]) == list(range(14, 24))
+    assert len(ring) == 0
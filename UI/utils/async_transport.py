@@ -0,0 +1,182 @@
+import asyncio
+import io
+import threading
+import time
+
+from settings import SERIAL_PORT, SERIAL_BAUDRATE, PHOTO_DIR, COMMAND_TIMEOUT_S
+from utils.bus import TOPIC_ACK
+from utils.profiler import profiler
+from utils.serial_reader import SerialLink
+
+# Start of the reply that acknowledges each command (see handleCommand() in the sketch).
+# Other commands (BIN, PHOTO_RESEND, PHOTO_ACK, ...) get no reply and complete once written.
+COMMAND_REPLIES = {
+    "SNAP": "SNAP command received",
+    "LEFT": "Servo turned left to:",
+    "RIGHT": "Servo turned right to:",
+}
+
+TICK_S = 0.05   # photo retransmits, link stats and timeouts are checked this often
+
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def link_loop():
+    """The event loop shared by every AsyncSerialTransport, started on first use."""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="link-loop", daemon=True).start()
+        return _loop
+
+
+class _Command:
+    __slots__ = ("id", "text", "reply", "future", "sent_ns")
+
+    def __init__(self, cmd_id, text, future):
+        self.id = cmd_id
+        self.text = text
+        self.reply = COMMAND_REPLIES.get(text)
+        self.future = future
+        self.sent_ns = None
+
+
+class AsyncSerialTransport(SerialLink):
+    """SerialLink whose I/O runs on the shared asyncio link loop instead of its own thread. Commands with a
+    known reply (COMMAND_REPLIES) wait for it or time out after COMMAND_TIMEOUT_S."""
+
+    def __init__(self, bus, port=SERIAL_PORT, baudrate=SERIAL_BAUDRATE, photo_dir=PHOTO_DIR):
+        super().__init__(bus, port, baudrate, photo_dir)
+        self.ser.timeout = 0     # reads return what is buffered and never block the loop
+        self.loop = link_loop()
+        self.commands_sent = 0
+        self.commands_acked = 0
+        self.commands_timed_out = 0
+        self.last_rtt_ms = None
+        self._next_id = 1
+        self._outbox = None      # asyncio.Queue of _Command, created on the loop
+        self._waiting = []       # written commands awaiting their reply, oldest first
+        self._tasks = []
+        self._fd = None
+        self._opened = False
+        self._closed = threading.Event()
+
+    def start(self):
+        asyncio.run_coroutine_threadsafe(self._open(), self.loop).result()
+
+    def stop(self):
+        if self.running:
+            asyncio.run_coroutine_threadsafe(self._close(), self.loop).result(timeout=5)
+
+    def join(self, timeout=None):
+        self._closed.wait(timeout)
+
+    def is_alive(self):
+        return self._opened and not self._closed.is_set()
+
+    def send_command(self, command, timeout=COMMAND_TIMEOUT_S):
+        """Queue `command`. Returns a concurrent.futures.Future of the reply text (None if it has none)."""
+        return asyncio.run_coroutine_threadsafe(self._command(command, timeout), self.loop)
+
+    def link_stats(self):
+        stats = super().link_stats()
+        stats.update(commands_sent=self.commands_sent, commands_acked=self.commands_acked,
+                     commands_timed_out=self.commands_timed_out, rtt_ms=self.last_rtt_ms)
+        return stats
+
+    # ------------------------------------------------------------------
+    async def _open(self):
+        self._opened = True
+        self._outbox = asyncio.Queue()
+        self._tasks = [asyncio.ensure_future(self._writer()), asyncio.ensure_future(self._ticker())]
+        try:
+            self._fd = self.ser.fileno()
+            self.loop.add_reader(self._fd, self._on_readable)
+        except (AttributeError, io.UnsupportedOperation, NotImplementedError):
+            # Windows: serial handles cannot be selected on; poll the driver's buffer instead
+            self._fd = None
+            self._tasks.append(asyncio.ensure_future(self._poll_port()))
+
+    async def _close(self):
+        self.running = False
+        if self._fd is not None:
+            self.loop.remove_reader(self._fd)
+        for task in self._tasks:
+            task.cancel()
+        for cmd in self._waiting:
+            cmd.future.cancel()
+        self._waiting = []
+        self.ser.close()
+        self._closed.set()
+
+    async def _command(self, text, timeout):
+        cmd = _Command(self._next_id, text, self.loop.create_future())
+        self._next_id += 1
+        await self._outbox.put(cmd)
+        try:
+            return await asyncio.wait_for(cmd.future, timeout)
+        except asyncio.TimeoutError:
+            if cmd in self._waiting:
+                self._waiting.remove(cmd)
+            self.commands_timed_out += 1
+            self.bus.publish(TOPIC_ACK, f"{text}: no reply after {timeout:.1f} s")
+            raise TimeoutError(f"command #{cmd.id} {text!r} got no reply within {timeout} s") from None
+
+    async def _writer(self):
+        while True:
+            cmd = await self._outbox.get()
+            if cmd.future.done():
+                continue  # timed out while queued
+            try:
+                self.ser.write((cmd.text + "\n").encode())
+            except Exception as e:
+                print("Serial send error:", e)
+                cmd.future.set_exception(e)
+                continue
+            cmd.sent_ns = time.monotonic_ns()
+            self.commands_sent += 1
+            if cmd.reply is None:
+                cmd.future.set_result(None)
+            else:
+                self._waiting.append(cmd)
+
+    async def _ticker(self):
+        while True:
+            self._tick()
+            await asyncio.sleep(TICK_S)
+
+    async def _poll_port(self):
+        while True:
+            if self.ser.in_waiting:
+                self._on_readable()
+                await asyncio.sleep(0)  # let the other links and the writer run between reads
+            else:
+                await asyncio.sleep(0.002)
+
+    def _on_readable(self):
+        try:
+            chunk = self.ser.read(self.ser.in_waiting or 1)
+        except Exception as e:
+            print("Serial read error:", e)
+            if self._fd is not None:
+                self.loop.remove_reader(self._fd)
+            return
+        if chunk:
+            with profiler.stage("reader.parse"):
+                self.process(chunk, time.monotonic_ns())
+
+    def _on_reply(self, line, t_rx_ns):
+        # The oldest command waiting for this kind of reply gets it
+        for cmd in self._waiting:
+            if line.startswith(cmd.reply):
+                self._waiting.remove(cmd)
+                rtt = (t_rx_ns - cmd.sent_ns) / 1e9
+                profiler.record("link.command_rtt", rtt)
+                self.commands_acked += 1
+                self.last_rtt_ms = rtt * 1000
+                if not cmd.future.done():
+                    cmd.future.set_result(line)
+                break
+        super()._on_reply(line, t_rx_ns)
@@ -0,0 +1,117 @@
+import threading
+from collections import deque
+
+import numpy as np
+from settings import BUS_QUEUE_SIZE, BUS_BLOCK_TIMEOUT_S
+
+# Topics and the type of item published on each
+TOPIC_TELEMETRY = "telemetry"   # structured array of telemetry_queue.FRAME_DTYPE
+TOPIC_PHOTO = "photo"           # JPEG bytes, or the path of a photo already on disk
+TOPIC_ACK = "ack"               # text reply from the robot ("Servo turned left to: 75", ...)
+TOPIC_LINK = "link_stats"       # dict of link counters, see SerialReader.link_stats()
+
+TOPIC_TYPES = {
+    TOPIC_TELEMETRY: np.ndarray,
+    TOPIC_PHOTO: (bytes, str),
+    TOPIC_ACK: str,
+    TOPIC_LINK: dict,
+}
+
+# What a full subscription does with a new item
+DROP_OLDEST = "drop_oldest"   # discard the oldest queued item
+BLOCK = "block"               # make the publisher wait (up to BUS_BLOCK_TIMEOUT_S, then drop oldest)
+COALESCE = "coalesce"         # merge the new item into the newest queued one
+
+
+class Subscription:
+    """Bounded queue of one subscriber; filled by Bus.publish(), emptied by the subscriber."""
+
+    def __init__(self, maxsize=BUS_QUEUE_SIZE, policy=DROP_OLDEST, merge=None, name=None):
+        self.maxsize = maxsize
+        self.policy = policy
+        self.merge = merge or (lambda old, new: new)
+        self.name = name
+        self.items = deque()
+        self.cond = threading.Condition()
+        self.delivered = 0
+        self.dropped = 0
+        self.coalesced = 0
+
+    def offer(self, item):
+        with self.cond:
+            if len(self.items) >= self.maxsize:
+                if self.policy == COALESCE:
+                    self.items[-1] = self.merge(self.items[-1], item)
+                    self.coalesced += 1
+                    self.cond.notify()
+                    return
+                if self.policy == BLOCK:
+                    self.cond.wait_for(lambda: len(self.items) < self.maxsize, BUS_BLOCK_TIMEOUT_S)
+                if len(self.items) >= self.maxsize:
+                    self.items.popleft()
+                    self.dropped += 1
+            self.items.append(item)
+            self.delivered += 1
+            self.cond.notify()
+
+    def get(self, timeout=None):
+        """Oldest item, waiting up to `timeout` seconds; None if nothing arrived."""
+        with self.cond:
+            if not self.cond.wait_for(lambda: self.items, timeout):
+                return None
+            item = self.items.popleft()
+            self.cond.notify()
+            return item
+
+    def drain(self):
+        """Every queued item, oldest first."""
+        with self.cond:
+            items = list(self.items)
+            self.items.clear()
+            self.cond.notify_all()
+            return items
+
+    def fill(self):
+        return len(self.items) / self.maxsize
+
+    def __len__(self):
+        return len(self.items)
+
+    def stats(self):
+        return {"pending": len(self.items), "delivered": self.delivered,
+                "dropped": self.dropped, "coalesced": self.coalesced}
+
+
+class Bus:
+    """In-process publish/subscribe: every subscription drains its own bounded queue. Items are shared between
+    subscribers and must be treated as read-only."""
+
+    def __init__(self):
+        self.subs = {topic: [] for topic in TOPIC_TYPES}
+        self.lock = threading.Lock()
+
+    def subscribe(self, topic, queue=None, **kwargs):
+        """Attach `queue`, or a new Subscription(**kwargs), to `topic` and return it."""
+        if queue is None:
+            queue = Subscription(**kwargs)
+        with self.lock:
+            self.subs[topic] = self.subs[topic] + [queue]
+        return queue
+
+    def unsubscribe(self, topic, queue):
+        with self.lock:
+            self.subs[topic] = [q for q in self.subs[topic] if q is not queue]
+
+    def publish(self, topic, item):
+        if not isinstance(item, TOPIC_TYPES[topic]):
+            raise TypeError(f"{topic} expects {TOPIC_TYPES[topic]}, got {type(item).__name__}")
+        for queue in self.subs[topic]:   # copy-on-write list: no lock needed here
+            queue.offer(item)
+
+    def backlog(self, topic):
+        """Fill level (0..1) of the fullest subscription of `topic`, for publishers that can wait."""
+        return max((q.fill() for q in self.subs[topic]), default=0.0)
+
+    def stats(self):
+        return {topic: [q.stats() for q in subs] for topic, subs in self.subs.items()}
+
@@ -0,0 +1,86 @@
+import numpy as np
+from settings import CLOCK_WINDOW_S, CLOCK_BUCKET_S
+
+WRAP = 1 << 32   # millis() is a uint32
+
+
+class ClockAligner:
+    """Maps the robot's millis() onto the host's monotonic clock. Fits a line through the lowest-delay offset
+    of each CLOCK_BUCKET_S over the last CLOCK_WINDOW_S."""
+
+    def __init__(self, window_s=CLOCK_WINDOW_S, bucket_s=CLOCK_BUCKET_S):
+        self.window_s = window_s
+        self.bucket_s = bucket_s
+        self.reset()
+
+    def reset(self):
+        self._last = None     # last unwrapped device time (ms)
+        self._wraps = 0
+        self._mins = {}       # bucket -> (device s, minimum offset s)
+        self.offset = None    # offset at the newest device time (s)
+        self.drift = 0.0      # d(offset)/d(device time), i.e. relative clock rate error
+        self._c = 0.0         # fitted offset at device time _ref
+        self._ref = 0.0
+
+    def align(self, millis, host_s):
+        """Host-clock times (s) of samples with device `millis`, received at `host_s`."""
+        if len(millis) == 0:
+            return np.zeros(0)
+        millis = np.asarray(millis, dtype=np.int64)
+        host_s = np.asarray(host_s, dtype=np.float64)
+        dev = self._unwrap(millis) / 1000.0
+
+        offsets = host_s - dev
+        buckets = np.floor(dev / self.bucket_s).astype(np.int64)
+        # Minimum offset per run of equal buckets (device time only moves forward)
+        starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+        mins = np.minimum.reduceat(offsets, starts)
+        changed = False
+        for b, o, i in zip(buckets[starts].tolist(), mins.tolist(), starts.tolist()):
+            if b not in self._mins or o < self._mins[b][1]:
+                self._mins[b] = (float(dev[i]), o)
+                changed = True
+        if changed:
+            oldest = int(buckets[-1]) - int(self.window_s / self.bucket_s)
+            for b in [b for b in self._mins if b < oldest]:
+                del self._mins[b]
+            self._fit()
+
+        fit = self._c + self.drift * (dev - self._ref)
+        self.offset = float(self._c + self.drift * (dev[-1] - self._ref))
+        # A sample cannot have been taken after it arrived
+        return np.minimum(dev + fit, host_s)
+
+    def _fit(self):
+        d, o = np.array(list(self._mins.values())).T
+        self._ref = d.max()
+        if len(d) >= 3 and np.ptp(d) > 0:
+            # Least-squares line, written out (np.polyfit costs more than the rest of align())
+            x = d - self._ref
+            xm, om = x.mean(), o.mean()
+            self.drift = float((x - xm) @ (o - om) / ((x - xm) @ (x - xm)))
+            self._c = float(om - self.drift * xm)
+        else:
+            self.drift, self._c = 0.0, o.min()
+
+    def _unwrap(self, millis):
+        out = millis + self._wraps * WRAP
+        if len(out) and (self._last is None or out[0] >= self._last) and np.all(np.diff(out) >= 0):
+            self._last = int(out[-1])
+            return out  # the common case: no wrap, no reset
+
+        out = np.empty(len(millis), dtype=np.int64)
+        for i, m in enumerate(millis):
+            t = int(m) + self._wraps * WRAP
+            if self._last is not None and t < self._last:
+                if self._last - t > WRAP // 2:
+                    self._wraps += 1      # uint32 rollover (every ~49.7 days)
+                    t += WRAP
+                else:
+                    print("[ClockAligner] Device clock went backwards; robot reset? Re-aligning.")
+                    self._mins = {}
+                    self._wraps = 0
+                    t = int(m)
+            out[i] = t
+            self._last = t
+        return out
@@ -1,60 +1,67 @@
-from config import USE_MOCK_DATA
-
-if not USE_MOCK_DATA:
-    from utils.serial_reader import SerialReader
-    reader = SerialReader()
-    reader.start()
-
-import random
-
-def generate_data():
-    if USE_MOCK_DATA:
-        return _generate_mock_data()
-    else:
-        data = reader.get_latest()
-        if data:
-            return data
+from config import (USE_MOCK_DATA, MOCK_RATE_HZ, MOCK_ENV_RATE_HZ, MOCK_SCENARIO, MOCK_SEED,
+                    REPLAY_PATH, REPLAY_SPEED, SERIAL_PORT, SERIAL_PORTS,
+                    SERIAL_BAUDRATE, INGEST_PROCESS, PHOTO_DIR, RECORD_DIR)
+from utils.telemetry_queue import TelemetryRing
+from utils.bus import Bus, TOPIC_TELEMETRY
+import os
+
+
+class RobotLink:
+    """One robot's connection: its bus, the dashboard's frame queue and the reader feeding them."""
+
+    def __init__(self, name, port=None, subdir="", make_reader=None, index=0):
+        self.name = name
+        self.port = port
+        self.bus = Bus()
+        self.photo_dir = os.path.join(PHOTO_DIR, subdir)
+        self.record_dir = os.path.join(RECORD_DIR, subdir)
+
+        if make_reader is not None:
+            # An explicit source, e.g. make_reader=SyntheticReader, overrides the config
+            self.reader = make_reader(self.bus)
+        elif REPLAY_PATH:
+            from utils.replay import ReplayReader
+            self.reader = ReplayReader(self.bus, REPLAY_PATH, REPLAY_SPEED)
+        elif not USE_MOCK_DATA and INGEST_PROCESS:
+            from utils.ingest_process import IngestProcess
+            self.reader = IngestProcess(self.bus, port, SERIAL_BAUDRATE, photo_dir=self.photo_dir)
+        elif not USE_MOCK_DATA:
+            from utils.serial_reader import open_reader
+            self.reader = open_reader(self.bus, port, SERIAL_BAUDRATE, self.photo_dir)
+        else:
+            from utils.synthetic import SyntheticReader
+            # Each mock robot gets its own seed so they do not all stream the same data
+            seed = None if MOCK_SEED is None else MOCK_SEED + index
+            self.reader = SyntheticReader(self.bus, MOCK_RATE_HZ, MOCK_SCENARIO, seed, MOCK_ENV_RATE_HZ)
+
+        if hasattr(self.reader, "telemetry"):
+            # An ingest process fills a shared-memory ring, which is the dashboard's frame queue
+            self.telemetry = self.reader.telemetry
         else:
-            # Safe fallback when serial is not ready yet
-            return {
-                "Temperature_C": 0.0,
-                "TDS_ppm": 0.0,
-                "Flex Voltage": 0.0,
-                "GyroX": 0.0,
-                "GyroY": 0.0,
-                "GyroZ": 0.0,
-                "AccelX": 0.0,
-                "AccelY": 0.0,
-                "AccelZ": 0.0,
-            }
-
-def _generate_mock_data():
-    """Simulate mock sensor data, sometimes injecting anomalies."""
-    event_chance = random.random()
-
-    if event_chance < 0.8:
-        # 80% Normal calm data
-        return {
-            "Temperature_C": random.uniform(2.0, 5.0),
-            "TDS_ppm":       random.uniform(100, 300),
-            "Flex Voltage":  random.uniform(0.5, 2.5),
-            "GyroX":         random.uniform(-20, 20),
-            "GyroY":         random.uniform(-20, 20),
-            "GyroZ":         random.uniform(-20, 20),
-            "AccelX":        random.uniform(-1, 1),
-            "AccelY":        random.uniform(-1, 1),
-            "AccelZ":        random.uniform(-1, 1),
-        }
-    else:
-        # 20% Random anomaly: high energy events
-        return {
-            "Temperature_C": random.uniform(6.0, 12.0),
-            "TDS_ppm":       random.uniform(400, 1000),
-            "Flex Voltage":  random.uniform(2.0, 3.3),
-            "GyroX":         random.uniform(-180, 180),
-            "GyroY":         random.uniform(-180, 180),
-            "GyroZ":         random.uniform(-180, 180),
-            "AccelX":        random.uniform(-10, 10),
-            "AccelY":        random.uniform(-10, 10),
-            "AccelZ":        random.uniform(-10, 10),
-        }
+            # The dashboard's frame queue; other consumers subscribe to the bus themselves
+            self.telemetry = self.bus.subscribe(TOPIC_TELEMETRY, TelemetryRing())
+
+    def start(self):
+        self.reader.start()
+
+    def stop(self):
+        self.reader.stop()
+
+    def send_command(self, command):
+        """Send a command to the robot; with mock data it is just acknowledged."""
+        self.reader.send_command(command)
+
+    def drain(self, max_items=None):
+        """Return every frame received since the last call as a structured array."""
+        return self.telemetry.drain(max_items)
+
+
+def make_links():
+    """The links the config asks for (not started): a replay, one robot, or one per SERIAL_PORTS entry."""
+    if REPLAY_PATH:
+        return [RobotLink("Replay")]
+    if not SERIAL_PORTS:
+        return [RobotLink("JellyBot", SERIAL_PORT)]
+    # Several robots: photos and missions go to a subdirectory per robot
+    return [RobotLink(name, port, name.replace(" ", "_"), index=i)
+            for i, (name, port) in enumerate(SERIAL_PORTS.items())]
@@ -0,0 +1,81 @@
+import queue
+import numpy as np
+from PyQt5.QtCore import QThread, pyqtSignal
+from config import DETECTOR_QUEUE_SIZE
+from utils.profiler import profiler
+
+
+class DetectorWorker(QThread):
+    """Runs an interest detector off the GUI thread; the newest score comes back via `score_ready`."""
+
+    score_ready = pyqtSignal(float)
+
+    def __init__(self, detector, parent=None):
+        super().__init__(parent)
+        self.detector = detector
+        self.inbox = queue.Queue(maxsize=DETECTOR_QUEUE_SIZE)
+        self.running = True
+        self.dropped_batches = 0
+        # reset() publishes (generation, detector) in one assignment; batches carry
+        # the generation they were submitted under
+        self._latest = (0, detector)
+        self._generation = 0
+
+    def submit(self, X):
+        item = (self._latest[0], X)
+        try:
+            self.inbox.put_nowait(item)
+        except queue.Full:
+            # Scoring fell behind; the newest data matters most for the display
+            self.dropped_batches += 1
+            try:
+                self.inbox.get_nowait()
+            except queue.Empty:
+                pass
+            self.inbox.put_nowait(item)
+
+    def reset(self, detector):
+        """Replace the detector from the GUI thread; batches submitted before the reset are dropped."""
+        self._latest = (self._latest[0] + 1, detector)
+
+    def stop(self):
+        self.running = False
+        self.wait()
+
+    def run(self):
+        while self.running:
+            self._step(timeout=0.2)
+
+    def _step(self, timeout=0.0):
+        """Score everything queued (waiting up to `timeout` for a batch); returns the newest score or None."""
+        try:
+            item = self.inbox.get(timeout=timeout) if timeout else self.inbox.get_nowait()
+        except queue.Empty:
+            return None
+
+        batches = [item]
+        while True:
+            try:
+                batches.append(self.inbox.get_nowait())
+            except queue.Empty:
+                break
+
+        # Checked after draining, so it is at least as new as every batch taken
+        generation, detector = self._latest
+        if generation != self._generation:
+            self._generation, self.detector = generation, detector
+        # Samples queued before a reset belong to the previous mission
+        batches = [X for gen, X in batches if gen == self._generation]
+        if not batches:
+            return None
+
+        X = np.vstack(batches)
+        try:
+            with profiler.stage("detector.score"):
+                scores = self.detector.process(X)
+        except Exception as e:
+            print("[DetectorWorker] Error scoring batch:", e)
+            return None
+        score = float(scores[-1])
+        self.score_ready.emit(score)
+        return score
@@ -0,0 +1,343 @@
+"""Stand-in for the robot: speaks the sketch_apr25a serial protocol on a pty.
+
+    python -m utils.firmware_emulator --rate 50 --link /tmp/jellybot
+
+prints the pseudo-terminal to open (set SERIAL_PORT to it, or to --link)
+and then behaves like the ESP32: "Key:value" telemetry lines, or binary
+frames after "BIN", with the IMU at --rate and the environment sensors at
+--env-rate (NaN in the frames between their readings); SNAP/LEFT/RIGHT replies; photos taken from
+captured_photos (raw PHOTO_START/PHOTO_END in text mode, chunked with
+PHOTO_RESEND/PHOTO_ACK in binary mode). Output is paced to the configured
+baud rate, and --jitter, --corrupt and --drop make the link imperfect;
+--boot ignores commands for that long after opening, like the ESP32 resetting
+on DTR before it prints "Ready".
+"""
+import argparse
+import glob
+import math
+import os
+import select
+import time
+import tty
+
+import numpy as np
+from settings import PHOTO_DIR
+from utils.telemetry_queue import CHANNEL_GROUPS
+from utils.protocol import (FRAME_TELEMETRY, FRAME_TEXT, FRAME_PHOTO_HEADER, FRAME_PHOTO_CHUNK,
+                            PHOTO_HEADER, PHOTO_CHUNK, TELEMETRY_PAYLOAD_DTYPE, encode_frame)
+
+# Same limits as the firmware
+PHOTO_CHUNK_SIZE = 200
+PHOTO_HOLD_S = 30.0
+BITS_PER_BYTE = 10   # 8N1: start + 8 data + stop
+
+
+class FirmwareEmulator:
+    def __init__(self, rate_hz=100.0, baud=115200, jitter_ms=0.0, corrupt=0.0, drop=0.0,
+                 photo_dir=PHOTO_DIR, snap_delay=2.0, seed=None, env_rate_hz=1.0, boot_s=0.0):
+        self.period = 1.0 / rate_hz
+        self.env_period = 1.0 / env_rate_hz
+        self.baud = baud
+        self.jitter = jitter_ms / 1000.0
+        self.corrupt = corrupt
+        self.drop = drop
+        self.snap_delay = snap_delay
+        self.rng = np.random.default_rng(seed)
+        self.photos = sorted(glob.glob(os.path.join(photo_dir, "*.jpg")))
+
+        self.master, self.slave = os.openpty()
+        tty.setraw(self.slave)         # no newline translation or echo on the robot side
+        os.set_blocking(self.master, False)
+        self.port = os.ttyname(self.slave)
+
+        self.running = True
+        self.binary = False
+        self.seq = 0
+        self.servo = 90
+        self.t0 = time.monotonic()
+        self._booted = self.t0 + boot_s      # commands before this are lost, as during a reset
+        self._cmd = bytearray()
+        self._line_free = time.monotonic()   # when the emulated UART finishes its backlog
+        self._snap_at = None
+        self._env_at = time.monotonic()      # next temperature/TDS/flex reading
+        self._photo = None                   # binary photo transfer in progress
+        self._photo_id = 0
+
+        # Counters reported by stats()
+        self.samples = 0
+        self.bytes_sent = 0
+        self.bytes_dropped = 0
+
+    # -- public -----------------------------------------------------------
+    def run(self):
+        while self.running and time.monotonic() < self._booted:
+            self._poll_commands(self._booted - time.monotonic())
+        self._write_text("Ready")
+        next_sample = time.monotonic()
+        busy = False
+        photo_slot = False   # like the firmware: at most one photo chunk per IMU frame
+        while self.running:
+            # Commands are served every pass, like pollSerial() in the sketch's loop
+            self._poll_commands(0.0 if busy else min(next_sample - time.monotonic(), 0.01))
+            now = time.monotonic()
+            busy = True
+            if now >= next_sample:
+                self._send_sample()
+                photo_slot = True
+                next_sample += self.period + (self.rng.normal(0.0, self.jitter) if self.jitter else 0.0)
+                if next_sample < now - 1.0:
+                    next_sample = now   # link too slow for the rate: don't try to catch up
+            elif self._snap_at is not None and now >= self._snap_at:
+                self._snap_at = None
+                self._take_photo()
+            elif photo_slot:
+                busy = self._pump_photo()
+                photo_slot = False
+            else:
+                busy = False
+
+    def stop(self):
+        self.running = False
+
+    def close(self):
+        os.close(self.master)
+        os.close(self.slave)
+
+    def stats(self):
+        elapsed = time.monotonic() - self.t0
+        return {
+            "samples": self.samples,
+            "rate_hz": self.samples / elapsed if elapsed else 0.0,
+            "bytes_sent": self.bytes_sent,
+            "throughput_Bps": self.bytes_sent / elapsed if elapsed else 0.0,
+            "bytes_dropped": self.bytes_dropped,
+        }
+
+    # -- telemetry ----------------------------------------------------------
+    def _sample(self):
+        """One reading in CHANNELS units, with a slow roll so the attitude moves."""
+        t = time.monotonic() - self.t0
+        n = self.rng.normal
+        roll, pitch = 0.4 * math.sin(0.3 * t), 0.2 * math.sin(0.17 * t)
+        return {
+            "Temperature_C": 4.0 + 0.5 * math.sin(0.01 * t) + n(0, 0.02),
+            "TDS_ppm": 200.0 + n(0, 5.0),
+            "Flex Voltage": 1.2 + 0.3 * math.sin(0.5 * t) + n(0, 0.01),
+            "GyroX": math.degrees(0.12 * math.cos(0.3 * t)) + n(0, 0.5),
+            "GyroY": math.degrees(0.034 * math.cos(0.17 * t)) + n(0, 0.5),
+            "GyroZ": n(0, 0.5),
+            "AccelX": -math.sin(pitch) + n(0, 0.01),
+            "AccelY": math.sin(roll) * math.cos(pitch) + n(0, 0.01),
+            "AccelZ": math.cos(roll) * math.cos(pitch) - 0.91 + n(0, 0.01),  # firmware offset
+        }
+
+    def _send_sample(self):
+        d = self._sample()
+        self.samples += 1
+        now = time.monotonic()
+        env = now >= self._env_at
+        if env:
+            self._env_at = max(self._env_at + self.env_period, now - self.env_period)
+        if self.binary:
+            p = np.zeros(1, dtype=TELEMETRY_PAYLOAD_DTYPE)
+            p["millis"] = int((time.monotonic() - self.t0) * 1000) & 0xFFFFFFFF
+            for k, v in d.items():
+                p[k] = v
+            if not env:
+                for k in CHANNEL_GROUPS["env"]:
+                    p[k] = np.nan
+            self._write_frame(FRAME_TELEMETRY, p.tobytes())
+            return
+
+        # Same lines, order and precision as the sketch (including the keys the UI ignores)
+        lines = []
+        if env:
+            volts = d["TDS_ppm"] / 600.0
+            flex = d["Flex Voltage"] * 4095 / 3.3
+            lines = [
+                f"Temperature_C:{d['Temperature_C']:.2f}",
+                f"TDS_ADC:{int(volts * 4095 / 3.3)}",
+                f"Voltage:{volts:.2f}",
+                f"TDS_ppm:{d['TDS_ppm']:.2f}",
+                f"Flex Value:{flex:.2f}",
+                f"Flex Voltage:{d['Flex Voltage']:.2f}",
+            ]
+        lines += [f"{k}:{d[k]:.2f}" for k in ("AccelX", "AccelY", "AccelZ", "GyroX", "GyroY", "GyroZ")]
+        for line in lines:
+            self._write_text(line)
+
+    # -- commands -----------------------------------------------------------
+    def _poll_commands(self, timeout):
+        ready, _, _ = select.select([self.master], [], [], max(timeout, 0.0))
+        if not ready:
+            return
+        try:
+            self._cmd += os.read(self.master, 4096)
+        except OSError:
+            return
+        if time.monotonic() < self._booted:
+            self._cmd.clear()
+            return
+        while b"\n" in self._cmd:
+            line, _, rest = bytes(self._cmd).partition(b"\n")
+            self._cmd = bytearray(rest)
+            self._handle_command(line.decode("utf-8", errors="ignore").strip())
+
+    def _handle_command(self, cmd):
+        if cmd == "BIN":
+            self._write_text("BIN_OK")
+            self.binary = True
+        elif cmd == "TXT":
+            self._reply("TXT_OK")
+            self.binary = False
+        elif cmd == "SNAP":
+            self._reply("SNAP command received, taking photo...")
+            self._snap_at = time.monotonic() + self.snap_delay
+        elif cmd.startswith("PHOTO_RESEND "):
+            self._photo_resend(cmd.split()[1:])
+        elif cmd.startswith("PHOTO_ACK "):
+            if self._photo and int(cmd.split()[1]) == self._photo["id"]:
+                self._photo = None
+        elif cmd == "LEFT":
+            self.servo = max(self.servo - 15, 0)
+            self._reply(f"Servo turned left to: {self.servo}")
+        elif cmd == "RIGHT":
+            self.servo = min(self.servo + 15, 180)
+            self._reply(f"Servo turned right to: {self.servo}")
+
+    # -- photos -------------------------------------------------------------
+    def _take_photo(self):
+        if not self.photos:
+            self._reply("Camera capture failed")
+            return
+        with open(self.photos[self.rng.integers(len(self.photos))], "rb") as f:
+            data = f.read()
+
+        if not self.binary:
+            self._write_text("PHOTO_START")
+            self._write(data)
+            self._write(b"\n")   # println("\nPHOTO_END")
+            self._write_text("PHOTO_END")
+            return
+
+        n = (len(data) + PHOTO_CHUNK_SIZE - 1) // PHOTO_CHUNK_SIZE
+        self._photo_id = (self._photo_id + 1) & 0xFFFF
+        self._photo = {"id": self._photo_id, "data": data, "pending": np.ones(n, dtype=bool),
+                       "cursor": 0, "activity": time.monotonic()}
+        self._photo_header()
+
+    def _photo_header(self):
+        p = self._photo
+        self._write_frame(FRAME_PHOTO_HEADER, PHOTO_HEADER.pack(
+            p["id"], len(p["data"]), PHOTO_CHUNK_SIZE, len(p["pending"])))
+
+    def _pump_photo(self):
+        """Send the next pending chunk; returns False when there is nothing to send."""
+        p = self._photo
+        if p is None:
+            return False
+        if time.monotonic() - p["activity"] > PHOTO_HOLD_S:
+            self._photo = None   # host went away
+            return False
+        pending = np.flatnonzero(np.roll(p["pending"], -p["cursor"]))
+        if not len(pending):
+            return False
+        i = (int(pending[0]) + p["cursor"]) % len(p["pending"])
+        chunk = p["data"][i * PHOTO_CHUNK_SIZE:(i + 1) * PHOTO_CHUNK_SIZE]
+        self._write_frame(FRAME_PHOTO_CHUNK, PHOTO_CHUNK.pack(p["id"], i) + chunk)
+        p["pending"][i] = False
+        p["cursor"] = i + 1
+        return True
+
+    def _photo_resend(self, args):
+        p = self._photo
+        if p is None or not args or int(args[0]) != p["id"]:
+            return
+        p["activity"] = time.monotonic()
+        if len(args) == 1:
+            self._photo_header()
+        for i in args[1:]:
+            if 0 <= int(i) < len(p["pending"]):
+                p["pending"][int(i)] = True
+
+    # -- output -------------------------------------------------------------
+    def _reply(self, text):
+        if self.binary:
+            self._write_frame(FRAME_TEXT, text.encode("utf-8")[:255])
+        else:
+            self._write_text(text)
+
+    def _write_text(self, line):
+        if self.drop and self.rng.random() < self.drop:
+            return
+        self._write(line.encode() + b"\r\n")
+
+    def _write_frame(self, frame_type, payload):
+        frame = encode_frame(frame_type, self.seq, payload)
+        self.seq += 1   # dropped frames still use up a sequence number, like a lost UART frame
+        if self.drop and self.rng.random() < self.drop:
+            return
+        self._write(frame)
+
+    def _write(self, data):
+        if self.corrupt:
+            flips = np.flatnonzero(self.rng.random(len(data)) < self.corrupt)
+            if len(flips):
+                data = bytearray(data)
+                for i in flips:
+                    data[i] ^= 1 << int(self.rng.integers(8))
+
+        # Pace output like a UART at `baud`
+        now = time.monotonic()
+        if self._line_free > now:
+            time.sleep(self._line_free - now)
+        self._line_free = max(self._line_free, now) + len(data) * BITS_PER_BYTE / self.baud
+
+        try:
+            self.bytes_sent += os.write(self.master, data)
+        except BlockingIOError:
+            self.bytes_dropped += len(data)   # nobody is reading: the bytes go nowhere, as on the robot
+        except OSError:
+            self.bytes_dropped += len(data)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Emulate the JellyBot firmware on a pseudo-terminal")
+    ap.add_argument("--rate", type=float, default=100.0, help="IMU samples per second (firmware: 100)")
+    ap.add_argument("--env-rate", type=float, default=1.0,
+                    help="temperature/TDS/flex readings per second (firmware: 1)")
+    ap.add_argument("--baud", type=int, default=115200, help="emulated UART speed")
+    ap.add_argument("--jitter", type=float, default=0.0, help="sample period jitter, std dev in ms")
+    ap.add_argument("--corrupt", type=float, default=0.0, help="probability of a bit flip per byte")
+    ap.add_argument("--drop", type=float, default=0.0, help="probability of dropping a line or frame")
+    ap.add_argument("--photos", default=PHOTO_DIR, help="directory of JPEGs returned by SNAP")
+    ap.add_argument("--snap-delay", type=float, default=2.0, help="seconds between SNAP and the photo")
+    ap.add_argument("--seed", type=int, default=None)
+    ap.add_argument("--boot", type=float, default=0.0, help="seconds of reset after opening; commands are lost")
+    ap.add_argument("--link", help="also expose the port under this path (symlink)")
+    args = ap.parse_args(argv)
+
+    emu = FirmwareEmulator(args.rate, args.baud, args.jitter, args.corrupt, args.drop,
+                           args.photos, args.snap_delay, args.seed, args.env_rate,
+                           args.boot)
+    port = emu.port
+    if args.link:
+        if os.path.islink(args.link):
+            os.remove(args.link)
+        os.symlink(emu.port, args.link)
+        port = args.link
+    print(f"[FirmwareEmulator] Listening on {port} ({args.rate:g} Hz IMU, {args.env_rate:g} Hz env, {args.baud} baud, "
+          f"{len(emu.photos)} photos)")
+    try:
+        emu.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print("[FirmwareEmulator]", emu.stats())
+        if args.link and os.path.islink(args.link):
+            os.remove(args.link)
+        emu.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+import re
+
+import numpy as np
+from utils.protocol import (SYNC, HEADER, CRC, OVERHEAD, FRAME_TELEMETRY, FRAME_TEXT,
+                            TELEMETRY_FRAME_DTYPE, TELEMETRY_FRAME_SIZE, crc16)
+
+PHOTO_START = b"PHOTO_START"
+PHOTO_END = b"PHOTO_END"
+
+# Events emitted by FrameParser.feed()
+EVENT_LINE = "line"
+EVENT_PHOTO = "photo"
+EVENT_FRAMES = "frames"   # payload: structured array of TELEMETRY_FRAME_DTYPE
+EVENT_BINARY = "binary"   # payload: (frame type, payload bytes) for other frame types
+
+MODE_TEXT = "text"
+MODE_BINARY = "binary"
+
+# Binary mode falls back to text after this many bytes without a valid frame,
+# or as soon as the skipped bytes hold a clean text line (robot reset, old firmware)
+TEXT_FALLBACK_BYTES = 512
+TEXT_LINE = re.compile(rb"[\x20-\x7e]{4,}\r\n")
+TEXT_CHARS = bytes(range(0x20, 0x7f)) + b"\r"
+TEXT_TAIL_BYTES = 80
+
+
+class FrameParser:
+    """Incremental parser for the robot's serial stream: text lines, binary frames (utils.protocol), photos."""
+
+    def __init__(self):
+        self.buf = bytearray()
+        self.mode = MODE_TEXT
+        self.in_photo_mode = False
+        self._scan = 0      # next offset to search from
+        self._photo_start = 0
+
+        # Link statistics (binary mode)
+        self.last_seq = None
+        self.lost_frames = 0
+        self.crc_errors = 0
+        self.skipped_bytes = 0
+        self._garbage = 0   # bytes skipped since the last valid frame (binary mode)
+
+    def feed(self, data):
+        """Append raw bytes and return the list of completed (kind, payload) events."""
+        self.buf += data
+        events = []
+        telemetry = []      # offsets of valid telemetry frames, decoded in bulk below
+        pos = 0
+        while True:
+            if self.in_photo_mode:
+                end = self.buf.find(PHOTO_END, self._scan)
+                if end < 0:
+                    # Keep the tail so a sentinel split across reads is still found
+                    self._scan = max(self._photo_start, len(self.buf) - len(PHOTO_END) + 1)
+                    break
+                events.append((EVENT_PHOTO, bytes(memoryview(self.buf)[self._photo_start:end])))
+                self.in_photo_mode = False
+                pos = self._scan = end + len(PHOTO_END)
+            elif self.mode == MODE_BINARY:
+                pos, complete = self._scan_frame(pos, events, telemetry)
+                if not complete:
+                    break
+            else:
+                nl = self.buf.find(b"\n", self._scan)
+                sync = self.buf.find(SYNC, self._scan, nl if nl >= 0 else len(self.buf))
+                if sync >= 0:
+                    valid = self._frame_at(sync)
+                    if valid is None:
+                        self._scan = sync  # wait for the rest of the candidate frame
+                        break
+                    if valid:
+                        self.mode = MODE_BINARY  # robot is already talking binary
+                        self._garbage = 0
+                        self.skipped_bytes += sync - pos
+                        pos = self._scan = sync
+                    else:
+                        self._scan = sync + 1  # noise that happens to contain a sync word
+                    continue
+                if nl < 0:
+                    # Keep a trailing A5 in view: it may start a sync word
+                    self._scan = max(pos, len(self.buf) - 1)
+                    break
+                line = bytes(memoryview(self.buf)[pos:nl]).decode("utf-8", errors="ignore").strip()
+                pos = self._scan = nl + 1
+                self._handle_text(line, pos, events)
+
+        if telemetry:
+            # Telemetry decoded in this read is reported ahead of any text or photo events
+            events.insert(0, (EVENT_FRAMES, self._decode(telemetry)))
+        self._compact(pos)
+        return events
+
+    def abort_photo(self):
+        """Leave photo mode and return whatever photo bytes were received so far."""
+        data = bytes(memoryview(self.buf)[self._photo_start:])
+        self.buf.clear()
+        self.in_photo_mode = False
+        self._scan = self._photo_start = 0
+        return data
+
+    def stats(self):
+        return {
+            "mode": self.mode,
+            "lost_frames": self.lost_frames,
+            "crc_errors": self.crc_errors,
+            "skipped_bytes": self.skipped_bytes,
+        }
+
+    # ------------------------------------------------------------------
+    def _handle_text(self, line, pos, events):
+        if line == "PHOTO_START":
+            self.in_photo_mode = True
+            self._photo_start = pos
+        elif line == "BIN_OK":
+            self.mode = MODE_BINARY
+            self._garbage = 0
+        elif line == "TXT_OK":
+            self.mode = MODE_TEXT
+        elif line:
+            events.append((EVENT_LINE, line))
+
+    def _frame_at(self, start):
+        """Whether a CRC-valid frame starts at `start`; None until enough bytes are in."""
+        if len(self.buf) - start < HEADER.size:
+            return None
+        length = self.buf[start + 3]
+        end = start + length + OVERHEAD
+        if len(self.buf) < end:
+            return None
+        (crc,) = CRC.unpack_from(self.buf, end - CRC.size)
+        return crc16(self.buf[start + 2:end - CRC.size]) == crc
+
+    def _skip(self, pos, end):
+        """Drop non-frame bytes [pos, end) in binary mode. Returns True if the parser fell back to text."""
+        text = TEXT_LINE.search(self.buf, pos, end)
+        self._garbage += end - pos
+        if text is None and self._garbage < TEXT_FALLBACK_BYTES:
+            self.skipped_bytes += end - pos
+            return False
+        at = text.start() if text else pos
+        self.skipped_bytes += at - pos
+        self.mode = MODE_TEXT
+        self._scan = at
+        self._garbage = 0
+        return True
+
+    def _scan_frame(self, pos, events, telemetry):
+        """Consume one binary frame at or after `pos`. Returns (new_pos, complete)."""
+        start = self.buf.find(SYNC, pos)
+        if start < 0:
+            # Keep a trailing A5 in case it is the first half of a sync word,
+            # and a trailing run of text in case it is the start of a line
+            if self.buf.endswith(SYNC[:1]):
+                keep = 1
+            else:
+                tail = bytes(self.buf[max(pos, len(self.buf) - TEXT_TAIL_BYTES):])
+                keep = len(tail) - len(tail.rstrip(TEXT_CHARS))
+            if self._skip(pos, len(self.buf) - keep):
+                return self._scan, True
+            self._scan = len(self.buf) - keep
+            return len(self.buf) - keep, False
+        if start > pos and self._skip(pos, start):
+            return self._scan, True
+        if len(self.buf) - start < HEADER.size:
+            self._scan = start
+            return start, False
+
+        _, frame_type, length, seq = HEADER.unpack_from(self.buf, start)
+        end = start + length + OVERHEAD
+        if len(self.buf) < end:
+            self._scan = start
+            return start, False
+
+        (crc,) = CRC.unpack_from(self.buf, end - CRC.size)
+        if crc16(self.buf[start + 2:end - CRC.size]) != crc:
+            # Not a frame after all (or corrupted): resync one byte later
+            self.crc_errors += 1
+            self._scan = start + 1
+            return start + 1, True
+
+        self._track_seq(seq)
+        self._garbage = 0
+        payload_at = start + HEADER.size
+        if frame_type == FRAME_TELEMETRY and length + OVERHEAD == TELEMETRY_FRAME_SIZE:
+            telemetry.append(start)
+        elif frame_type == FRAME_TEXT:
+            text = bytes(self.buf[payload_at:payload_at + length]).decode("utf-8", errors="ignore").strip()
+            self._handle_text(text, end, events)
+        else:
+            events.append((EVENT_BINARY, (frame_type, bytes(self.buf[payload_at:payload_at + length]))))
+        self._scan = end
+        return end, True
+
+    def _track_seq(self, seq):
+        if self.last_seq is not None:
+            self.lost_frames += (seq - self.last_seq - 1) & 0xFFFF
+        self.last_seq = seq
+
+    def _decode(self, offsets):
+        raw = np.frombuffer(self.buf, dtype=np.uint8)
+        idx = np.asarray(offsets)[:, None] + np.arange(TELEMETRY_FRAME_SIZE)
+        frames = raw[idx].view(TELEMETRY_FRAME_DTYPE).ravel()
+        del raw  # release the buffer export so the bytearray can be compacted
+        return frames
+
+    def _compact(self, pos):
+        # Drop consumed bytes once per feed instead of once per frame
+        if pos:
+            del self.buf[:pos]
+            self._scan -= pos
+            if self.in_photo_mode:
+                self._photo_start -= pos
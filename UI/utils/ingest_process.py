@@ -0,0 +1,154 @@
+"""Serial ingest in a separate process (INGEST_PROCESS).
+
+The child runs SerialReader on its own interpreter and GIL and publishes
+frames into a SharedTelemetryRing created by the GUI process. Everything
+else on its bus (photos, robot replies, link stats) is low-rate and is
+relayed as JSON lines on its stdout; commands go the other way on its
+stdin, and closing stdin stops it. The child is started with
+`python -m utils.ingest_process` rather than multiprocessing, so it never
+re-imports the GUI.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+
+from settings import SERIAL_PORT, SERIAL_BAUDRATE, TELEMETRY_RING_SIZE, PHOTO_DIR
+from utils.bus import TOPIC_TELEMETRY, TOPIC_PHOTO, TOPIC_ACK, TOPIC_LINK
+from utils.shm_ring import SharedTelemetryRing
+
+UI_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class IngestProcess:
+    """Drop-in for SerialReader that reads the link in a child process. `telemetry` is the shared ring the
+    child fills; other topics are republished on `bus`."""
+
+    def __init__(self, bus, port=SERIAL_PORT, baudrate=SERIAL_BAUDRATE, capacity=TELEMETRY_RING_SIZE,
+                 photo_dir=PHOTO_DIR):
+        self.bus = bus
+        self.port = port
+        self.baudrate = baudrate
+        self.photo_dir = photo_dir
+        self.telemetry = SharedTelemetryRing(capacity=capacity)
+        self.proc = None
+        self.lock = threading.Lock()
+        self._relay = threading.Thread(target=self._relay_events, daemon=True)
+
+    def start(self):
+        path = [UI_DIR] + ([os.environ["PYTHONPATH"]] if os.environ.get("PYTHONPATH") else [])
+        self.proc = subprocess.Popen(
+            [sys.executable, "-m", "utils.ingest_process", "--shm", self.telemetry.name,
+             "--port", str(self.port), "--baud", str(self.baudrate), "--photos", self.photo_dir],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            env=dict(os.environ, PYTHONPATH=os.pathsep.join(path)),
+        )
+        self._relay.start()
+        print(f"[IngestProcess] Reading {self.port} in process {self.proc.pid}")
+
+    def send_command(self, command):
+        try:
+            with self.lock:
+                self.proc.stdin.write((command + "\n").encode())
+                self.proc.stdin.flush()
+        except (OSError, ValueError) as e:
+            print("[IngestProcess] Send error:", e)
+
+    def stop(self):
+        if self.proc is None:
+            return
+        try:
+            with self.lock:
+                self.proc.stdin.close()   # EOF: the child closes the port and exits
+        except OSError:
+            pass
+        try:
+            self.proc.wait(timeout=3)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+            self.proc.wait()
+        self._relay.join(timeout=1)
+        self.telemetry.close()
+
+    def _relay_events(self):
+        for line in self.proc.stdout:
+            try:
+                topic, item = json.loads(line)
+                self.bus.publish(topic, item)
+            except (ValueError, KeyError, TypeError) as e:
+                print("[IngestProcess] Bad event from ingest process:", e)
+        code = self.proc.wait()
+        if code:
+            print(f"[IngestProcess] Ingest process exited with code {code}")
+
+
+class _Relay:
+    """Bus subscriber in the child that writes each item to the parent as a JSON line."""
+
+    def __init__(self, topic, out, lock, photo_dir):
+        self.topic = topic
+        self.out = out
+        self.lock = lock
+        self.photo_dir = photo_dir
+        self.relayed = 0
+
+    def offer(self, item):
+        if isinstance(item, bytes):
+            item = _save_photo(item, self.photo_dir, self.relayed)
+        with self.lock:
+            self.out.write(json.dumps([self.topic, item]) + "\n")
+            self.out.flush()
+        self.relayed += 1
+
+    def fill(self):
+        return 0.0
+
+    def stats(self):
+        return {"relayed": self.relayed}
+
+
+def _save_photo(data, photo_dir, n):
+    # Text-mode photos arrive as bytes; hand the GUI a path like chunked transfers do
+    os.makedirs(photo_dir, exist_ok=True)
+    path = os.path.join(photo_dir, f"incoming_text_{os.getpid()}_{n}.jpg")
+    with open(path, "wb") as f:
+        f.write(data)
+    return path
+
+
+def main(argv=None):
+    from utils.bus import Bus
+    from utils.serial_reader import open_reader
+
+    parser = argparse.ArgumentParser(description="JellyBot serial ingest process (started by IngestProcess).")
+    parser.add_argument("--shm", required=True, help="name of the SharedTelemetryRing to fill")
+    parser.add_argument("--port", default=SERIAL_PORT)
+    parser.add_argument("--baud", type=int, default=SERIAL_BAUDRATE)
+    parser.add_argument("--photos", default=PHOTO_DIR, help="directory for received photos")
+    args = parser.parse_args(argv)
+
+    out = sys.stdout
+    sys.stdout = sys.stderr   # log prints must not end up in the event stream
+
+    ring = SharedTelemetryRing(args.shm)
+    bus = Bus()
+    bus.subscribe(TOPIC_TELEMETRY, ring)
+    lock = threading.Lock()
+    for topic in (TOPIC_PHOTO, TOPIC_ACK, TOPIC_LINK):
+        bus.subscribe(topic, _Relay(topic, out, lock, args.photos))
+
+    reader = open_reader(bus, args.port, args.baud, args.photos)
+    reader.start()
+    for line in sys.stdin:
+        if line.strip():
+            reader.send_command(line.strip())
+    reader.stop()
+    reader.join(timeout=2.0)
+    ring.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,25 +1,184 @@
-from sklearn.ensemble import IsolationForest
+import abc
 import numpy as np
+import threading
+from settings import (DETECTOR_BACKEND, ZSCORE_HALFLIFE, ZSCORE_WARMUP, ZSCORE_RANGE,
+                      DETECTOR_WINDOW, DETECTOR_MIN_SAMPLES, DETECTOR_REFIT_EVERY,
+                      DETECTOR_DRIFT_SPAN, DETECTOR_DRIFT_Z)
+from utils.telemetry_queue import forward_fill
 
-from sklearn.ensemble import IsolationForest
-import numpy as np
+# Telemetry channels fed to the detectors, in feature-vector order
+FEATURES = ["Temperature_C", "TDS_ppm", "AccelX", "AccelY", "AccelZ", "GyroX", "GyroY", "GyroZ"]
+
+
+def features(frames):
+    """(n, 8) float64 feature matrix from telemetry frames; channels a frame did not sample are NaN."""
+    return np.column_stack([frames[k] for k in FEATURES]).astype(np.float64)
+
+
+class BaseDetector(abc.ABC):
+    """Interest detector: predict_interest() goes from 0.0 (normal) to 1.0 (very interesting)."""
+
+    _carried = None   # latest value of each feature, for the as-of join
+
+    @abc.abstractmethod
+    def add_sample(self, sample, fresh=None):
+        pass
+
+    @abc.abstractmethod
+    def predict_interest(self, sample):
+        pass
 
-class LifeDetector:
-    def __init__(self):
-        self.model = IsolationForest(contamination=0.05, random_state=42)
-        self.X = []
+    def add_batch(self, X, fresh=None):
+        for i, sample in enumerate(X):
+            self.add_sample(sample, None if fresh is None else fresh[i])
+
+    def process(self, X):
+        """Learn from and score a batch of features() rows; returns one score per row. Missing channels are
+        filled with their latest value; rows before every channel was seen score 0."""
+        if self._carried is None:
+            self._carried = np.full(X.shape[1], np.nan)
+        joined = forward_fill(X, self._carried)
+        if len(joined):
+            self._carried = joined[-1]
+        ready = ~np.isnan(joined).any(axis=1)
+        scores = np.zeros(len(X))
+        if ready.any():
+            self.add_batch(joined[ready], ~np.isnan(X[ready]))
+            scores[ready] = self.score_batch(joined[ready])
+        return scores
+
+    def score_batch(self, X):
+        """Interest for each row of X; backends override this with a vectorized version."""
+        return np.array([self.predict_interest(sample) for sample in X])
+
+
+class LifeDetector(BaseDetector):
+    """IsolationForest over a sliding window of recent samples, refit on a background thread."""
+
+    def __init__(self, window=DETECTOR_WINDOW, refit_every=DETECTOR_REFIT_EVERY):
+        self.X = np.zeros((window, len(FEATURES)))
+        self.window = window
+        self.refit_every = refit_every
+        self.count = 0          # samples seen in total
+        self.since_fit = 0      # samples since the last refit started
+        self.model = None
         self.is_fitted = False
+        self.fit_stats = None   # (mean, std) of the current model's training data
+        self.recent_mean = None
+        self.refits = 0
+        self._refit_thread = None
+
+    def add_sample(self, sample, fresh=None):
+        self.add_batch(np.asarray(sample, dtype=float)[None, :])
+
+    def add_batch(self, X, fresh=None):
+        # The forest learns the joined rows it will score, so `fresh` is not needed
+        X = np.asarray(X, dtype=float)[-self.window:]
+        n = len(X)
+        pos = self.count % self.window
+        first = min(n, self.window - pos)
+        self.X[pos:pos + first] = X[:first]
+        self.X[:n - first] = X[first:]
+        self.count += n
+        self.since_fit += n
+
+        # Exponential mean of recent samples, compared against the training data for drift
+        a = min(1.0, n / DETECTOR_DRIFT_SPAN)
+        batch_mean = X.mean(axis=0)
+        self.recent_mean = batch_mean if self.recent_mean is None else self.recent_mean + a * (batch_mean - self.recent_mean)
 
-    def add_sample(self, sample):
-        self.X.append(sample)
-        if len(self.X) > 30 and not self.is_fitted:
-            self.model.fit(self.X)
-            self.is_fitted = True
+        if self.count > DETECTOR_MIN_SAMPLES and (
+                not self.is_fitted or self.since_fit >= self.refit_every or self._drifted()):
+            self._start_refit()
 
     def predict_interest(self, sample):
-        if not self.is_fitted:
-            return 0.0  # Model not ready yet
-        pred = self.model.decision_function([sample])[0]
-        interestingness = 1.0 - (pred + 0.5)  # Normalize
-        return max(0.0, min(1.0, interestingness))
+        return float(self.score_batch(np.asarray(sample, dtype=float)[None, :])[0])
+
+    def score_batch(self, X):
+        model = self.model  # take one reference; a refit may swap it at any time
+        if model is None:
+            return np.zeros(len(X))  # Model not ready yet
+        # One decision_function call for the whole batch
+        pred = model.decision_function(X)
+        return np.clip(1.0 - (pred + 0.5), 0.0, 1.0)  # Normalize
+
+    def _drifted(self):
+        stats = self.fit_stats
+        if stats is None or self.since_fit < DETECTOR_DRIFT_SPAN:
+            return False
+        mean, std = stats
+        return np.max(np.abs(self.recent_mean - mean) / std) > DETECTOR_DRIFT_Z
+
+    def _start_refit(self):
+        if self._refit_thread is not None and self._refit_thread.is_alive():
+            return  # one fit at a time; the next trigger will pick up newer data
+        snapshot = self.X[:min(self.count, self.window)].copy()
+        self.since_fit = 0
+        self._refit_thread = threading.Thread(target=self._refit, args=(snapshot,), daemon=True)
+        self._refit_thread.start()
+
+    def _refit(self, X):
+        from sklearn.ensemble import IsolationForest  # heavy; only needed once there is data
+        model = IsolationForest(contamination=0.05, random_state=42)
+        model.fit(X)
+        self.fit_stats = (X.mean(axis=0), np.maximum(X.std(axis=0), 1e-3))
+        self.model = model  # atomic swap
+        self.is_fitted = True
+        self.refits += 1
+
+
+class StreamingZScoreDetector(BaseDetector):
+    """Robust z-scores against exponentially weighted per-feature baselines."""
+
+    CLIP = 3.0
+
+    def __init__(self, halflife=ZSCORE_HALFLIFE, warmup=ZSCORE_WARMUP):
+        self.alpha = 1.0 - 0.5 ** (1.0 / halflife)
+        self.warmup = warmup
+        self.n = None       # samples seen, per feature
+        self.loc = None
+        self.spread = None
+
+    def add_sample(self, sample, fresh=None):
+        x = np.asarray(sample, dtype=float)
+        fresh = np.ones(len(x), dtype=bool) if fresh is None else np.asarray(fresh, dtype=bool)
+        if self.loc is None:
+            self.n = np.ones(len(x))
+            self.loc = x.copy()
+            self.spread = np.zeros_like(x)
+            return
+
+        self.n += fresh
+        # Plain running averages during warm-up, exponential forgetting afterwards
+        a = np.maximum(self.alpha, 1.0 / self.n) * fresh
+        limit = self.CLIP * self._scale()
+        x = np.where(self.n > self.warmup, np.clip(x, self.loc - limit, self.loc + limit), x)
+        dev = np.abs(x - self.loc)
+        self.loc += a * (x - self.loc)
+        self.spread += a * (dev - self.spread)
+
+    def predict_interest(self, sample):
+        return float(self.score_batch(np.asarray(sample, dtype=float)[None, :])[0])
+
+    def score_batch(self, X):
+        if self.n is None:
+            return np.zeros(len(X))
+        z = np.abs(np.asarray(X, dtype=float) - self.loc) / self._scale()
+        z[:, self.n <= self.warmup] = 0.0   # baseline not ready yet
+        lo, hi = ZSCORE_RANGE
+        return np.clip((z.max(axis=1) - lo) / (hi - lo), 0.0, 1.0)
+
+    def _scale(self):
+        # 1.25 * mean absolute deviation ~ standard deviation for Gaussian noise
+        return np.maximum(1.25 * self.spread, 1e-3)
+
+
+DETECTORS = {
+    "isolation_forest": LifeDetector,
+    "zscore": StreamingZScoreDetector,
+}
+
 
+def make_detector(backend=None):
+    """Create the detector selected by DETECTOR_BACKEND (or `backend`)."""
+    return DETECTORS[backend or DETECTOR_BACKEND]()
@@ -0,0 +1,117 @@
+import math
+import numpy as np
+from settings import ORIENTATION_BETA, ACCEL_Z_OFFSET_G, ORIENTATION_MAX_DT
+
+
+class OrientationFilter:
+    """Streaming Madgwick IMU filter (gyro + accelerometer, no magnetometer, so yaw drifts)."""
+
+    def __init__(self, beta=ORIENTATION_BETA):
+        self.beta = beta
+        self.reset()
+
+    def reset(self):
+        self.q = np.array([1.0, 0.0, 0.0, 0.0])
+        self.last_t = None
+
+    def update_batch(self, accel, gyro, t):
+        """Fuse (n, 3) accel in g, (n, 3) gyro in °/s and (n,) host times; returns (n, 4) quaternions. Rows
+        without an IMU reading (NaN) keep the previous attitude."""
+        accel = np.asarray(accel, dtype=float)
+        gyro = np.asarray(gyro, dtype=float)
+        t = np.asarray(t, dtype=float)
+        imu = ~(np.isnan(accel).any(axis=1) | np.isnan(gyro).any(axis=1))
+        if imu.all():
+            return self._fuse(accel, gyro, t)
+
+        before = self.q.copy()
+        fused = self._fuse(accel[imu], gyro[imu], t[imu])
+        # Row of `fused` holding the attitude after each input row; -1 before the first IMU row
+        src = np.maximum.accumulate(np.where(imu, np.cumsum(imu) - 1, -1))
+        return np.vstack([before, fused])[src + 1]
+
+    def _fuse(self, accel, gyro, t):
+        accel = accel.copy()
+        accel[:, 2] += ACCEL_Z_OFFSET_G  # firmware subtracts most of gravity from Z
+        gyro = np.radians(gyro)
+
+        out = np.empty((len(t), 4))
+        if len(t) == 0:
+            return out
+
+        if self.last_t is None:
+            self._init_from_gravity(accel[0])
+            self.last_t = t[0]
+
+        dt = np.diff(t, prepend=self.last_t).clip(0.0, ORIENTATION_MAX_DT)
+        q0, q1, q2, q3 = self.q
+        beta = self.beta
+        # Plain floats in the inner loop: far cheaper than NumPy scalar maths
+        for i, ((ax, ay, az), (gx, gy, gz), h) in enumerate(zip(accel.tolist(), gyro.tolist(), dt.tolist())):
+            q0, q1, q2, q3 = _madgwick_step(q0, q1, q2, q3, gx, gy, gz, ax, ay, az, h, beta)
+            out[i] = q0, q1, q2, q3
+
+        self.q = out[-1].copy()
+        self.last_t = t[-1]
+        return out
+
+    def rotation_matrix(self):
+        return quat_to_matrix(self.q)
+
+    def _init_from_gravity(self, a):
+        # Start level with the measured gravity vector instead of converging from identity
+        norm = np.linalg.norm(a)
+        if norm < 1e-6:
+            return
+        ax, ay, az = a / norm
+        roll = math.atan2(ay, az)
+        pitch = math.atan2(-ax, math.hypot(ay, az))
+        cr, sr = math.cos(roll / 2), math.sin(roll / 2)
+        cp, sp = math.cos(pitch / 2), math.sin(pitch / 2)
+        self.q = np.array([cr * cp, sr * cp, cr * sp, -sr * sp])
+
+
+def _madgwick_step(q0, q1, q2, q3, gx, gy, gz, ax, ay, az, dt, beta):
+    # Rate of change of quaternion from gyroscope
+    qd0 = 0.5 * (-q1 * gx - q2 * gy - q3 * gz)
+    qd1 = 0.5 * (q0 * gx + q2 * gz - q3 * gy)
+    qd2 = 0.5 * (q0 * gy - q1 * gz + q3 * gx)
+    qd3 = 0.5 * (q0 * gz + q1 * gy - q2 * gx)
+
+    norm = math.sqrt(ax * ax + ay * ay + az * az)
+    if norm > 1e-6:
+        ax, ay, az = ax / norm, ay / norm, az / norm
+
+        # Gradient descent corrective step towards the measured gravity direction
+        _2q0, _2q1, _2q2, _2q3 = 2 * q0, 2 * q1, 2 * q2, 2 * q3
+        _4q0, _4q1, _4q2 = 4 * q0, 4 * q1, 4 * q2
+        _8q1, _8q2 = 8 * q1, 8 * q2
+        q0q0, q1q1, q2q2, q3q3 = q0 * q0, q1 * q1, q2 * q2, q3 * q3
+
+        s0 = _4q0 * q2q2 + _2q2 * ax + _4q0 * q1q1 - _2q1 * ay
+        s1 = _4q1 * q3q3 - _2q3 * ax + 4 * q0q0 * q1 - _2q0 * ay - _4q1 + _8q1 * q1q1 + _8q1 * q2q2 + _4q1 * az
+        s2 = 4 * q0q0 * q2 + _2q0 * ax + _4q2 * q3q3 - _2q3 * ay - _4q2 + _8q2 * q1q1 + _8q2 * q2q2 + _4q2 * az
+        s3 = 4 * q1q1 * q3 - _2q1 * ax + 4 * q2q2 * q3 - _2q2 * ay
+        sn = math.sqrt(s0 * s0 + s1 * s1 + s2 * s2 + s3 * s3)
+        if sn > 1e-12:
+            qd0 -= beta * s0 / sn
+            qd1 -= beta * s1 / sn
+            qd2 -= beta * s2 / sn
+            qd3 -= beta * s3 / sn
+
+    q0 += qd0 * dt
+    q1 += qd1 * dt
+    q2 += qd2 * dt
+    q3 += qd3 * dt
+    n = math.sqrt(q0 * q0 + q1 * q1 + q2 * q2 + q3 * q3)
+    return q0 / n, q1 / n, q2 / n, q3 / n
+
+
+def quat_to_matrix(q):
+    """Rotation matrix (body -> world) for a unit quaternion (w, x, y, z)."""
+    w, x, y, z = q
+    return np.array([
+        [1 - 2 * (y * y + z * z), 2 * (x * y - w * z),     2 * (x * z + w * y)],
+        [2 * (x * y + w * z),     1 - 2 * (x * x + z * z), 2 * (y * z - w * x)],
+        [2 * (x * z - w * y),     2 * (y * z + w * x),     1 - 2 * (x * x + y * y)],
+    ])
@@ -0,0 +1,96 @@
+import os
+import time
+import numpy as np
+from settings import PHOTO_DIR, PHOTO_RESEND_AFTER_S, PHOTO_MAX_RETRIES
+from utils.protocol import PHOTO_HEADER, PHOTO_CHUNK
+
+
+class PhotoAssembler:
+    """Reassembles a chunked photo straight into a file, requesting missing chunks with PHOTO_RESEND."""
+
+    MAX_INDICES_PER_REQUEST = 40   # keeps each command line short
+
+    def __init__(self, send_command, on_complete, out_dir=PHOTO_DIR):
+        self.send_command = send_command
+        self.on_complete = on_complete
+        self.out_dir = out_dir
+        self.file = None
+        self.photo_id = None
+        self.received = None
+        self._header_asked = (None, 0.0)   # (photo_id, monotonic time) of the last header request
+
+    def on_header(self, payload):
+        photo_id, size, chunk_size, n_chunks = PHOTO_HEADER.unpack_from(payload)
+        if photo_id == self.photo_id and self.file is not None:
+            return  # header resent on request; keep what we already have
+        if self.file is not None:
+            self._abandon("a new photo started")
+        os.makedirs(self.out_dir, exist_ok=True)
+        self.path = os.path.join(self.out_dir, f"incoming_{photo_id}.part")
+        self.file = open(self.path, "wb")
+        self.file.truncate(size)
+        self.photo_id, self.size, self.chunk_size = photo_id, size, chunk_size
+        self.received = np.zeros(n_chunks, dtype=bool)
+        self.retries = 0         # resend requests since the last new chunk
+        self.resends = 0         # resend requests for this photo
+        self.last_activity = time.monotonic()
+        print(f"[PhotoAssembler] Receiving photo {photo_id}: {size} bytes in {n_chunks} chunks")
+
+    def on_chunk(self, payload):
+        photo_id, index = PHOTO_CHUNK.unpack_from(payload)
+        if self.file is not None and photo_id != self.photo_id:
+            self._abandon(f"photo {photo_id} started")
+        if self.file is None:
+            # Header lost: ask for it again, then the chunks will be resent as needed
+            self._request_header(photo_id)
+            return
+        if index >= len(self.received):
+            return
+        self.last_activity = time.monotonic()
+        if not self.received[index]:
+            self.file.seek(index * self.chunk_size)
+            self.file.write(memoryview(payload)[PHOTO_CHUNK.size:])
+            self.received[index] = True
+            self.retries = 0   # the transfer is moving again
+            if self.received.all():
+                self._finish()
+
+    def poll(self):
+        """Call regularly: requests missing chunks once the transfer has stalled."""
+        if self.file is None or time.monotonic() - self.last_activity < PHOTO_RESEND_AFTER_S:
+            return
+        if self.retries >= PHOTO_MAX_RETRIES:
+            self._abandon("no progress")
+            return
+        missing = np.flatnonzero(~self.received)[:self.MAX_INDICES_PER_REQUEST]
+        self.send_command(f"PHOTO_RESEND {self.photo_id} " + " ".join(map(str, missing)))
+        self.retries += 1
+        self.resends += 1
+        self.last_activity = time.monotonic()
+
+    def _finish(self):
+        self.file.close()
+        self.file = None
+        final = os.path.join(self.out_dir, f"incoming_{self.photo_id}.jpg")
+        os.replace(self.path, final)
+        self.send_command(f"PHOTO_ACK {self.photo_id}")
+        print(f"[PhotoAssembler] Photo {self.photo_id} complete ({self.resends} resend requests)")
+        self.on_complete(final)
+
+    def _request_header(self, photo_id):
+        asked_id, asked_at = self._header_asked
+        if photo_id == asked_id and time.monotonic() - asked_at < PHOTO_RESEND_AFTER_S:
+            return
+        self._header_asked = (photo_id, time.monotonic())
+        self.send_command(f"PHOTO_RESEND {photo_id}")
+
+    def _abandon(self, reason):
+        print(f"[PhotoAssembler] Giving up on photo {self.photo_id} ({reason}): "
+              f"{int((~self.received).sum())} chunks missing")
+        self._close()
+        os.remove(self.path)
+
+    def _close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
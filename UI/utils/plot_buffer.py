@@ -0,0 +1,41 @@
+import numpy as np
+
+
+class PlotRing:
+    """Fixed-size circular buffer for an x axis plus several y channels; view() never copies."""
+
+    def __init__(self, capacity, n_channels, dtype=np.float64):
+        self.capacity = capacity
+        self.x = np.zeros(2 * capacity, dtype=dtype)
+        self.y = np.zeros((n_channels, 2 * capacity), dtype=dtype)
+        self.pos = 0     # next slot to write, in [0, capacity)
+        self.count = 0   # number of valid samples, <= capacity
+
+    def append(self, x, y):
+        """Append a batch: x has shape (n,), y has shape (n_channels, n)."""
+        n = len(x)
+        if n > self.capacity:
+            x, y, n = x[-self.capacity:], y[:, -self.capacity:], self.capacity
+        done = 0
+        while done < n:
+            k = min(n - done, self.capacity - self.pos)
+            a, b = self.pos, self.pos + k
+            self.x[a:b] = self.x[a + self.capacity:b + self.capacity] = x[done:done + k]
+            self.y[:, a:b] = self.y[:, a + self.capacity:b + self.capacity] = y[:, done:done + k]
+            self.pos = b % self.capacity
+            done += k
+        self.count = min(self.count + n, self.capacity)
+
+    def view(self):
+        """Return (x, y) views over the valid samples, oldest first."""
+        if self.count < self.capacity:
+            return self.x[:self.count], self.y[:, :self.count]
+        a, b = self.pos, self.pos + self.capacity
+        return self.x[a:b], self.y[:, a:b]
+
+    def clear(self):
+        self.pos = 0
+        self.count = 0
+
+    def __len__(self):
+        return self.count
@@ -0,0 +1,147 @@
+import json
+import threading
+import time
+
+import numpy as np
+from settings import PROFILER_ENABLED, PROFILER_HISTORY
+
+# Histogram bins for dump(): log-spaced from 1 µs to 10 s, in milliseconds
+HIST_EDGES_MS = np.logspace(-3, 4, 71)
+
+
+class _Stage:
+    """Ring of the last `history` durations (seconds) of one stage."""
+
+    def __init__(self, history):
+        self.samples = np.zeros(history)
+        self.n = 0
+
+    def add(self, dt):
+        self.samples[self.n % len(self.samples)] = dt
+        self.n += 1
+
+    def add_many(self, dts):
+        dts = dts[-len(self.samples):]
+        idx = (self.n + np.arange(len(dts))) % len(self.samples)
+        self.samples[idx] = dts
+        self.n += len(dts)
+
+    def values(self):
+        return self.samples[:min(self.n, len(self.samples))].copy()
+
+
+class _Timer:
+    __slots__ = ("profiler", "name", "t0")
+
+    def __init__(self, profiler, name):
+        self.profiler, self.name = profiler, name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, time.perf_counter() - self.t0)
+
+
+class _NoTimer:
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc):
+        pass
+
+
+class StageProfiler:
+    """Keeps the last PROFILER_HISTORY timings of each named pipeline stage."""
+
+    def __init__(self, history=PROFILER_HISTORY, enabled=PROFILER_ENABLED):
+        self.history = history
+        self.enabled = enabled
+        self.stages = {}
+        self.marks = {}
+        self.lock = threading.Lock()
+        self._off = _NoTimer()
+
+    def stage(self, name):
+        return _Timer(self, name) if self.enabled else self._off
+
+    def record(self, name, seconds):
+        with self.lock:
+            stage = self.stages.get(name)
+            if stage is None:
+                stage = self.stages[name] = _Stage(self.history)
+            stage.add(seconds)
+
+    def record_many(self, name, seconds):
+        """Record an array of durations at once (e.g. the latency of every frame in a batch)."""
+        if not self.enabled or len(seconds) == 0:
+            return
+        with self.lock:
+            stage = self.stages.get(name)
+            if stage is None:
+                stage = self.stages[name] = _Stage(self.history)
+            stage.add_many(np.asarray(seconds, dtype=np.float64))
+
+    def mark(self, name):
+        """Count one occurrence of `name` (e.g. a painted frame) for rate()."""
+        if not self.enabled:
+            return
+        with self.lock:
+            stage = self.marks.get(name)
+            if stage is None:
+                stage = self.marks[name] = _Stage(self.history)
+            stage.add(time.monotonic())
+
+    def rate(self, name, window=1.0):
+        """Occurrences of `name` per second over the last `window` seconds."""
+        with self.lock:
+            stage = self.marks.get(name)
+            t = stage.values() if stage else np.zeros(0)
+        recent = t[t > time.monotonic() - window]
+        return len(recent) / window
+
+    def summary(self):
+        """{stage: {"p50", "p95", "max" (ms), "n"}} over the retained history."""
+        with self.lock:
+            data = {name: (s.values(), s.n) for name, s in self.stages.items()}
+        out = {}
+        for name, (v, n) in sorted(data.items()):
+            if len(v):
+                p50, p95 = np.percentile(v, [50, 95]) * 1000
+                out[name] = {"p50": float(p50), "p95": float(p95), "max": float(v.max() * 1000), "n": n}
+        return out
+
+    def dump(self, path):
+        """Write the summary, histograms and raw retained timings (ms) of every stage as JSON."""
+        with self.lock:
+            data = {name: s.values() * 1000 for name, s in self.stages.items()}
+        report = {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "summary": self.summary(),
+            "rates": {name: self.rate(name) for name in list(self.marks)},
+            "histogram_edges_ms": HIST_EDGES_MS.tolist(),
+            "stages": {name: {"histogram": np.histogram(v, HIST_EDGES_MS)[0].tolist(), "samples_ms": v.tolist()}
+                       for name, v in sorted(data.items())},
+        }
+        with open(path, "w") as f:
+            json.dump(report, f, indent=1)
+        return path
+
+    def clear(self):
+        with self.lock:
+            self.stages.clear()
+            self.marks.clear()
+
+
+# Shared by the reader thread, the detector thread and the GUI
+profiler = StageProfiler()
+
+
+def profile_paint(widget, name):
+    """Time every paintEvent of `widget` as stage `name`."""
+    paint = widget.paintEvent
+
+    def paintEvent(event):
+        with profiler.stage(name):
+            paint(event)
+    widget.paintEvent = paintEvent
@@ -0,0 +1,82 @@
+"""Binary telemetry framing shared with robot/sketch_apr25a.
+
+Every frame is little-endian:
+
+    sync  u16   0x5AA5 (bytes A5 5A; never valid in the ASCII text protocol)
+    type  u8    FRAME_TELEMETRY, FRAME_TEXT, ...
+    len   u8    payload length in bytes
+    seq   u16   per-link frame counter, wraps at 65536 (gaps = lost frames)
+    payload     `len` bytes
+    crc   u16   CRC-16/CCITT-FALSE over type..payload
+
+Photos in binary mode are sent as a FRAME_PHOTO_HEADER followed by numbered
+FRAME_PHOTO_CHUNK frames interleaved with telemetry. The host asks for
+missing chunks with "PHOTO_RESEND <id> <i> <j> ..." (no indices: resend the
+header) and releases the robot's copy with "PHOTO_ACK <id>".
+
+The host switches the robot to binary with the "BIN" command (answered by a
+"BIN_OK" line) and back with "TXT". Command replies and other text travel
+as FRAME_TEXT payloads while binary mode is active.
+"""
+import binascii
+import struct
+
+import numpy as np
+from utils.telemetry_queue import CHANNELS
+
+SYNC = b"\xa5\x5a"
+HEADER = struct.Struct("<2sBBH")   # sync, type, len, seq
+CRC = struct.Struct("<H")
+OVERHEAD = HEADER.size + CRC.size
+
+FRAME_TELEMETRY = 0x01
+FRAME_TEXT = 0x02
+FRAME_PHOTO_HEADER = 0x10
+FRAME_PHOTO_CHUNK = 0x11
+
+PHOTO_HEADER = struct.Struct("<HIHH")   # photo id, size, chunk size, chunk count
+PHOTO_CHUNK = struct.Struct("<HH")      # photo id, chunk index; chunk data follows
+
+# Payload of FRAME_TELEMETRY: device millis() and the nine channels as float32.
+# Channels of a group (CHANNEL_GROUPS) not sampled since the previous frame are NaN.
+TELEMETRY_PAYLOAD_DTYPE = np.dtype([("millis", "<u4")] + [(c, "<f4") for c in CHANNELS])
+
+# A whole telemetry frame, for decoding runs of frames with one np.frombuffer()
+TELEMETRY_FRAME_DTYPE = np.dtype([
+    ("sync", "<u2"), ("type", "u1"), ("len", "u1"), ("seq", "<u2"),
+    ("payload", TELEMETRY_PAYLOAD_DTYPE),
+    ("crc", "<u2"),
+])
+TELEMETRY_FRAME_SIZE = TELEMETRY_FRAME_DTYPE.itemsize
+
+
+def crc16(data):
+    return binascii.crc_hqx(data, 0xFFFF)
+
+
+def encode_frame(frame_type, seq, payload):
+    body = HEADER.pack(SYNC, frame_type, len(payload), seq & 0xFFFF)[2:] + payload
+    return SYNC + body + CRC.pack(crc16(body))
+
+
+def encode_telemetry(seq, millis, values):
+    """Frame one telemetry sample (values in CHANNELS order)."""
+    payload = np.zeros(1, dtype=TELEMETRY_PAYLOAD_DTYPE)
+    payload["millis"] = millis
+    for name, v in zip(CHANNELS, values):
+        payload[name] = v
+    return encode_frame(FRAME_TELEMETRY, seq, payload.tobytes())
+
+
+def encode_text(seq, text):
+    return encode_frame(FRAME_TEXT, seq, text.encode("utf-8")[:255])
+
+
+def encode_photo(seq, photo_id, data, chunk_size):
+    """Frames for a whole photo: header then chunks. Returns (frames, next_seq)."""
+    n = (len(data) + chunk_size - 1) // chunk_size
+    frames = [encode_frame(FRAME_PHOTO_HEADER, seq, PHOTO_HEADER.pack(photo_id, len(data), chunk_size, n))]
+    for i in range(n):
+        chunk = PHOTO_CHUNK.pack(photo_id, i) + data[i * chunk_size:(i + 1) * chunk_size]
+        frames.append(encode_frame(FRAME_PHOTO_CHUNK, seq + 1 + i, chunk))
+    return frames, seq + 1 + n
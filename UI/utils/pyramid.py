@@ -0,0 +1,129 @@
+import numpy as np
+from settings import PYRAMID_FACTOR
+
+
+class _Level:
+    """Growable columnar storage for one pyramid level."""
+
+    def __init__(self, n_channels, capacity=1024):
+        self.n = 0
+        self.t = np.zeros(capacity)
+        self.lo = np.zeros((n_channels, capacity), dtype=np.float32)
+        self.hi = np.zeros((n_channels, capacity), dtype=np.float32)
+        self.mean = np.zeros((n_channels, capacity), dtype=np.float32)
+
+    def extend(self, t, lo, hi, mean):
+        k = len(t)
+        if self.n + k > len(self.t):
+            cap = max(2 * len(self.t), self.n + k)
+            self.t = np.resize(self.t, cap)
+            self.lo, self.hi, self.mean = (self._grow(a, cap) for a in (self.lo, self.hi, self.mean))
+        self.t[self.n:self.n + k] = t
+        self.lo[:, self.n:self.n + k] = lo
+        self.hi[:, self.n:self.n + k] = hi
+        self.mean[:, self.n:self.n + k] = mean
+        self.n += k
+
+    @staticmethod
+    def _grow(a, cap):
+        out = np.zeros((a.shape[0], cap), dtype=a.dtype)
+        out[:, :a.shape[1]] = a
+        return out
+
+
+class _RawLevel(_Level):
+    """Level 0: the raw samples, one value each, which is its own min, max and mean."""
+
+    def __init__(self, n_channels, capacity=1024):
+        self.n = 0
+        self.t = np.zeros(capacity)
+        self.y = np.zeros((n_channels, capacity), dtype=np.float32)
+
+    lo = hi = mean = property(lambda self: self.y)
+
+    def extend(self, t, y):
+        k = len(t)
+        if self.n + k > len(self.t):
+            cap = max(2 * len(self.t), self.n + k)
+            self.t = np.resize(self.t, cap)
+            self.y = self._grow(self.y, cap)
+        self.t[self.n:self.n + k] = t
+        self.y[:, self.n:self.n + k] = y
+        self.n += k
+
+
+class MinMaxPyramid:
+    """Multi-resolution min/max/mean summary of a whole mission."""
+
+    def __init__(self, n_channels, factor=PYRAMID_FACTOR):
+        self.n_channels = n_channels
+        self.factor = factor
+        self.levels = [_RawLevel(n_channels)]
+
+    def append(self, t, y):
+        """Append a batch: t has shape (n,), y has shape (n_channels, n)."""
+        if len(t) == 0:
+            return
+        self.levels[0].extend(t, y)
+
+        k = 1
+        while True:
+            below = self.levels[k - 1]
+            complete = below.n // self.factor
+            if complete == 0:
+                break
+            if k == len(self.levels):
+                self.levels.append(_Level(self.n_channels))
+            level = self.levels[k]
+            if complete > level.n:
+                a, b = level.n * self.factor, complete * self.factor
+                shape = (self.n_channels, complete - level.n, self.factor)
+                level.extend(below.t[a:b:self.factor],
+                             below.lo[:, a:b].reshape(shape).min(axis=2),
+                             below.hi[:, a:b].reshape(shape).max(axis=2),
+                             below.mean[:, a:b].reshape(shape).mean(axis=2))
+            k += 1
+
+    def query(self, channel, t0, t1, max_points):
+        """Min/max envelope of `channel` over [t0, t1] in at most ~max_points points, as (x, y)."""
+        for k, level in enumerate(self.levels):
+            a, b = self._range(level, t0, t1)
+            if k == 0 and b - a <= max_points:
+                return level.t[a:b], level.lo[channel, a:b]
+            if 2 * (b - a) <= max_points or k == len(self.levels) - 1:
+                break
+
+        parts = [(level, a, b)]
+        # Samples after the last complete bucket only exist on the levels below
+        while k > 0 and b == level.n:
+            start = level.n * self.factor
+            k -= 1
+            level = self.levels[k]
+            a, b = start, self._range(level, t0, t1)[1]
+            if b > a:
+                parts.append((level, a, b))
+
+        x = np.concatenate([np.repeat(lv.t[a:b], 2) for lv, a, b in parts])
+        y = np.empty(len(x), dtype=np.float32)
+        y[0::2] = np.concatenate([lv.lo[channel, a:b] for lv, a, b in parts])
+        y[1::2] = np.concatenate([lv.hi[channel, a:b] for lv, a, b in parts])
+        return x, y
+
+    @staticmethod
+    def _range(level, t0, t1):
+        t = level.t[:level.n]
+        a = max(int(np.searchsorted(t, t0, side="right")) - 1, 0)
+        b = int(np.searchsorted(t, t1, side="right"))
+        return a, b
+
+    def time_span(self):
+        base = self.levels[0]
+        if base.n == 0:
+            return 0.0, 0.0
+        return float(base.t[0]), float(base.t[base.n - 1])
+
+    def clear(self):
+        self.levels = [_RawLevel(self.n_channels)]
+
+    def __len__(self):
+        return self.levels[0].n
@@ -0,0 +1,211 @@
+import errno
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+from settings import RECORD_DIR, RECORDER_CHUNK_ROWS, RECORDER_FLUSH_S, RECORDER_FSYNC_S
+from utils.telemetry_queue import FRAME_DTYPE
+
+# What gets recorded per frame: the raw telemetry plus the fused attitude
+RECORD_DTYPE = np.dtype(FRAME_DTYPE.descr + [(q, np.float32) for q in ("qw", "qx", "qy", "qz")])
+
+# One row per written chunk; the index is what makes rows in the column files valid
+INDEX_DTYPE = np.dtype([("first_row", np.uint64), ("rows", np.uint32), ("t0", np.float64), ("t1", np.float64)])
+
+FORMAT_VERSION = 2   # 2: t is the aligned sample time; adds t_rx_ns and millis
+
+
+def _column_file(name):
+    return name.replace(" ", "_") + ".bin"
+
+
+def record_frames(frames, quats):
+    """RECORD_DTYPE rows from telemetry frames and their (n, 4) attitude quaternions."""
+    record = np.empty(len(frames), dtype=RECORD_DTYPE)
+    for name in frames.dtype.names:
+        record[name] = frames[name]
+    for k, name in enumerate(("qw", "qx", "qy", "qz")):
+        record[name] = quats[:, k]
+    return record
+
+
+class MissionRecorder(threading.Thread):
+    """Streams frames to disk as one raw file per column, a chunk index and meta.json."""
+
+    def __init__(self, root=RECORD_DIR, dtype=RECORD_DTYPE):
+        super().__init__(daemon=True)
+        self.dtype = dtype
+        self.path = os.path.join(root, datetime.now().strftime("%Y%m%d-%H%M%S"))
+        os.makedirs(self.path, exist_ok=True)
+        self.inbox = queue.Queue()
+        self.running = True
+        self.rows = 0
+        self.chunks = 0
+        self.failed = False      # a write could not be rolled back; nothing more is recorded
+        self._pending = []
+        self._pending_rows = 0
+        self._last_flush = time.monotonic()
+        self._last_sync = time.monotonic()
+        self._flush_requested = threading.Event()
+        self._flushed = threading.Event()
+
+        self._write_meta()
+        # Unbuffered, so a failed write leaves nothing behind in Python that could land later
+        self.files = {name: open(os.path.join(self.path, _column_file(name)), "ab", buffering=0)
+                      for name in dtype.names}
+        self.index = open(os.path.join(self.path, "index.bin"), "ab", buffering=0)
+
+    def write(self, frames):
+        """Queue a structured array of frames (any dtype sharing RECORD_DTYPE's field names)."""
+        if len(frames):
+            self.inbox.put(frames)
+
+    def flush(self, wait=False, timeout=5.0):
+        """Write and fsync everything queued so far. Returns immediately unless `wait`."""
+        self._flushed.clear()
+        self._flush_requested.set()
+        if wait:
+            self._flushed.wait(timeout)
+
+    def close(self):
+        self.running = False
+        self.join()
+
+    def run(self):
+        while self.running or not self.inbox.empty():
+            try:
+                frames = self.inbox.get(timeout=0.1)
+                while True:
+                    self._pending.append(frames)
+                    self._pending_rows += len(frames)
+                    frames = self.inbox.get_nowait()
+            except queue.Empty:
+                pass
+
+            now = time.monotonic()
+            if self._pending_rows >= RECORDER_CHUNK_ROWS or (
+                    self._pending_rows and now - self._last_flush > RECORDER_FLUSH_S):
+                self._write_chunk()
+            if self._flush_requested.is_set():
+                self._flush_requested.clear()
+                self._write_chunk()
+                self._sync()
+                self._flushed.set()
+            elif now - self._last_sync > RECORDER_FSYNC_S:
+                self._sync()
+
+        self._write_chunk()
+        self._sync()
+        for f in self.files.values():
+            f.close()
+        self.index.close()
+        self._flushed.set()
+
+    def _write_meta(self, truncated=False):
+        meta = {
+            "version": FORMAT_VERSION,
+            "started": datetime.now().isoformat(timespec="seconds"),
+            "columns": [{"name": name, "dtype": self.dtype[name].str, "file": _column_file(name)}
+                        for name in self.dtype.names],
+        }
+        if truncated:
+            meta["truncated"] = True   # recording stopped early after a write error
+        with open(os.path.join(self.path, "meta.json"), "w") as f:
+            json.dump(meta, f, indent=2)
+
+    def _write_chunk(self):
+        self._last_flush = time.monotonic()
+        if not self._pending_rows:
+            return
+        chunk = np.concatenate(self._pending) if len(self._pending) > 1 else self._pending[0]
+        self._pending, self._pending_rows = [], 0
+        if self.failed:
+            return
+
+        try:
+            # Columns first, index last: an index entry only ever points at written rows
+            for name, f in self.files.items():
+                _write_all(f, np.ascontiguousarray(chunk[name], dtype=self.dtype[name]).tobytes())
+            entry = np.array([(self.rows, len(chunk), chunk["t"][0], chunk["t"][-1])], dtype=INDEX_DTYPE)
+            _write_all(self.index, entry.tobytes())
+        except OSError as e:
+            print(f"[MissionRecorder] Write error, dropping {len(chunk)} rows:", e)
+            self._rollback()
+            return
+        self.rows += len(chunk)
+        self.chunks += 1
+
+    def _rollback(self):
+        # Cut every file back to the last indexed row so the columns stay aligned
+        try:
+            for name, f in self.files.items():
+                os.ftruncate(f.fileno(), self.rows * self.dtype[name].itemsize)
+            os.ftruncate(self.index.fileno(), self.chunks * INDEX_DTYPE.itemsize)
+        except OSError as e:
+            print("[MissionRecorder] Rollback failed, recording stopped:", e)
+            self.failed = True
+            try:
+                self._write_meta(truncated=True)
+            except OSError:
+                pass
+
+    def _sync(self):
+        self._last_sync = time.monotonic()
+        try:
+            for f in self.files.values():
+                os.fsync(f.fileno())
+            os.fsync(self.index.fileno())
+        except OSError as e:
+            print("[MissionRecorder] Sync error:", e)
+
+
+def _write_all(f, data):
+    if f.write(data) != len(data):
+        raise OSError(errno.ENOSPC, "short write")
+
+
+# ----------------------------------------------------------------------
+def load_mission(path):
+    """Memory-map a recorded mission. Returns ({column: array}, index)."""
+    with open(os.path.join(path, "meta.json")) as f:
+        meta = json.load(f)
+    index = np.fromfile(os.path.join(path, "index.bin"), dtype=INDEX_DTYPE)
+    rows = int(index["first_row"][-1] + index["rows"][-1]) if len(index) else 0
+
+    columns = {}
+    for col in meta["columns"]:
+        dtype = np.dtype(col["dtype"])
+        file = os.path.join(path, col["file"])
+        if rows == 0:
+            columns[col["name"]] = np.zeros(0, dtype=dtype)
+        else:
+            columns[col["name"]] = np.memmap(file, dtype=dtype, mode="r", shape=(rows,))
+    return columns, index
+
+
+def export_csv(path, out_path):
+    """Write a recorded mission out as CSV (one row per frame)."""
+    import pandas as pd
+    columns, _ = load_mission(path)
+    pd.DataFrame({k: np.asarray(v) for k, v in columns.items()}).to_csv(out_path, index=False)
+    return out_path
+
+
+def export_parquet(path, out_path):
+    """Write a recorded mission out as Parquet (needs pyarrow or fastparquet)."""
+    import pandas as pd
+    columns, _ = load_mission(path)
+    pd.DataFrame({k: np.asarray(v) for k, v in columns.items()}).to_parquet(out_path, index=False)
+    return out_path
+
+
+if __name__ == "__main__":
+    # python -m utils.recorder missions/<mission> out.csv|out.parquet
+    import sys
+    src, dst = sys.argv[1], sys.argv[2]
+    (export_parquet if dst.endswith(".parquet") else export_csv)(src, dst)
+    print(f"[MissionRecorder] Exported {src} -> {dst}")
@@ -0,0 +1,125 @@
+import os
+import threading
+import time
+
+import numpy as np
+from settings import REPLAY_BLOCK
+from utils.bus import TOPIC_TELEMETRY
+from utils.recorder import load_mission
+from utils.telemetry_queue import FRAME_DTYPE, CHANNELS
+
+# Frame spacing assumed for CSV logs that carry no timestamps (the old 400 ms tick)
+CSV_FRAME_PERIOD_S = 0.4
+
+
+def load_frames(path):
+    """Columns of a recorded mission directory (memory-mapped) or of a CSV log."""
+    if os.path.isdir(path):
+        columns, _ = load_mission(path)
+        return columns
+
+    import pandas as pd
+    df = pd.read_csv(path)
+    n = len(df)
+    columns = {name: df[name].to_numpy(np.float32) if name in df else np.zeros(n, np.float32)
+               for name in CHANNELS}
+    columns["t"] = df["t"].to_numpy(np.float64) if "t" in df else np.arange(n) * CSV_FRAME_PERIOD_S
+    return columns
+
+
+class ReplayReader(threading.Thread):
+    """Plays a recorded mission back onto the bus; drop-in for SerialReader. `speed` scales the recording's
+    clock (None for as fast as it is drained); seek() takes mission seconds."""
+
+    def __init__(self, bus, path, speed=1.0):
+        super().__init__(daemon=True)
+        self.bus = bus
+        self.path = path
+        self.columns = load_frames(path)
+        t = np.asarray(self.columns["t"], dtype=np.float64)
+        self.t_rel = t - t[0] if len(t) else t
+        self.duration = float(self.t_rel[-1]) if len(t) else 0.0
+        self.speed = speed
+        self.pos = 0
+        self.running = True
+        self._seek_to = None
+        self._t_last = time.monotonic()  # host time of the last frame published
+        print(f"[ReplayReader] {path}: {len(t)} frames, {self.duration:.1f} s")
+
+    # -- SerialReader interface ------------------------------------------
+    def stop(self):
+        self.running = False
+
+    def send_command(self, command):
+        print(f"[ReplayReader] Ignoring command during replay: {command}")
+
+    # -- playback control -------------------------------------------------
+    def seek(self, t):
+        """Continue playback from `t` seconds after the start of the mission."""
+        self._seek_to = min(max(t, 0.0), self.duration)
+
+    def set_speed(self, speed):
+        """Playback rate multiplier, or None for as fast as possible."""
+        self._seek_to = self.position()  # re-anchor the clock at the current frame
+        self.speed = speed
+
+    def position(self):
+        if not len(self.t_rel):
+            return 0.0
+        return float(self.t_rel[min(self.pos, len(self.t_rel) - 1)])
+
+    # ---------------------------------------------------------------------
+    def run(self):
+        n = len(self.t_rel)
+        wall0, mission0 = time.monotonic(), 0.0
+        while self.running:
+            if self._seek_to is not None:
+                mission0, self._seek_to = self._seek_to, None
+                self.pos = int(np.searchsorted(self.t_rel, mission0))
+                wall0 = time.monotonic()
+
+            if self.pos >= n:
+                time.sleep(0.05)  # finished; stay alive so the user can seek back
+                continue
+
+            if self.speed is None:
+                # Back-pressure instead of overflowing the subscribers' queues
+                if self.bus.backlog(TOPIC_TELEMETRY) > 0.5:
+                    time.sleep(0.002)
+                    continue
+                end = min(self.pos + REPLAY_BLOCK, n)
+            else:
+                target = mission0 + (time.monotonic() - wall0) * self.speed
+                end = int(np.searchsorted(self.t_rel, target, side="right"))
+                if end <= self.pos:
+                    wait = (self.t_rel[self.pos] - target) / self.speed
+                    time.sleep(min(max(wait, 0.0), 0.02))
+                    continue
+                end = min(end, self.pos + REPLAY_BLOCK)
+
+            self.bus.publish(TOPIC_TELEMETRY, self._block(self.pos, end, wall0, mission0))
+            self.pos = end
+            if self.pos >= n:
+                print("[ReplayReader] End of mission reached")
+
+    def _block(self, start, end, wall0, mission0):
+        block = np.empty(end - start, dtype=FRAME_DTYPE)
+        for name in FRAME_DTYPE.names:
+            if name in self.columns:
+                block[name] = self.columns[name][start:end]
+            else:
+                block[name] = 0
+        # Move the recorded times onto this host's clock, at the playback speed
+        t_rel = self.t_rel[start:end]
+        now = time.monotonic()
+        if self.speed is None:
+            prev = self.t_rel[start - 1] if start else t_rel[0]
+            span = t_rel[-1] - prev
+            frac = (t_rel - prev) / span if span > 0 else np.arange(1, len(t_rel) + 1) / len(t_rel)
+            block["t"] = self._t_last + (now - self._t_last) * frac
+        else:
+            block["t"] = np.minimum(wall0 + (t_rel - mission0) / self.speed, now)
+        block["t"] = np.maximum.accumulate(np.maximum(block["t"], self._t_last))
+        self._t_last = float(block["t"][-1])
+        block["t_rx_ns"] = int(now * 1e9)
+        return block
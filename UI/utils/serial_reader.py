@@ -1,109 +1,208 @@
 import serial
 import threading
-from config import SERIAL_PORT, SERIAL_BAUDRATE
+from settings import (SERIAL_PORT, SERIAL_BAUDRATE, PHOTO_DIR, SERIAL_ECHO, PHOTO_TIMEOUT_S, SERIAL_BINARY,
+                      CLOCK_ALIGN, LINK_STATS_PERIOD_S, SERIAL_TRANSPORT, BIN_RETRY_S, BIN_MAX_TRIES)
+from utils.bus import TOPIC_TELEMETRY, TOPIC_PHOTO, TOPIC_ACK, TOPIC_LINK
+from utils.clock_sync import ClockAligner
+from utils.frame_parser import FrameParser, EVENT_LINE, EVENT_PHOTO, EVENT_FRAMES, EVENT_BINARY, MODE_BINARY
+from utils.photo_transfer import PhotoAssembler
+from utils.protocol import FRAME_PHOTO_HEADER, FRAME_PHOTO_CHUNK
+from utils.telemetry_queue import CHANNELS, CHANNEL_GROUPS, FRAME_DTYPE
+from utils.profiler import profiler
+import numpy as np
 import time
 
-class SerialReader(threading.Thread):
-    def __init__(self):
-        super().__init__()
-        self.ser = serial.Serial(SERIAL_PORT, SERIAL_BAUDRATE, timeout=1)
+# Text-mode keys the sketch prints besides CHANNELS; every other line is a reply (TOPIC_ACK)
+TEXT_EXTRA_KEYS = {"TDS_ADC", "Voltage", "Flex Value"}
+GROUP_OF = {c: group for group, channels in CHANNEL_GROUPS.items() for c in channels}
+
+class SerialLink:
+    """Decodes the robot's serial link and publishes what it decodes on the bus. Subclasses move the bytes and
+    provide send_command()."""
+
+    def __init__(self, bus, port=SERIAL_PORT, baudrate=SERIAL_BAUDRATE, photo_dir=PHOTO_DIR):
+        self.ser = serial.Serial(port, baudrate, timeout=1)
         self.running = True
-        self.latest_data = None
+        self.bus = bus
         self.buffer = {}
-        self.in_photo_mode = False
-        self.photo_data = bytearray()
+        self.parser = FrameParser()
         self.photo_timer = None
-
-
-    def run(self):
-        while self.running:
-            try:
-                if self.in_photo_mode:
-                    # Receiving photo binary data
-                    if self.ser.in_waiting:
-                        chunk = self.ser.read(min(64, self.ser.in_waiting))  # Read small safe chunks
-                        if b"PHOTO_END" in chunk:
-                            # Found end inside chunk
-                            idx = chunk.find(b"PHOTO_END")
-                            photo_bytes = chunk[:idx]
-                            self.photo_data.extend(photo_bytes)
-                            print("[SerialReader] Photo End detected inside chunk!")
-
-                            self._finish_photo()
-
-                            # Process any leftover after PHOTO_END
-                            rest = chunk[idx + len(b"PHOTO_END"):]
-                            if rest:
-                                try:
-                                    lines = rest.decode('utf-8', errors='ignore').splitlines()
-                                    for line in lines:
-                                        self._handle_line(line)
-                                except Exception as e:
-                                    print("[SerialReader] Error decoding rest:", e)
-                        else:
-                            self.photo_data.extend(chunk)
-
-                    # Timeout check (5 seconds)
-                    if self.photo_timer and time.time() - self.photo_timer > 5:
-                        print("[SerialReader] Photo receiving timeout! Cancelling photo.")
-                        self._finish_photo()
-
-                else:
-                    # Normal mode: receiving text lines
-                    line = self.ser.readline().decode('utf-8', errors='ignore').strip()
-                    print(f"[SerialReader] Line: {line}")
-                    self._handle_line(line)
-
-            except Exception as e:
-                print("Serial read error:", e)
-
-    def _handle_line(self, line):
-        if line == "PHOTO_START":
+        self.received = 0        # telemetry frames published
+        self.garbled = 0         # text values that did not parse
+        self._text_samples = []  # ({channel: value}, t_rx_ns) completed during the current read
+        self._stats_published = 0.0
+        self._bin_sent = 0.0     # monotonic time of the last "BIN"
+        self._bin_tries = 0
+        self._carry_rx = None    # read time of bytes the parser is still holding
+        self._sample_rx = {}     # group -> read time of the first line of the sample being assembled
+        self.clock = ClockAligner()
+        self.photos = PhotoAssembler(self.send_command, self._finish_photo, photo_dir)
+
+    def _tick(self):
+        # Binary negotiation, photo retransmits, link stats and the text-photo timeout
+        self._negotiate_binary()
+        self.photos.poll()
+        if time.monotonic() - self._stats_published > LINK_STATS_PERIOD_S:
+            self._stats_published = time.monotonic()
+            self.bus.publish(TOPIC_LINK, self.link_stats())
+
+        if self.parser.in_photo_mode and self.photo_timer and time.time() - self.photo_timer > PHOTO_TIMEOUT_S:
+            print("[SerialReader] Photo receiving timeout! Cancelling photo.")
+            self._finish_photo(self.parser.abort_photo())
+
+    def _negotiate_binary(self):
+        if not SERIAL_BINARY:
+            return
+        if self.parser.mode == MODE_BINARY:
+            self._bin_tries = 0   # start over if the robot ever drops back to text
+        elif self._bin_tries < BIN_MAX_TRIES and time.monotonic() - self._bin_sent > BIN_RETRY_S:
+            # Old firmware ignores this and keeps sending text
+            self.send_command("BIN")
+            self._bin_sent = time.monotonic()
+            self._bin_tries += 1
+
+    def process(self, chunk, t_rx_ns=None):
+        """Parse one read's worth of bytes (read at monotonic_ns `t_rx_ns`) and dispatch what it completes."""
+        if t_rx_ns is None:
+            t_rx_ns = time.monotonic_ns()
+        # The first thing completed by this read may have started in an earlier one
+        rx = self._carry_rx if self.parser.buf and self._carry_rx else t_rx_ns
+        was_photo = self.parser.in_photo_mode
+        events = self.parser.feed(chunk)
+        self._carry_rx = (t_rx_ns if events else rx) if self.parser.buf else None
+        for kind, payload in events:
+            if kind == EVENT_FRAMES:
+                self._handle_frames(payload, rx)
+            elif kind == EVENT_BINARY:
+                frame_type, data = payload
+                if frame_type == FRAME_PHOTO_HEADER:
+                    self.photos.on_header(data)
+                elif frame_type == FRAME_PHOTO_CHUNK:
+                    self.photos.on_chunk(data)
+            elif kind == EVENT_LINE:
+                if SERIAL_ECHO:
+                    print(f"[SerialReader] Line: {payload}")
+                try:
+                    self._handle_line(payload, rx)
+                except ValueError:
+                    # garbled value, keep parsing the rest of the chunk
+                    self.garbled += 1
+            elif kind == EVENT_PHOTO:
+                print("[SerialReader] Photo End detected!")
+                self._finish_photo(payload)
+            rx = t_rx_ns
+        if self.parser.in_photo_mode and not was_photo:
             print("[SerialReader] Photo Start detected!")
-            self.in_photo_mode = True
-            self.photo_data = bytearray()
             self.photo_timer = time.time()  # Start timeout timer
 
-        elif ':' in line:
-            key, val = line.split(':', 1)
-            self.buffer[key.strip()] = float(val.strip())
+        if self._text_samples:
+            self._publish_text_samples()
+
+    def link_stats(self):
+        stats = self.parser.stats()
+        stats.update(received=self.received, garbled=self.garbled,
+                     # sequence gaps (including frames that failed their CRC) plus garbled text
+                     dropped=stats["lost_frames"] + self.garbled)
+        return stats
+
+    def _handle_line(self, line, t_rx_ns):
+        key, _, val = line.partition(':')
+        key = key.strip()
+        if key in TEXT_EXTRA_KEYS:
+            return
+        if key not in CHANNELS:
+            if line == "Ready":
+                # The robot has just (re)started in text mode: ask again right away
+                self._bin_tries = 0
+                self._bin_sent = 0.0
+            self._on_reply(line, t_rx_ns)
+            return
+
+        self.buffer[key] = float(val.strip())
+        group = GROUP_OF[key]
+        self._sample_rx.setdefault(group, t_rx_ns)
+        channels = CHANNEL_GROUPS[group]
+        if all(k in self.buffer for k in channels):
+            # Text samples carry no device time: stamp them with their first byte
+            rx = self._sample_rx.pop(group)
+            self._text_samples.append(({k: self.buffer.pop(k) for k in channels}, rx))
+
+    def _on_reply(self, line, t_rx_ns):
+        self.bus.publish(TOPIC_ACK, line)
+
+    def _publish_text_samples(self):
+        block = np.zeros(len(self._text_samples), dtype=FRAME_DTYPE)
+        for name in CHANNELS:
+            block[name] = np.nan
+        for i, (values, rx) in enumerate(self._text_samples):
+            block["t_rx_ns"][i] = rx
+            for name, v in values.items():
+                block[name][i] = v
+        block["t"] = block["t_rx_ns"] / 1e9
+        self._text_samples = []
+        self.received += len(block)
+        self.bus.publish(TOPIC_TELEMETRY, block)
+
+    def _handle_frames(self, frames, t_rx_ns):
+        # Binary telemetry arrives already decoded; copy the channels into ring layout
+        block = np.empty(len(frames), dtype=FRAME_DTYPE)
+        block["t_rx_ns"] = t_rx_ns
+        block["millis"] = frames["payload"]["millis"]
+        if CLOCK_ALIGN:
+            block["t"] = self.clock.align(block["millis"], np.full(len(block), t_rx_ns / 1e9))
+        else:
+            block["t"] = t_rx_ns / 1e9
+        for k in CHANNELS:
+            block[k] = frames["payload"][k]
+        self.received += len(block)
+        self.bus.publish(TOPIC_TELEMETRY, block)
+
+    def _finish_photo(self, photo_data):
+        # photo_data: raw JPEG bytes (text mode) or the path of a chunked photo already on disk
+        self.photo_timer = None
+        if photo_data:
+            self.bus.publish(TOPIC_PHOTO, photo_data)
 
-            if all(k in self.buffer for k in [
-                'Temperature_C', 'TDS_ppm', 'GyroX', 'GyroY', 'GyroZ',
-                'AccelX', 'AccelY', 'AccelZ', 'Flex Voltage'
-            ]):
-                self.latest_data = {
-                    "Temperature_C": self.buffer.pop('Temperature_C'),
-                    "TDS_ppm": self.buffer.pop('TDS_ppm'),
-                    "Flex Voltage": self.buffer.pop('Flex Voltage'),
-                    "GyroX": self.buffer.pop('GyroX'),
-                    "GyroY": self.buffer.pop('GyroY'),
-                    "GyroZ": self.buffer.pop('GyroZ'),
-                    "AccelX": self.buffer.pop('AccelX'),
-                    "AccelY": self.buffer.pop('AccelY'),
-                    "AccelZ": self.buffer.pop('AccelZ'),
-                }
 
+class SerialReader(SerialLink, threading.Thread):
+    """SerialLink read by its own thread, blocked on the port."""
 
+    def __init__(self, bus, port=SERIAL_PORT, baudrate=SERIAL_BAUDRATE, photo_dir=PHOTO_DIR):
+        threading.Thread.__init__(self)
+        SerialLink.__init__(self, bus, port, baudrate, photo_dir)
+        self._write_lock = threading.Lock()  # the GUI and this thread (photo resend/ack) both write
 
+    def run(self):
+        while self.running:
+            try:
+                # Take whatever the OS has buffered; block for at least one byte
+                chunk = self.ser.read(self.ser.in_waiting or 1)
+                t_rx_ns = time.monotonic_ns()
+                if chunk:
+                    with profiler.stage("reader.parse"):
+                        self.process(chunk, t_rx_ns)
+                self._tick()
+
+            except Exception as e:
+                if self.running:   # stop() closing the port mid-read is expected
+                    print("Serial read error:", e)
 
     def stop(self):
         self.running = False
         if self.ser.is_open:
             self.ser.close()
 
-    def get_latest(self):
-        return self.latest_data
-
     def send_command(self, command):
         try:
-            self.ser.write((command + '\n').encode())
+            with self._write_lock:
+                self.ser.write((command + '\n').encode())
         except Exception as e:
             print("Serial send error:", e)
 
 
-    def _finish_photo(self):
-        self.in_photo_mode = False
-        self.photo_timer = None
-        if hasattr(self, 'on_photo_received') and callable(self.on_photo_received):
-            self.on_photo_received(self.photo_data)
+def open_reader(bus, port=SERIAL_PORT, baudrate=SERIAL_BAUDRATE, photo_dir=PHOTO_DIR):
+    """The reader selected by SERIAL_TRANSPORT for one port (not started yet)."""
+    if SERIAL_TRANSPORT == "asyncio":
+        from utils.async_transport import AsyncSerialTransport
+        return AsyncSerialTransport(bus, port, baudrate, photo_dir)
+    return SerialReader(bus, port, baudrate, photo_dir)
@@ -0,0 +1,119 @@
+from multiprocessing import shared_memory
+
+import numpy as np
+from settings import TELEMETRY_RING_SIZE
+from utils.telemetry_queue import FRAME_DTYPE
+
+# Header words (uint64). The producer owns RESERVED and WRITTEN, the consumer READ;
+# each sits on its own cache line so the two processes never write the same line.
+RESERVED = 0     # frames the producer has started writing
+WRITTEN = 1      # frames fully written and visible to the consumer
+CAPACITY = 2
+ITEMSIZE = 3     # FRAME_DTYPE.itemsize, checked on attach
+READ = 8         # frames the consumer has taken
+HEADER_WORDS = 16
+
+
+class SharedTelemetryRing:
+    """TelemetryRing in a multiprocessing.shared_memory block, for one producer process."""
+
+    def __init__(self, name=None, capacity=TELEMETRY_RING_SIZE):
+        header_bytes = HEADER_WORDS * 8
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=header_bytes + capacity * FRAME_DTYPE.itemsize)
+            self.owner = True
+        else:
+            self.shm = _attach(name)
+            self.owner = False
+        self.header = np.ndarray(HEADER_WORDS, dtype=np.uint64, buffer=self.shm.buf)
+        if self.owner:
+            self.header[:] = 0
+            self.header[CAPACITY] = capacity
+            self.header[ITEMSIZE] = FRAME_DTYPE.itemsize
+        elif self.header[ITEMSIZE] != FRAME_DTYPE.itemsize:
+            raise ValueError(f"{name} holds {int(self.header[ITEMSIZE])}-byte frames, expected {FRAME_DTYPE.itemsize}")
+        self.capacity = int(self.header[CAPACITY])
+        self.frames = np.ndarray(self.capacity, dtype=FRAME_DTYPE, buffer=self.shm.buf, offset=header_bytes)
+        self.name = self.shm.name
+        self.read_seq = int(self.header[READ])
+        self.overflows = 0
+
+    # Producer side ------------------------------------------------------
+    def push_many(self, frames):
+        """Append a structured array of frames (the `seq` field is overwritten)."""
+        n = len(frames)
+        if n == 0:
+            return
+        seq = int(self.header[WRITTEN])
+        if n > self.capacity:
+            seq += n - self.capacity
+            frames = frames[-self.capacity:]
+            n = self.capacity
+        idx = np.arange(seq, seq + n, dtype=np.uint64)
+        slots = idx % self.capacity
+        self.header[RESERVED] = seq + n
+        for name in FRAME_DTYPE.names[1:]:
+            self.frames[name][slots] = frames[name]
+        self.frames["seq"][slots] = idx
+        self.header[WRITTEN] = seq + n
+
+    def offer(self, frames):
+        self.push_many(frames)
+
+    def fill(self):
+        return len(self) / self.capacity
+
+    # Consumer side ------------------------------------------------------
+    def drain(self, max_items=None):
+        """Return a copy of all unread frames (oldest first) and mark them read."""
+        written = int(self.header[WRITTEN])
+        start = self.read_seq
+        if written - start > self.capacity:
+            self.overflows += written - start - self.capacity
+            start = written - self.capacity
+        n = written - start
+        if max_items is not None:
+            n = min(n, max_items)
+        out = self.frames[np.arange(start, start + n) % self.capacity]
+
+        # Slots the producer reserved meanwhile may have been overwritten under us
+        lapped = int(self.header[RESERVED]) - self.capacity - start
+        if lapped > 0:
+            lapped = min(lapped, n)
+            self.overflows += lapped
+            out = out[lapped:]
+        self.read_seq = start + n
+        self.header[READ] = self.read_seq
+        return out
+
+    def __len__(self):
+        return int(self.header[WRITTEN]) - int(self.header[READ])
+
+    def stats(self):
+        return {
+            "capacity": self.capacity,
+            "pending": len(self),
+            "received": int(self.header[WRITTEN]),
+            "overflows": self.overflows,
+        }
+
+    def close(self):
+        """Unmap the block; the creating side also frees it."""
+        del self.header, self.frames
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def _attach(name):
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)   # Python 3.13+
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name)
+        try:
+            # Older versions track attached blocks too and would free it when this process exits
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, "shared_memory")
+        except Exception:
+            pass
+        return shm
@@ -0,0 +1,166 @@
+"""Synthetic telemetry for mock mode and load tests.
+
+SyntheticTelemetry generates frames in NumPy blocks from a seed and a
+scripted scenario; SyntheticReader publishes them on a robot's bus in real
+time, so with USE_MOCK_DATA the whole pipeline (queue, detector, recorder,
+plots) runs exactly as it does on a live link. Frames follow the firmware's
+rates: the IMU at MOCK_RATE_HZ, temperature/TDS/flex at MOCK_ENV_RATE_HZ
+with NaN in between.
+"""
+import threading
+import time
+
+import numpy as np
+from settings import MOCK_RATE_HZ, MOCK_ENV_RATE_HZ, MOCK_SCENARIO, MOCK_SEED
+from utils.bus import TOPIC_TELEMETRY, TOPIC_ACK
+from utils.telemetry_queue import CHANNELS, CHANNEL_GROUPS, FRAME_DTYPE
+
+CHUNK = 1024      # frames generated per step; output depends only on seed and frame index
+TICK_S = 0.01     # SyntheticReader publishes what is due this often
+
+# Water column: temperature falls from SURFACE_C towards DEEP_C across a thermocline
+SURFACE_C = 12.0
+DEEP_C = 4.0
+THERMOCLINE_M = 10.0
+
+# Sensor noise (standard deviation) per channel
+NOISE = {
+    "Temperature_C": 0.02, "TDS_ppm": 5.0, "Flex Voltage": 0.01,
+    "GyroX": 0.5, "GyroY": 0.5, "GyroZ": 0.5,
+    "AccelX": 0.01, "AccelY": 0.01, "AccelZ": 0.01,
+}
+
+# A scenario repeats every `length_s` seconds. `depth` holds (time s, depth m)
+# keyframes; events are (kind, start s, duration s, parameters):
+#   plume      TDS rises by `ppm` (Gaussian in time)
+#   vibration  `g` of shaking at `hz` on the accelerometer, and on the gyro
+#   dropout    the `group` of CHANNEL_GROUPS goes silent (NaN)
+SCENARIOS = {
+    "calm": {
+        "length_s": 60.0,
+        "depth": [(0.0, 2.0), (60.0, 2.0)],
+        "events": [],
+    },
+    "dive": {
+        "length_s": 180.0,
+        "depth": [(0.0, 0.0), (60.0, 25.0), (120.0, 25.0), (180.0, 0.0)],
+        "events": [
+            ("plume", 70.0, 15.0, {"ppm": 500.0}),
+            ("vibration", 90.0, 4.0, {"g": 1.5, "hz": 12.0}),
+            ("dropout", 100.0, 6.0, {"group": "env"}),
+            ("dropout", 130.0, 1.0, {"group": "imu"}),
+            ("vibration", 150.0, 1.0, {"g": 3.0, "hz": 25.0}),
+        ],
+    },
+}
+EVENT_KINDS = ("plume", "vibration", "dropout")
+
+
+class SyntheticTelemetry:
+    """Deterministic multi-rate telemetry frames from a scenario and a seed."""
+
+    def __init__(self, rate_hz=MOCK_RATE_HZ, scenario=MOCK_SCENARIO, seed=MOCK_SEED,
+                 env_rate_hz=MOCK_ENV_RATE_HZ):
+        self.rate = float(rate_hz)
+        self.env_rate = float(env_rate_hz)
+        self.scenario = SCENARIOS[scenario] if isinstance(scenario, str) else scenario
+        for kind, *_ in self.scenario["events"]:
+            if kind not in EVENT_KINDS:
+                raise ValueError(f"Unknown scenario event {kind!r}; expected one of {EVENT_KINDS}")
+        self.rng = np.random.default_rng(seed)
+        self.index = 0          # index of the next frame to generate
+        self._pending = []      # generated but not yet taken
+        self._buffered = 0
+        self._noise = np.array([NOISE[c] for c in CHANNELS])
+
+    def take(self, n):
+        """The next `n` frames as a FRAME_DTYPE array."""
+        while self._buffered < n:
+            self._pending.append(self._generate(CHUNK))
+            self._buffered += CHUNK
+        block = self._pending[0] if len(self._pending) == 1 else np.concatenate(self._pending)
+        self._pending = [block[n:]]
+        self._buffered -= n
+        return block[:n].copy()
+
+    def _generate(self, n):
+        i = self.index + np.arange(n)
+        self.index += n
+        s = i / self.rate                               # seconds since the first frame
+        ts = s % self.scenario["length_s"]              # position in the scenario script
+        noise = self.rng.normal(size=(len(CHANNELS), n)) * self._noise[:, None]
+        v = dict(zip(CHANNELS, noise))
+
+        keys = np.array(self.scenario["depth"], dtype=float)
+        depth = np.interp(ts, keys[:, 0], keys[:, 1])
+        v["Temperature_C"] += DEEP_C + (SURFACE_C - DEEP_C) * np.exp(-depth / THERMOCLINE_M)
+        v["TDS_ppm"] += 200.0
+        v["Flex Voltage"] += 0.8 + 0.04 * depth      # the flex sensor bends with pressure
+
+        # Slow roll and pitch, with the matching gyro rates (°/s) and gravity (g)
+        roll, pitch = 0.4 * np.sin(0.3 * s), 0.2 * np.sin(0.17 * s)
+        v["GyroX"] += np.degrees(0.12 * np.cos(0.3 * s))
+        v["GyroY"] += np.degrees(0.034 * np.cos(0.17 * s))
+        v["AccelX"] += -np.sin(pitch)
+        v["AccelY"] += np.sin(roll) * np.cos(pitch)
+        v["AccelZ"] += np.cos(roll) * np.cos(pitch) - 0.91   # firmware offset
+
+        silent = []
+        for kind, start, duration, p in self.scenario["events"]:
+            inside = (ts >= start) & (ts < start + duration)
+            if not inside.any():
+                continue
+            if kind == "plume":
+                v["TDS_ppm"] += p["ppm"] * np.exp(-0.5 * ((ts - start - duration / 2) / (duration / 6)) ** 2) * inside
+            elif kind == "vibration":
+                wave = p["g"] * np.sin(2 * np.pi * p["hz"] * s) * inside
+                for k, axis in enumerate(("X", "Y", "Z")):
+                    v["Accel" + axis] += wave * (1.0, 0.6, 0.8)[k]
+                    v["Gyro" + axis] += 40.0 * wave * (0.5, 1.0, 0.3)[k]
+            else:
+                silent.append((CHANNEL_GROUPS[p["group"]], inside))
+
+        # The slow sensors are read at env_rate; their other frames carry NaN
+        env = np.floor(i * self.env_rate / self.rate) != np.floor((i - 1) * self.env_rate / self.rate)
+        for c in CHANNEL_GROUPS["env"]:
+            v[c][~env] = np.nan
+        for channels, inside in silent:
+            for c in channels:
+                v[c][inside] = np.nan
+
+        block = np.zeros(n, dtype=FRAME_DTYPE)
+        block["t"] = s
+        block["millis"] = (i * 1000 // self.rate).astype(np.int64) & 0xFFFFFFFF
+        for c in CHANNELS:
+            block[c] = v[c]
+        return block
+
+
+class SyntheticReader(threading.Thread):
+    """Publishes SyntheticTelemetry on the bus in real time; drop-in for SerialReader."""
+
+    def __init__(self, bus, rate_hz=MOCK_RATE_HZ, scenario=MOCK_SCENARIO, seed=MOCK_SEED,
+                 env_rate_hz=MOCK_ENV_RATE_HZ):
+        super().__init__(daemon=True)
+        self.bus = bus
+        self.source = SyntheticTelemetry(rate_hz, scenario, seed, env_rate_hz)
+        self.running = True
+        self.received = 0
+
+    def stop(self):
+        self.running = False
+
+    def send_command(self, command):
+        self.bus.publish(TOPIC_ACK, f"(mock) {command}")
+
+    def run(self):
+        t0 = time.monotonic()
+        while self.running:
+            due = int((time.monotonic() - t0) * self.source.rate) + 1 - self.received
+            if due > 0:
+                block = self.source.take(due)
+                block["t"] += t0
+                block["t_rx_ns"] = time.monotonic_ns()
+                self.received += due
+                self.bus.publish(TOPIC_TELEMETRY, block)
+            time.sleep(TICK_S)
@@ -0,0 +1,149 @@
+import threading
+import time
+import numpy as np
+from settings import TELEMETRY_RING_SIZE
+
+CHANNELS = [
+    "Temperature_C", "TDS_ppm", "Flex Voltage",
+    "GyroX", "GyroY", "GyroZ",
+    "AccelX", "AccelY", "AccelZ",
+]
+
+# Channels the firmware samples together. Each group arrives at its own rate
+# (the DS18B20 needs 750 ms per conversion, the MPU6050 runs at 100 Hz), so a
+# frame carries one or more whole groups and NaN for every other channel.
+CHANNEL_GROUPS = {
+    "env": ["Temperature_C", "TDS_ppm", "Flex Voltage"],
+    "imu": ["GyroX", "GyroY", "GyroZ", "AccelX", "AccelY", "AccelZ"],
+}
+
+# seq: ring sequence number
+# t: when the sample was taken, in host time.monotonic() seconds (the device clock
+#    aligned to the host when the frame carries one, otherwise t_rx_ns)
+# t_rx_ns: host time.monotonic_ns() when the frame's first byte was read
+# millis: the device's millis() counter (binary frames only, else 0)
+# channels: NaN when the frame did not sample them (see CHANNEL_GROUPS)
+FRAME_DTYPE = np.dtype([("seq", np.uint64), ("t", np.float64), ("t_rx_ns", np.int64), ("millis", np.uint32)]
+                       + [(c, np.float32) for c in CHANNELS])
+
+
+class TelemetryRing:
+    """Bounded, thread-safe ring of telemetry frames; drain() returns everything since the last call."""
+
+    def __init__(self, capacity=TELEMETRY_RING_SIZE):
+        self.capacity = capacity
+        self.frames = np.zeros(capacity, dtype=FRAME_DTYPE)
+        self.lock = threading.Lock()
+        self.write_seq = 0
+        self.read_seq = 0
+        self.overflows = 0
+
+    def push(self, values, t=None, t_rx_ns=None):
+        """Append one frame given as a sequence of channel values in CHANNELS order."""
+        if t is None:
+            t = time.monotonic()
+        if t_rx_ns is None:
+            t_rx_ns = int(t * 1e9)
+        with self.lock:
+            slot = self.frames[self.write_seq % self.capacity]
+            slot["seq"] = self.write_seq
+            slot["t"] = t
+            slot["t_rx_ns"] = t_rx_ns
+            slot["millis"] = 0
+            for name, v in zip(CHANNELS, values):
+                slot[name] = v
+            self._advance(1)
+
+    def push_many(self, frames):
+        """Append a structured array of frames (the `seq` field is overwritten)."""
+        n = len(frames)
+        if n == 0:
+            return
+        with self.lock:
+            if n > self.capacity:
+                # Only the newest `capacity` frames can be kept; _advance() counts the rest as lost
+                self.write_seq += n - self.capacity
+                frames = frames[-self.capacity:]
+                n = self.capacity
+            idx = np.arange(self.write_seq, self.write_seq + n, dtype=np.uint64)
+            slots = idx % self.capacity
+            for name in FRAME_DTYPE.names[1:]:
+                self.frames[name][slots] = frames[name]
+            self.frames["seq"][slots] = idx
+            self._advance(n)
+
+    def offer(self, frames):
+        self.push_many(frames)
+
+    def fill(self):
+        return len(self) / self.capacity
+
+    def drain(self, max_items=None):
+        """Return a copy of all unread frames (oldest first) and mark them read."""
+        with self.lock:
+            n = self.write_seq - self.read_seq
+            if max_items is not None:
+                n = min(n, max_items)
+            start = self.read_seq % self.capacity
+            end = start + n
+            if end <= self.capacity:
+                out = self.frames[start:end].copy()
+            else:
+                out = np.concatenate((self.frames[start:], self.frames[:end - self.capacity]))
+            self.read_seq += n
+            return out
+
+    def __len__(self):
+        with self.lock:
+            return self.write_seq - self.read_seq
+
+    def stats(self):
+        with self.lock:
+            return {
+                "capacity": self.capacity,
+                "pending": self.write_seq - self.read_seq,
+                "received": self.write_seq,
+                "overflows": self.overflows,
+            }
+
+    def _advance(self, n):
+        self.write_seq += n
+        lag = self.write_seq - self.read_seq
+        if lag > self.capacity:
+            self.overflows += lag - self.capacity
+            self.read_seq = self.write_seq - self.capacity
+
+
+
+def forward_fill(X, carried):
+    """Copy of the (n, k) array X with each NaN replaced by the newest earlier value in its column. `carried`
+    (k,) holds the values from before row 0."""
+    missing = np.isnan(X)
+    if not missing.any():
+        return X.copy()
+    rows = np.arange(1, len(X) + 1)[:, None]
+    # Row of the last sample at or before each row; 0 is the carried value
+    src = np.maximum.accumulate(np.where(missing, 0, rows), axis=0)
+    return np.vstack([carried, X])[src, np.arange(X.shape[1])]
+
+
+class AsOfJoin:
+    """Joins every frame with the latest value of the channels it did not sample."""
+
+    def __init__(self, channels=CHANNELS):
+        self.channels = list(channels)
+        self.latest = np.full(len(self.channels), np.nan)
+
+    def fill(self, frames):
+        """Copy of `frames` with missing channel values forward-filled."""
+        out = frames.copy()
+        if len(out) == 0:
+            return out
+        X = forward_fill(np.column_stack([out[c] for c in self.channels]).astype(np.float64), self.latest)
+        for i, name in enumerate(self.channels):
+            out[name] = X[:, i]
+        self.latest = X[-1].copy()
+        return out
+
+    def reset(self):
+        self.latest[:] = np.nan
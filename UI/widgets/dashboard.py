@@ -1,45 +1,122 @@
-import pandas as pd
 import numpy as np
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QGridLayout, QTabWidget, QGroupBox, QPushButton, QLabel, QFrame, QStatusBar, QListWidget, QListWidgetItem, QHBoxLayout, QVBoxLayout, QPushButton, QLabel
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QGridLayout, QTabWidget, QGroupBox, QPushButton, QLabel, QFrame, QStatusBar, QListWidget, QListWidgetItem, QHBoxLayout, QVBoxLayout, QPushButton, QLabel, QComboBox, QSlider, QShortcut
 from PyQt5.QtCore import QTimer, Qt, QSize
 
 import pyqtgraph as pg
 from config import *
-from utils.data import generate_data
+from utils.bus import TOPIC_PHOTO, TOPIC_ACK, TOPIC_LINK, COALESCE
+from utils.plot_buffer import PlotRing
+from utils.pyramid import MinMaxPyramid
 from utils.ui_helpers import add_shadow
 from widgets.ocean_cube import OceanCubeCanvas
 from PyQt5.QtGui import QFont, QColor, QPalette
-from PyQt5.QtGui import QPixmap, QIcon
+from PyQt5.QtGui import QPixmap, QIcon, QKeySequence
 from PyQt5.QtWidgets import QDialog, QVBoxLayout
 
-from utils.life_detector import LifeDetector
+from utils.life_detector import make_detector, features
+from utils.telemetry_queue import AsOfJoin
+from utils.detector_worker import DetectorWorker
+from utils.orientation import OrientationFilter
+from utils.recorder import MissionRecorder, record_frames, export_csv
+from utils.replay import ReplayReader
+from utils.profiler import profiler, profile_paint
+from widgets.perf_overlay import PerfOverlay
 from PyQt5.QtWidgets import QProgressBar
 import os
-
-
-from config import USE_MOCK_DATA
-if not USE_MOCK_DATA:
-    from utils.data import reader
+import time
 
 
 # State
-data_log = []
+sample_count = 0
 running = False
 mission_time = 0
-MAX_POINTS = 300
+MAX_POINTS = 20000
+
+# Channel order of the plot ring buffers (one per channel, as channels arrive at different rates)
+PLOT_CHANNELS = ["Temperature_C", "TDS_ppm", "Flex Voltage",
+                 "AccelX", "AccelY", "AccelZ", "GyroX", "GyroY", "GyroZ"]
+# Profiler stage names of the live plots, in self.plots order
+PLOT_NAMES = ("temp", "tds", "flex", "accel", "gyro")
+
+class RobotState:
+    """What the dashboard keeps per robot: plot buffers, attitude, detector, recorder and photos."""
+
+    def __init__(self, link, parent):
+        self.link = link
+        self.name = link.name
+        # Everything but telemetry frames reaches the GUI through its own bus queues
+        self.photo_sub = link.bus.subscribe(TOPIC_PHOTO, maxsize=8, name="dashboard")
+        self.ack_sub = link.bus.subscribe(TOPIC_ACK, maxsize=32, name="dashboard")
+        self.link_sub = link.bus.subscribe(TOPIC_LINK, maxsize=1, policy=COALESCE, name="dashboard")
+        self.detector = DetectorWorker(make_detector(), parent)
+        self.orientation = OrientationFilter()
+        self.recorder = None
+        self.photos = []          # saved photo paths in gallery order (None for mock photos)
+        self.reply = ""           # last reply from the robot
+        self.link_dropped = 0
+        self.ring_overflows = 0
+        self.init_buffers()
+        self.reset()
+
+    def init_buffers(self):
+        # Each channel keeps its own timestamped series, in PLOT_CHANNELS order
+        self.plot_bufs = [PlotRing(MAX_POINTS, 1) for _ in PLOT_CHANNELS]
+        self.pyramids = [MinMaxPyramid(1) for _ in PLOT_CHANNELS]
+        self.asof = AsOfJoin()
+
+    def reset(self):
+        """Forget the previous mission's data."""
+        for buf, pyramid in zip(self.plot_bufs, self.pyramids):
+            buf.clear()
+            pyramid.clear()
+        self.asof.reset()
+        self.orientation.reset()
+        self.t_origin = None        # host time of the mission's first frame; plots show seconds since then
+        self.awaiting_paint = []    # (t, t_rx_ns) of frames ingested since the last render (selected robot)
+        self.interest_score = 0.0
+        self.latest = None          # newest frame with every channel filled in by the as-of join
+
 
 class OceanDashboard(QWidget):
-    def __init__(self):
+    def __init__(self, links):
         super().__init__()
         self.setWindowTitle("🦑 JellyBot – Underwater Exploration")
         self.resize(1650, 900)
         self._setup_palette()
+        self.robots = [RobotState(link, self) for link in links]
+        self.robot = self.robots[0]   # the one on screen
+        # A replay is the only link when REPLAY_PATH is set
+        self.replay = links[0].reader if isinstance(links[0].reader, ReplayReader) else None
+        for robot in self.robots:
+            robot.detector.score_ready.connect(lambda score, r=robot: self._on_score(r, score))
+            robot.detector.start()
         self._init_buffers()
         self._build_ui()
-        self.detector = LifeDetector()
-        self.timer = QTimer(self); self.timer.timeout.connect(self._tick); self.timer.start(400)
+        self._dirty = False
+        self._score_level = None
+        self._run_started = time.monotonic()
+        self._build_profiling()
+
+        # Ingest drains the telemetry queue as frames arrive; render paints at a fixed frame rate
+        self.ingest_timer = QTimer(self); self.ingest_timer.timeout.connect(self._ingest); self.ingest_timer.start(INGEST_INTERVAL_MS)
+        self.render_timer = QTimer(self); self.render_timer.timeout.connect(self._render); self.render_timer.start(int(1000 / RENDER_FPS))
 
      # ------------------------------------------------------------------
+    def _build_profiling(self):
+        # Paint time of each plot and of the cube, plus the overlay and its shortcuts
+        for name, plot in zip(PLOT_NAMES, self.plots):
+            profile_paint(plot, f"paint.{name}")
+        profile_paint(self.overview_plot, "paint.overview")
+        profile_paint(self.cube, "paint.cube")
+        self.perf_overlay = PerfOverlay(self)
+        QShortcut(QKeySequence(PERF_OVERLAY_KEY), self, self.perf_overlay.toggle)
+        QShortcut(QKeySequence(PERF_DUMP_KEY), self, self._dump_profile)
+
+    def _dump_profile(self):
+        os.makedirs(PERF_DUMP_DIR, exist_ok=True)
+        path = profiler.dump(os.path.join(PERF_DUMP_DIR, time.strftime("perf-%Y%m%d-%H%M%S.json")))
+        self.msg_lbl.setText(f"Timings written to {path}")
+
     def _setup_palette(self):
         pal = QPalette()
         for role in (QPalette.Window, QPalette.Base, QPalette.AlternateBase): pal.setColor(role, COLOR_BG)
@@ -56,8 +133,8 @@ class OceanDashboard(QWidget):
 
     # ------------------------------------------------------------------
     def _init_buffers(self):
-        self.steps=[]; self.temp=[]; self.tds=[]; self.flex=[]
-        self.acc={ax:[] for ax in 'XYZ'}; self.gyro={ax:[] for ax in 'XYZ'}
+        self._overview_refreshed = 0.0
+        self._painting = []   # (t, t_rx_ns) of frames handed to the last render, until it reaches the screen
 
     # ------------------------------------------------------------------
     def _build_ui(self):
@@ -74,10 +151,18 @@ class OceanDashboard(QWidget):
         ctrl_frame = QFrame(); ctrl_layout = QVBoxLayout(ctrl_frame)
         ctrl_grp = QGroupBox("Mission Control"); ctrl_grp.setFont(FONT_TITLE)
         h = QHBoxLayout()
-        for text, func in [("▶ Start", self._start), ("⏹ Stop", self._stop), ("💾 Save", self._save)]:
+        if len(self.robots) > 1:
+            # Robot switcher; each entry also shows that robot's interest score
+            self.robot_switch = QComboBox(); self.robot_switch.setFont(FONT_BODY)
+            self.robot_switch.addItems([robot.name for robot in self.robots])
+            self.robot_switch.currentIndexChanged.connect(self._select_robot)
+            h.addWidget(self.robot_switch)
+        for text, func in [("▶ Start", self._start), ("⏹ Stop", self._stop), ("💾 Save", self._save), ("📤 Export CSV", self._export)]:
             btn = QPushButton(text); btn.setFont(FONT_BODY); btn.setStyleSheet(STYLE_BUTTON); btn.clicked.connect(func); add_shadow(btn, blur=30, dy=4)
             h.addWidget(btn)
         ctrl_grp.setLayout(h); ctrl_layout.addWidget(ctrl_grp)
+        if self.replay is not None:
+            ctrl_layout.addWidget(self._build_replay_controls())
         add_shadow(ctrl_frame)
         layout.addWidget(ctrl_frame)
 
@@ -95,6 +180,7 @@ class OceanDashboard(QWidget):
         # orientation cube with frame & shadow
         cube_frame = QFrame(); cube_layout = QVBoxLayout(cube_frame)
         self.cube = OceanCubeCanvas(self, w=5, h=5)
+        self.cube.painted.connect(self._on_painted)
         cube_layout.addWidget(self.cube)
         add_shadow(cube_frame)
         main_layout.addWidget(cube_frame, 1, 1, 2, 1)
@@ -105,6 +191,10 @@ class OceanDashboard(QWidget):
         graph_tabs.addTab(self._build_env_sensor_tab(), "Env Sensors")
         graph_tabs.addTab(self._build_motion_tab(),      "Motion")
         graph_tabs.addTab(self._build_photos_tab(), "Photos")
+        graph_tabs.addTab(self._build_overview_tab(), "Mission Overview")
+        self.graph_tabs = graph_tabs
+        self.plots = (self.plot_temp, self.plot_tds, self.plot_flex, self.accel_plot, self.gyro_plot)
+        self.curves = [item for plot in self.plots for item in plot.listDataItems()]  # PLOT_CHANNELS order
         graph_layout.addWidget(graph_tabs)
         add_shadow(graph_frame)
         main_layout.addWidget(graph_frame, 1, 0)
@@ -114,12 +204,43 @@ class OceanDashboard(QWidget):
         # STATUS BAR ---------------------------------------------------
         layout.addWidget(self._build_status_bar())
 
+    # ------------------------------------------------------------------
+    def _build_replay_controls(self):
+        grp = QGroupBox("Replay"); grp.setFont(FONT_TITLE)
+        h = QHBoxLayout(grp)
+
+        self.replay_speed = QComboBox(); self.replay_speed.setFont(FONT_BODY)
+        for label, speed in REPLAY_SPEEDS:
+            self.replay_speed.addItem(label, speed)
+        idx = self.replay_speed.findData(self.replay.speed)
+        self.replay_speed.setCurrentIndex(max(idx, 0))
+        self.replay_speed.currentIndexChanged.connect(
+            lambda i: self.replay.set_speed(self.replay_speed.itemData(i)))
+
+        # Slider in tenths of a second of mission time
+        self.replay_slider = QSlider(Qt.Horizontal)
+        self.replay_slider.setRange(0, int(self.replay.duration * 10))
+        self.replay_slider.sliderReleased.connect(
+            lambda: self.replay.seek(self.replay_slider.value() / 10))
+
+        self.replay_lbl = QLabel(); self.replay_lbl.setFont(FONT_BODY)
+        self.replay_lbl.setStyleSheet(f"color:{COLOR_TEXT.name()}")
+        for w in (self.replay_speed, self.replay_slider, self.replay_lbl):
+            h.addWidget(w)
+        return grp
+
+    def _update_replay_controls(self):
+        t = self.replay.position()
+        if not self.replay_slider.isSliderDown():
+            self.replay_slider.setValue(int(t * 10))
+        self.replay_lbl.setText(f"{t:6.1f} / {self.replay.duration:.1f} s")
+
     # ------------------------------------------------------------------
     def _build_env_sensor_tab(self):
         w = QWidget(); v = QVBoxLayout(w)
-        self.plot_temp = self._make_line_plot("Temp (°C)")
-        self.plot_tds  = self._make_line_plot("TDS (ppm)")
-        self.plot_flex = self._make_line_plot("Flex (V)")
+        self.plot_temp = self._make_line_plot("Temp (°C)", COLOR_PRIMARY)
+        self.plot_tds  = self._make_line_plot("TDS (ppm)", COLOR_SECONDARY)
+        self.plot_flex = self._make_line_plot("Flex (V)", COLOR_PRIMARY)
         for p in (self.plot_temp, self.plot_tds, self.plot_flex): v.addWidget(p)
         return w
 
@@ -130,15 +251,60 @@ class OceanDashboard(QWidget):
         v.addWidget(self.accel_plot); v.addWidget(self.gyro_plot)
         return w
 
+    def _build_overview_tab(self):
+        w = QWidget(); v = QVBoxLayout(w)
+        self.overview_channel = QComboBox(); self.overview_channel.setFont(FONT_BODY)
+        self.overview_channel.addItems(PLOT_CHANNELS)
+        self.overview_channel.currentIndexChanged.connect(lambda _: self._refresh_overview(force=True))
+        v.addWidget(self.overview_channel)
+
+        self.overview_plot = pg.PlotWidget(title="Mission overview")
+        self.overview_plot.setTitle("Mission overview", color=COLOR_TEXT.name(), size="12pt")
+        self.overview_plot.getAxis('bottom').setPen(COLOR_TEXT.name())
+        self.overview_plot.getAxis('left').setPen(COLOR_TEXT.name())
+        self.overview_plot.setLabel('bottom', "Mission time (s)")
+        self.overview_curve = self.overview_plot.plot([], [], pen=pg.mkPen(COLOR_PRIMARY, width=1), skipFiniteCheck=True)
+        # Zooming re-queries the pyramid for just enough points for the new range
+        self.overview_plot.getViewBox().sigXRangeChanged.connect(lambda *_: self._refresh_overview(force=True))
+        v.addWidget(self.overview_plot)
+        return w
+
+    def _refresh_overview(self, force=False):
+        pyramid = self.robot.pyramids[self.overview_channel.currentIndex()]
+        if self.graph_tabs.currentIndex() != self.graph_tabs.count() - 1 or len(pyramid) == 0:
+            return
+        now = time.monotonic()
+        if not force and now - self._overview_refreshed < OVERVIEW_REFRESH_S:
+            return
+        self._overview_refreshed = now
+
+        vb = self.overview_plot.getViewBox()
+        origin = self.robot.t_origin
+        if vb.autoRangeEnabled()[0]:
+            t0, t1 = pyramid.time_span()  # follow the whole mission until the user zooms
+        else:
+            (x0, x1), _ = vb.viewRange()
+            t0, t1 = x0 + origin, x1 + origin
+        width = max(int(vb.width()), 100)
+        x, y = pyramid.query(0, t0, t1, 2 * width)
+        self.overview_curve.setData(x - origin, y)
+
     # ------------------------------------------------------------------
     from config import GRAPH_Y_LIMITS
 
     @staticmethod
-    def _make_line_plot(title):
+    def _setup_fast_plot(p):
+        # Only draw what is visible and decimate to the pixel width
+        p.setClipToView(True)
+        p.setDownsampling(auto=True, mode='peak')
+
+    @staticmethod
+    def _make_line_plot(title, color):
         p = pg.PlotWidget(title=title)
         p.setTitle(title, color=COLOR_TEXT.name(), size="12pt")
         p.getAxis('bottom').setPen(COLOR_TEXT.name())
         p.getAxis('left').setPen(COLOR_TEXT.name())
+        p.setLabel('bottom', "Mission time (s)")
 
         if "Temp" in title:
             p.setYRange(*GRAPH_Y_LIMITS["Temperature_C"])
@@ -147,6 +313,8 @@ class OceanDashboard(QWidget):
         elif "Flex" in title:
             p.setYRange(*GRAPH_Y_LIMITS["Flex Voltage"])
 
+        p.plot([], [], pen=pg.mkPen(color, width=3), skipFiniteCheck=True)
+        OceanDashboard._setup_fast_plot(p)
         return p
 
     @staticmethod
@@ -155,6 +323,7 @@ class OceanDashboard(QWidget):
         p.setTitle(title, color=COLOR_TEXT.name(), size="12pt")
         p.getAxis('bottom').setPen(COLOR_TEXT.name())
         p.getAxis('left').setPen(COLOR_TEXT.name())
+        p.setLabel('bottom', "Mission time (s)")
 
         if "Accel" in title:
             p.setYRange(*GRAPH_Y_LIMITS["Accel"])
@@ -162,7 +331,8 @@ class OceanDashboard(QWidget):
             p.setYRange(*GRAPH_Y_LIMITS["Gyro"])
 
         for clr in ('r', 'g', 'b'):
-            p.plot([], [], pen=pg.mkPen(clr, width=2))
+            p.plot([], [], pen=pg.mkPen(clr, width=2), skipFiniteCheck=True)
+        OceanDashboard._setup_fast_plot(p)
 
         return p
 
@@ -176,151 +346,293 @@ class OceanDashboard(QWidget):
 
     # ------------------------------------------------------------------
     def _start(self):
-        global running, mission_time, data_log
-        running, mission_time = True, 0
+        global running, mission_time, sample_count
+        running, mission_time, sample_count = True, 0, 0
+        self._run_started = time.monotonic()
+        self._dirty = False
         self.msg_lbl.setText("Running")
 
         # CLEAR EVERYTHING
-        data_log.clear()
-
-        self.steps.clear()
-        self.temp.clear()
-        self.tds.clear()
-        self.flex.clear()
-        for ax in 'XYZ':
-            self.acc[ax].clear()
-            self.gyro[ax].clear()
+        self._painting = []
 
         # Clear plots immediately
-        for plot in (self.plot_temp, self.plot_tds, self.plot_flex):
-            plot.clear()
-        for plot in (self.accel_plot, self.gyro_plot):
-            for item in plot.listDataItems():
-                item.clear()
+        for curve in self.curves:
+            curve.clear()
 
-        self.detector = LifeDetector()
+        for robot in self.robots:
+            robot.reset()
+            robot.detector.reset(make_detector())
+
+            # Discard frames that queued up while the mission was not running
+            robot.link.drain()
+            robot.ring_overflows = robot.link.telemetry.stats()["overflows"]
+
+            # Every mission streams to its own directory from the first frame
+            if robot.recorder is not None:
+                robot.recorder.close()
+            robot.recorder = MissionRecorder(robot.link.record_dir)
+            robot.recorder.start()
+        if self.replay is not None:
+            self.replay.seek(0)  # a replayed mission starts from its beginning
 
     def _stop(self):
-        global running
+        global running, mission_time
+        if running:
+            mission_time = self._mission_time()
         running = False; self.msg_lbl.setText("Paused")
+        for robot in self.robots:
+            if robot.recorder is not None:
+                robot.recorder.flush()
 
     def _save(self):
-        pd.DataFrame(data_log).to_csv("data.csv", index=False); self.msg_lbl.setText("Data saved to data.csv")
+        # Frames are already on disk; just make sure the tail is written and synced
+        if self.robot.recorder is None:
+            self.msg_lbl.setText("Nothing recorded yet")
+            return
+        for robot in self.robots:
+            robot.recorder.flush()
+        self.msg_lbl.setText(f"Mission recorded in {self.robot.recorder.path}")
+
+    def _export(self):
+        # Exports the robot on screen
+        recorder = self.robot.recorder
+        if recorder is None:
+            self.msg_lbl.setText("Nothing recorded yet")
+            return
+        recorder.flush(wait=True)
+        name = "data.csv" if len(self.robots) == 1 else f"data_{self.robot.name.replace(' ', '_')}.csv"
+        out = export_csv(recorder.path, name)
+        self.msg_lbl.setText(f"Data exported to {out}")
 
     # ------------------------------------------------------------------
-    def _tick(self):
-        global mission_time
+    def _ingest(self):
+        """Consume every robot's queued frames: detector, recorder and plot buffers. No painting."""
+        for robot in self.robots:
+            self._poll_bus(robot)
         if not running:
             return
+        for robot in self.robots:
+            self._ingest_robot(robot)
+
+    def _ingest_robot(self, robot):
+        global sample_count
+        with profiler.stage("ingest.drain"):
+            frames = robot.link.drain()
+        if len(frames) == 0:
+            return  # nothing new since the last ingest
+
+        with profiler.stage("ingest"):
+            self._check_telemetry_health(robot)
+
+            with profiler.stage("ingest.orientation"):
+                quats = robot.orientation.update_batch(
+                    np.column_stack([frames['AccelX'], frames['AccelY'], frames['AccelZ']]),
+                    np.column_stack([frames['GyroX'], frames['GyroY'], frames['GyroZ']]),
+                    frames['t'],
+                )
+
+            # Scoring happens on the detector thread; the result arrives via _on_score
+            with profiler.stage("ingest.detector"):
+                robot.detector.submit(features(frames))
+
+            # Every frame is recorded, not just the newest
+            with profiler.stage("ingest.record"):
+                robot.recorder.write(record_frames(frames, quats))
+
+            with profiler.stage("ingest.buffers"):
+                sample_count += len(frames)
+                if robot.t_origin is None:
+                    robot.t_origin = float(frames['t'][0])
+                t = frames['t']
+                plotted = False
+                for c, buf, pyramid in zip(PLOT_CHANNELS, robot.plot_bufs, robot.pyramids):
+                    y = frames[c]
+                    sampled = ~np.isnan(y)   # slower channels are NaN in most frames
+                    if not sampled.any():
+                        continue
+                    t_c, y = (t, y) if sampled.all() else (t[sampled], y[sampled])
+                    buf.append(t_c - robot.t_origin, y[None, :])
+                    pyramid.append(t_c, y[None, :])
+                    plotted = True
+
+        if not plotted:
+            return  # every channel was silent (e.g. a sensor dropout): nothing new to show
+        robot.latest = robot.asof.fill(frames)[-1]
+        if robot is self.robot:
+            robot.awaiting_paint.append((frames['t'], frames['t_rx_ns']))
+            self._dirty = True
+
+    def _poll_bus(self, robot):
+        # Photos, robot replies and link counters, handled on the GUI thread
+        for photo in robot.photo_sub.drain():
+            self._process_photo(robot, photo)
+        for text in robot.ack_sub.drain():
+            robot.reply = f"🤖 {text}"
+            if robot is self.robot:
+                self.robot_lbl.setText(robot.reply)
+        for stats in robot.link_sub.drain():
+            if stats["dropped"] > robot.link_dropped:
+                print(f"[Dashboard] {robot.name}: link dropped {stats['dropped'] - robot.link_dropped} frames "
+                      f"({stats['crc_errors']} CRC errors so far)")
+            robot.link_dropped = stats["dropped"]
+
+    def _on_score(self, robot, score):
+        robot.interest_score = score
+        if robot is self.robot:
+            self._dirty = True
+
+    def _select_robot(self, index):
+        """Show robot `index`: its plots, attitude, photos and replies."""
+        self.robot = self.robots[index]
+        self.robot.awaiting_paint, self._painting = [], []
+        for curve in self.curves:
+            curve.clear()
+        self.gallery.clear()
+        for n, path in enumerate(self.robot.photos, 1):
+            self._add_gallery_item(path, n)
+        self.robot_lbl.setText(self.robot.reply)
+        self._dirty = self.robot.latest is not None
+        self._refresh_overview(force=True)
+
+    def _update_robot_switch(self):
+        # Every robot's score stays visible while another one is on screen
+        for i, robot in enumerate(self.robots):
+            text = f"{robot.name}  🌟 {robot.interest_score:.1f}"
+            if self.robot_switch.itemText(i) != text:
+                self.robot_switch.setItemText(i, text)
 
-        mission_time += 0.4
-        m, s = divmod(int(mission_time), 60)
-        self.time_lbl.setText(f"{m:02d}:{s:02d}")
-
-        d = generate_data()
-        if d is None:
-            return  # if serial not ready yet, skip frame
-
-        # Prepare ML sample
-        sample = [
-            d["Temperature_C"],
-            d["TDS_ppm"],
-            d["AccelX"],
-            d["AccelY"],
-            d["AccelZ"],
-            d["GyroX"],
-            d["GyroY"],
-            d["GyroZ"],
-        ]
-
-        self.detector.add_sample(sample)
-        interest_score = self.detector.predict_interest(sample)
+    # ------------------------------------------------------------------
+    def _render(self):
+        """Paint everything that arrived since the last frame, at most RENDER_FPS times a second."""
+        if not running:
+            return
 
+        m, s = divmod(int(self._mission_time()), 60)
+        clock = f"{m:02d}:{s:02d}"
+        if clock != self.time_lbl.text():
+            self.time_lbl.setText(clock)
+        if self.replay is not None:
+            self._update_replay_controls()
+        if hasattr(self, "robot_switch"):
+            self._update_robot_switch()
+
+        robot = self.robot
+        if not self._dirty or robot.latest is None:
+            return  # nothing changed since the last paint
+        self._dirty = False
+
+        profiler.mark("frame")
+        with profiler.stage("render"):
+            with profiler.stage("render.labels"):
+                self._update_labels(robot.latest, robot.interest_score)
+
+            # Persistent curves, fed contiguous views of the ring buffers. Every plot shows
+            # the same time window: the span still held by the fastest channel's ring.
+            views = [buf.view() for buf in robot.plot_bufs]
+            spans = [(ts[0], ts[-1]) for ts, _ in views if len(ts)]
+            if not spans:
+                return
+            t0, t1 = max(a for a, _ in spans), max(b for _, b in spans)
+            k = 0
+            for name, plot in zip(PLOT_NAMES, self.plots):
+                with profiler.stage(f"render.plot.{name}"):
+                    for curve in plot.listDataItems():
+                        ts, ys = views[k]
+                        curve.setData(ts, ys[0])
+                        k += 1
+                    plot.setXRange(t0, t1)
+
+            # Latency is measured when the cube, always on screen, has actually repainted
+            self._painting.extend(robot.awaiting_paint)
+            robot.awaiting_paint = []
+            del self._painting[:-64]   # nothing painted for a while (e.g. minimised)
+
+            # update cube from the fused attitude
+            with profiler.stage("render.cube"):
+                self.cube.set_rotation(robot.orientation.rotation_matrix())
+
+            with profiler.stage("render.overview"):
+                self._refresh_overview()
+
+    def _on_painted(self):
+        if not self._painting:
+            return
+        now_ns = time.monotonic_ns()
+        t = np.concatenate([b[0] for b in self._painting])
+        rx = np.concatenate([b[1] for b in self._painting])
+        self._painting = []
+        profiler.record_many("latency.rx_to_pixel", (now_ns - rx) / 1e9)
+        sensor = now_ns / 1e9 - t
+        profiler.record_many("latency.sensor_to_pixel", sensor)
+        self.latency_lbl.setText(f"⏱ {sensor[-1] * 1000:.0f} ms")
+
+    def _update_labels(self, d, interest_score):
         # Update message bar
         self.msg_lbl.setText(f"🌟 Interest Score: {interest_score:.2f}")
-
-        # Optional: Color feedback based on score
-        if interest_score > 0.7:
-            self.msg_lbl.setStyleSheet("color: red; font-weight: bold;")
-        elif interest_score > 0.4:
-            self.msg_lbl.setStyleSheet("color: orange;")
-        else:
-            self.msg_lbl.setStyleSheet(f"color:{COLOR_TEXT.name()};")
-
-
-        # Update interest bar
         self.interest_bar.setValue(int(interest_score * 100))
 
-        # Dynamic color
+        # Color feedback based on score; stylesheets are only re-applied when the level changes
         if interest_score > 0.7:
-            color = "red"
+            level = "red"
         elif interest_score > 0.4:
-            color = "orange"
+            level = "orange"
         else:
-            color = "green"
-
-        self.interest_bar.setStyleSheet(f"""
-            QProgressBar {{
-                border: 2px solid #aaa;
-                border-radius: 8px;
-                background-color: #222;
-            }}
-            QProgressBar::chunk {{
-                background-color: {color};
-                border-radius: 6px;
-            }}
-        """)
-
-
-
-        data_log.append(d)
-        i = len(data_log)
-        self.steps.append(i)
-        self.temp.append(d['Temperature_C'])
-        self.tds.append(d['TDS_ppm'])
-        self.flex.append(d['Flex Voltage'])
-        for ax in 'XYZ':
-            self.acc[ax].append(d[f'Accel{ax}'])
-            self.gyro[ax].append(d[f'Gyro{ax}'])
-
-        if i > MAX_POINTS:
-            for seq in (self.steps, self.temp, self.tds, self.flex):
-                seq.pop(0)
-            for dic in (self.acc, self.gyro):
-                for ax in 'XYZ':
-                    dic[ax].pop(0)
+            level = "green"
+
+        if level != self._score_level:
+            self._score_level = level
+            if level == "red":
+                self.msg_lbl.setStyleSheet("color: red; font-weight: bold;")
+            elif level == "orange":
+                self.msg_lbl.setStyleSheet("color: orange;")
+            else:
+                self.msg_lbl.setStyleSheet(f"color:{COLOR_TEXT.name()};")
+
+            self.interest_bar.setStyleSheet(f"""
+                QProgressBar {{
+                    border: 2px solid #aaa;
+                    border-radius: 8px;
+                    background-color: #222;
+                }}
+                QProgressBar::chunk {{
+                    background-color: {level};
+                    border-radius: 6px;
+                }}
+            """)
 
         # update UI
         self.temp_lbl.setText(f"🌡 Temp: {d['Temperature_C']:.2f} °C")
         self.tds_lbl.setText(f"💧 TDS: {d['TDS_ppm']:.0f} ppm")
         self.flex_lbl.setText(f"📏 Flex: {d['Flex Voltage']:.2f} V")
 
-        # env plots
-        for buf, plot, col in [(self.temp, self.plot_temp, COLOR_PRIMARY),
-                            (self.tds, self.plot_tds, COLOR_SECONDARY),
-                            (self.flex, self.plot_flex, COLOR_PRIMARY)]:
-            plot.plot(self.steps, buf, pen=pg.mkPen(col, width=3), clear=True)
-            plot.setXRange(max(0, i - MAX_POINTS), i)
-
-        # motion plots
-        for plot, series in [(self.accel_plot, self.acc), (self.gyro_plot, self.gyro)]:
-            for idx, ax in enumerate('XYZ'):
-                plot.listDataItems()[idx].setData(self.steps, series[ax])
-            plot.setXRange(max(0, i - MAX_POINTS), i)
-
-        # update cube
-        self.cube.update_orientation(
-            np.radians(d['GyroX']),
-            np.radians(d['GyroY']),
-            np.radians(d['GyroZ'])
-        )
+    def _mission_time(self):
+        if running:
+            return mission_time + time.monotonic() - self._run_started
+        return mission_time
+
+    def closeEvent(self, event):
+        for robot in self.robots:
+            robot.detector.stop()
+            if robot.recorder is not None:
+                robot.recorder.close()
+        super().closeEvent(event)
+
+    def _check_telemetry_health(self, robot):
+        telemetry = robot.link.telemetry
+        overflows = telemetry.stats()["overflows"]
+        if overflows != robot.ring_overflows:
+            print(f"[Dashboard] {robot.name}: telemetry ring overflow: {overflows - robot.ring_overflows} frames lost "
+                  f"(TELEMETRY_RING_SIZE={telemetry.capacity})")
+            robot.ring_overflows = overflows
 
     def _build_status_bar(self):
         bar = QStatusBar()
         self.time_lbl = QLabel("00:00")
         self.msg_lbl = QLabel("Ready")
-        
-        for w in (self.time_lbl, self.msg_lbl):
+        self.latency_lbl = QLabel("⏱ -- ms")
+        self.latency_lbl.setToolTip("Sensor-to-pixel latency of the newest sample")
+
+        for w in (self.time_lbl, self.msg_lbl, self.latency_lbl):
             w.setFont(FONT_BODY)
             w.setStyleSheet(f"color:{COLOR_TEXT.name()}")
 
@@ -342,6 +654,7 @@ class OceanDashboard(QWidget):
             }
         """)
 
+        bar.addPermanentWidget(self.latency_lbl)
         bar.addPermanentWidget(self.time_lbl)
         bar.addWidget(self.msg_lbl)
         bar.addPermanentWidget(self.interest_bar)
@@ -377,6 +690,12 @@ class OceanDashboard(QWidget):
 
         v.addLayout(button_row)
 
+        # Last reply from the robot (TOPIC_ACK)
+        self.robot_lbl = QLabel("")
+        self.robot_lbl.setFont(FONT_BODY)
+        self.robot_lbl.setStyleSheet(f"color:{COLOR_TEXT.name()}")
+        v.addWidget(self.robot_lbl)
+
         # Gallery
         self.gallery = QListWidget()
         self.gallery.setViewMode(QListWidget.IconMode)
@@ -395,39 +714,49 @@ class OceanDashboard(QWidget):
    
     def _capture_photo(self):
         if USE_MOCK_DATA:
-            pixmap = QPixmap(150, 150)
-            pixmap.fill(Qt.gray)
-            item = QListWidgetItem(QIcon(pixmap), f"Mock Photo {self.gallery.count()+1}")
-            self.gallery.addItem(item)
+            self.robot.photos.append(None)
+            self._add_gallery_item(None, len(self.robot.photos))
         else:
-            print("[Dashboard] Sending SNAP command")
-            reader.send_command("SNAP")
-            reader.on_photo_received = self._process_photo
-
+            print(f"[Dashboard] Sending SNAP command to {self.robot.name}")
+            self.robot.link.send_command("SNAP")  # the photo arrives on TOPIC_PHOTO
 
     def _rotate_left(self):
-        if not USE_MOCK_DATA:
-            reader.send_command("LEFT")
+        self.robot.link.send_command("LEFT")
         print("Rotate Servo Left")
 
     def _rotate_right(self):
-        if not USE_MOCK_DATA:
-            reader.send_command("RIGHT")
+        self.robot.link.send_command("RIGHT")
         print("Rotate Servo Right")
 
-    def _process_photo(self, photo_bytes):
-        print(f"[Dashboard] Received photo, size: {len(photo_bytes)} bytes")
+    def _add_gallery_item(self, path, n):
+        if path is None:
+            pixmap = QPixmap(150, 150)
+            pixmap.fill(Qt.gray)
+            item = QListWidgetItem(QIcon(pixmap), f"Mock Photo {n}")
+        else:
+            pixmap = QPixmap(path)
+            icon = QIcon(pixmap.scaled(150, 150, Qt.KeepAspectRatio, Qt.SmoothTransformation))
+            item = QListWidgetItem(icon, f"Photo {n}")
+        item.setData(Qt.UserRole, path)
+        self.gallery.addItem(item)
 
+    def _process_photo(self, robot, photo):
         try:
-            os.makedirs("captured_photos", exist_ok=True)
-            photo_path = f"captured_photos/photo_{self.gallery.count()+1}.jpg"
-            with open(photo_path, "wb") as f:
-                f.write(photo_bytes)
-
-            pixmap = QPixmap(photo_path)
-            icon = QIcon(pixmap.scaled(150, 150, Qt.KeepAspectRatio, Qt.SmoothTransformation))
-            item = QListWidgetItem(icon, f"Photo {self.gallery.count()+1}")
-            self.gallery.addItem(item)
+            photo_dir = robot.link.photo_dir
+            os.makedirs(photo_dir, exist_ok=True)
+            photo_path = os.path.join(photo_dir, f"photo_{len(robot.photos)+1}.jpg")
+            if isinstance(photo, str):
+                # Chunked transfer: already streamed to disk
+                print(f"[Dashboard] Received photo: {photo}")
+                os.replace(photo, photo_path)
+            else:
+                print(f"[Dashboard] Received photo, size: {len(photo)} bytes")
+                with open(photo_path, "wb") as f:
+                    f.write(photo)
+
+            robot.photos.append(photo_path)
+            if robot is self.robot:
+                self._add_gallery_item(photo_path, len(robot.photos))
 
             print(f"[Dashboard] Photo saved and displayed: {photo_path}")
 
@@ -441,7 +770,9 @@ class OceanDashboard(QWidget):
         try:
             # Find the image path based on item index
             index = self.gallery.row(item)
-            photo_path = f"captured_photos/photo_{index+1}.jpg"
+            photo_path = item.data(Qt.UserRole)
+            if photo_path is None:
+                return  # mock photo
 
             # Create popup window
             dialog = QDialog(self)
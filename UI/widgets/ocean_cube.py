@@ -1,44 +1,121 @@
 import numpy as np
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as MplCanvas
-from matplotlib.figure import Figure
-from mpl_toolkits.mplot3d.art3d import Poly3DCollection
+from PyQt5.QtWidgets import QWidget
+from PyQt5.QtGui import QPainter, QPen, QBrush, QColor, QPolygonF
+from PyQt5.QtCore import Qt, QPointF, QSize, pyqtSignal
 from config import COLOR_BG, COLOR_PRIMARY, COLOR_SECONDARY
 
-class OceanCubeCanvas(MplCanvas):
+# Fixed camera, same as the old mplot3d view_init(elev=20, azim=0)
+VIEW_ELEV = np.radians(20)
+VIEW_AZIM = np.radians(0)
+VIEW_LIMIT = 2.0     # world units from the centre to the edge, like set_xlim(-2, 2)
+VIEW_MARGIN = 0.8    # mplot3d leaves room around its axes box
+AXIS_LENGTH = 1.4
+
+
+class OceanCubeCanvas(QWidget):
+    """Software-rendered orientation cube."""
+
+    painted = pyqtSignal()   # after each repaint, i.e. when new data reached the screen
+
     def __init__(self, parent=None, w=5, h=5, dpi=100):
-        fig = Figure(figsize=(w, h), dpi=dpi, facecolor=COLOR_BG.name())
-        self.ax = fig.add_subplot(111, projection='3d', facecolor=COLOR_BG.name())
-        super().__init__(fig)
+        super().__init__(parent)
+        self._size_hint = QSize(int(w * dpi), int(h * dpi))
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
         self._build_geometry()
-        self.ax.set_xticks([]); self.ax.set_yticks([]); self.ax.set_zticks([])
-        self.ax.grid(False)
+        self._build_style()
+        self.R = np.eye(3)
+        self._project()
+
+    def sizeHint(self):
+        return self._size_hint
 
     def _build_geometry(self):
         self.verts = np.array([
             [-1,-1,-1],[ 1,-1,-1],[ 1, 1,-1],[-1, 1,-1],
             [-1,-1, 1],[ 1,-1, 1],[ 1, 1, 1],[-1, 1, 1]
-        ])
-        self.faces = [[0,1,2,3],[4,5,6,7],[0,1,5,4],
-                      [2,3,7,6],[1,2,6,5],[4,7,3,0]]
+        ], dtype=float)
+        self.faces = np.array([[0,1,2,3],[4,5,6,7],[0,1,5,4],
+                               [2,3,7,6],[1,2,6,5],[4,7,3,0]])
         self.edges = [(0,1),(1,2),(2,3),(3,0),
                       (4,5),(5,6),(6,7),(7,4),
                       (0,4),(1,5),(2,6),(3,7)]
+        # 8 cube vertices followed by the 3 body-axis tips
+        self.points = np.vstack([self.verts, np.eye(3) * AXIS_LENGTH])
+
+        # Camera basis: rows are screen-right, screen-up and towards-viewer
+        ce, se = np.cos(VIEW_ELEV), np.sin(VIEW_ELEV)
+        ca, sa = np.cos(VIEW_AZIM), np.sin(VIEW_AZIM)
+        self.view = np.array([
+            [-sa,      ca,      0 ],
+            [-se * ca, -se * sa, ce],
+            [ ce * ca,  ce * sa, se],
+        ])
+
+    def _build_style(self):
+        self.bg = QColor(COLOR_BG)
+        face = QColor(COLOR_PRIMARY); face.setAlphaF(0.25)
+        self.face_brush = QBrush(face)
+        self.edge_pen = QPen(QColor(COLOR_SECONDARY), 2)
+        self.axis_pens = [QPen(QColor(c), 2) for c in (Qt.red, Qt.green, Qt.blue)]
 
     def update_orientation(self, gx, gy, gz):
-        self.ax.cla()
         Rx = np.array([[1,0,0],[0,np.cos(gx),-np.sin(gx)],[0,np.sin(gx),np.cos(gx)]])
         Ry = np.array([[np.cos(gy),0,np.sin(gy)],[0,1,0],[-np.sin(gy),0,np.cos(gy)]])
         Rz = np.array([[np.cos(gz),-np.sin(gz),0],[np.sin(gz),np.cos(gz),0],[0,0,1]])
-        R  = Rz @ Ry @ Rx
-        vr = self.verts @ R.T
-        face_col = (*COLOR_PRIMARY.getRgbF()[:3], 0.25)
-        for f in self.faces:
-            poly = Poly3DCollection([vr[f]], facecolors=[face_col], edgecolors=[COLOR_SECONDARY.name()])
-            self.ax.add_collection3d(poly)
-        for i,j in self.edges:
-            self.ax.plot3D(*zip(vr[i], vr[j]), color=COLOR_SECONDARY.name(), lw=2)
-        for vec, clr in zip(R.T, ['r','g','b']):
-            self.ax.quiver(0,0,0, *(vec*1.4), arrow_length_ratio=0.15, color=clr)
-        self.ax.set_xlim(-2,2); self.ax.set_ylim(-2,2); self.ax.set_zlim(-2,2)
-        self.ax.view_init(elev=20, azim=0)
-        self.draw_idle()
+        self.set_rotation(Rz @ Ry @ Rx)
+
+    def set_rotation(self, R):
+        """Show the body frame rotated by the 3x3 matrix R (body -> world)."""
+        self.R = R
+        self._project()
+        self.update()  # Qt coalesces repeated requests into one paint
+
+    def _project(self):
+        # One multiply for all points: body -> world -> camera
+        self.cam = self.points @ (self.view @ self.R).T
+        face_depth = self.cam[self.faces, 2].mean(axis=1)
+        self.face_order = np.argsort(face_depth)  # far faces first
+
+    def paintEvent(self, event):
+        p = QPainter(self)
+        p.fillRect(self.rect(), self.bg)
+        p.setRenderHint(QPainter.Antialiasing)
+
+        scale = VIEW_MARGIN * min(self.width(), self.height()) / (2 * VIEW_LIMIT)
+        cx, cy = self.width() / 2, self.height() / 2
+        xy = self.cam[:, :2] * scale
+        pts = [QPointF(cx + x, cy - y) for x, y in xy]
+        origin = QPointF(cx, cy)
+
+        # Axes behind the cube are drawn first so the faces tint them
+        axis_depth = self.cam[8:, 2]
+        for idx in np.argsort(axis_depth):
+            if axis_depth[idx] < 0:
+                self._draw_axis(p, origin, pts[8 + idx], self.axis_pens[idx])
+
+        p.setPen(self.edge_pen)
+        p.setBrush(self.face_brush)
+        for f in self.face_order:
+            p.drawPolygon(QPolygonF([pts[k] for k in self.faces[f]]))
+
+        for idx in np.argsort(axis_depth):
+            if axis_depth[idx] >= 0:
+                self._draw_axis(p, origin, pts[8 + idx], self.axis_pens[idx])
+        p.end()
+        self.painted.emit()
+
+    @staticmethod
+    def _draw_axis(p, origin, tip, pen):
+        p.setPen(pen)
+        p.drawLine(origin, tip)
+        # Arrow head: 15% of the shaft, like quiver(arrow_length_ratio=0.15)
+        d = tip - origin
+        length = (d.x() ** 2 + d.y() ** 2) ** 0.5
+        if length < 1e-6:
+            return
+        ux, uy = d.x() / length, d.y() / length
+        h = 0.15 * length + 4
+        for sign in (1, -1):
+            wing = QPointF(tip.x() - h * (ux * 0.94 - sign * uy * 0.34),
+                           tip.y() - h * (uy * 0.94 + sign * ux * 0.34))
+            p.drawLine(tip, wing)
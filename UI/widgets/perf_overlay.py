@@ -0,0 +1,37 @@
+from PyQt5.QtWidgets import QLabel
+from PyQt5.QtCore import QTimer, Qt
+from PyQt5.QtGui import QFont
+from utils.profiler import profiler
+
+
+class PerfOverlay(QLabel):
+    """Semi-transparent table of per-stage timings drawn over its parent."""
+
+    def __init__(self, parent, interval_ms=500):
+        super().__init__(parent)
+        self.setFont(QFont("Monospace", 10))
+        self.setStyleSheet("background-color: rgba(0,0,0,190); color: #9f9; padding: 8px; border-radius: 6px;")
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.setTextFormat(Qt.PlainText)
+        self.timer = QTimer(self); self.timer.timeout.connect(self.refresh)
+        self.interval_ms = interval_ms
+        self.hide()
+
+    def toggle(self):
+        if self.isVisible():
+            self.timer.stop()
+            self.hide()
+        else:
+            self.refresh()
+            self.show()
+            self.raise_()
+            self.timer.start(self.interval_ms)
+
+    def refresh(self):
+        rows = [f"render {profiler.rate('frame'):5.1f} fps",
+                f"{'stage':<24}{'p50':>8}{'p95':>8}{'max':>8}  ms"]
+        for name, s in profiler.summary().items():
+            rows.append(f"{name:<24}{s['p50']:8.2f}{s['p95']:8.2f}{s['max']:8.2f}")
+        self.setText("\n".join(rows))
+        self.adjustSize()
+        self.move(self.parent().width() - self.width() - 10, 10)
@@ -56,6 +56,153 @@ int16_t gyroZ_offset = -0.2;
 #define PCLK_GPIO_NUM     22
 
 
+// --- Binary framing (host side: UI/utils/protocol.py) ---
+// sync A5 5A | type u8 | len u8 | seq u16 | payload | crc16 (CCITT-FALSE over type..payload)
+#define FRAME_TELEMETRY 0x01
+#define FRAME_TEXT      0x02
+#define FRAME_PHOTO_HEADER 0x10   // photo id u16, size u32, chunk size u16, chunk count u16
+#define FRAME_PHOTO_CHUNK  0x11   // photo id u16, chunk index u16, data
+
+#define PHOTO_CHUNK_SIZE   200
+#define PHOTO_HOLD_MS      30000  // keep an unacknowledged photo this long for retransmits
+#define FRAME_OVERHEAD     8      // sync, type, len, seq and crc around every payload
+#define TX_BUFFER_SIZE     1024   // photo chunks are queued here and never waited on
+
+bool binaryMode = false;   // switched by the host with "BIN" / "TXT"
+#define IMU_PERIOD_MS 10           // MPU6050 frames: 100 Hz
+#define ENV_PERIOD_MS 1000         // DS18B20, TDS and flex readings: 1 Hz
+#define SNAP_DELAY_MS 2000         // settle time between the SNAP reply and the capture
+bool snapPending = false;
+unsigned long snapAt = 0;
+uint16_t frameSeq = 0;
+
+struct __attribute__((packed)) TelemetryPayload {
+  uint32_t millis;
+  float temperatureC, tdsPpm, flexVoltage;
+  float gyroX, gyroY, gyroZ;
+  float accelX, accelY, accelZ;
+};
+
+uint16_t crc16Update(uint16_t crc, const uint8_t *data, size_t len) {
+  while (len--) {
+    crc ^= (uint16_t)(*data++) << 8;
+    for (int i = 0; i < 8; i++) {
+      crc = (crc & 0x8000) ? (crc << 1) ^ 0x1021 : crc << 1;
+    }
+  }
+  return crc;
+}
+
+void sendFrame(uint8_t type, const uint8_t *payload, uint8_t len) {
+  uint8_t header[6] = {0xA5, 0x5A, type, len, (uint8_t)(frameSeq & 0xFF), (uint8_t)(frameSeq >> 8)};
+  uint16_t crc = crc16Update(0xFFFF, header + 2, 4);
+  crc = crc16Update(crc, payload, len);
+  uint8_t trailer[2] = {(uint8_t)(crc & 0xFF), (uint8_t)(crc >> 8)};
+  Serial.write(header, sizeof(header));
+  Serial.write(payload, len);
+  Serial.write(trailer, sizeof(trailer));
+  frameSeq++;
+}
+
+// --- Chunked photo transfer (binary mode only) ---
+// The photo stays in the camera buffer until the host sends "PHOTO_ACK <id>";
+// "PHOTO_RESEND <id> <i> <j> ..." queues the listed chunks again.
+camera_fb_t *photoFb = NULL;
+uint16_t photoId = 0;
+uint16_t photoChunks = 0;
+uint8_t *photoPending = NULL;   // bitmap of chunks still to send
+uint16_t photoCursor = 0;
+unsigned long photoActivity = 0;
+
+void releasePhoto() {
+  if (photoFb) esp_camera_fb_return(photoFb);
+  free(photoPending);
+  photoFb = NULL;
+  photoPending = NULL;
+}
+
+void sendPhotoHeader() {
+  uint8_t p[10];
+  uint32_t size = photoFb->len;
+  uint16_t chunkSize = PHOTO_CHUNK_SIZE;
+  memcpy(p, &photoId, 2);
+  memcpy(p + 2, &size, 4);
+  memcpy(p + 6, &chunkSize, 2);
+  memcpy(p + 8, &photoChunks, 2);
+  sendFrame(FRAME_PHOTO_HEADER, p, sizeof(p));
+}
+
+void startPhotoTransfer(camera_fb_t *fb) {
+  releasePhoto();
+  photoFb = fb;
+  photoId++;
+  photoChunks = (fb->len + PHOTO_CHUNK_SIZE - 1) / PHOTO_CHUNK_SIZE;
+  photoPending = (uint8_t*)malloc((photoChunks + 7) / 8);
+  memset(photoPending, 0xFF, (photoChunks + 7) / 8);
+  photoCursor = 0;
+  photoActivity = millis();
+  sendPhotoHeader();
+}
+
+// A chunk is only sent when the TX buffer takes it, and the next IMU frame,
+// without blocking: the UART drains it while the loop carries on sampling.
+bool photoFits() {
+  return Serial.availableForWrite() >=
+         (int)(2 * FRAME_OVERHEAD + 4 + PHOTO_CHUNK_SIZE + sizeof(TelemetryPayload));
+}
+
+// Send the next pending chunk, if any. Returns true when something was sent.
+bool pumpPhoto() {
+  if (!photoFb) return false;
+  if (millis() - photoActivity > PHOTO_HOLD_MS) {
+    releasePhoto();  // host went away
+    return false;
+  }
+  for (uint16_t n = 0; n < photoChunks; n++) {
+    uint16_t i = (photoCursor + n) % photoChunks;
+    if (photoPending[i / 8] & (1 << (i % 8))) {
+      uint8_t p[4 + PHOTO_CHUNK_SIZE];
+      size_t offset = (size_t)i * PHOTO_CHUNK_SIZE;
+      size_t len = min((size_t)PHOTO_CHUNK_SIZE, photoFb->len - offset);
+      memcpy(p, &photoId, 2);
+      memcpy(p + 2, &i, 2);
+      memcpy(p + 4, photoFb->buf + offset, len);
+      sendFrame(FRAME_PHOTO_CHUNK, p, 4 + len);
+      photoPending[i / 8] &= ~(1 << (i % 8));
+      photoCursor = i + 1;
+      return true;
+    }
+  }
+  return false;
+}
+
+void handlePhotoResend(String args) {
+  // args: "<id> <i> <j> ..."
+  int space = args.indexOf(' ');
+  if (!photoFb || args.substring(0, space).toInt() != photoId) return;
+  photoActivity = millis();
+  if (space < 0) {
+    sendPhotoHeader();  // no indices: the header itself was lost
+    return;
+  }
+  while (space >= 0) {
+    int next = args.indexOf(' ', space + 1);
+    int i = args.substring(space + 1, next < 0 ? args.length() : next).toInt();
+    if (i >= 0 && i < photoChunks) photoPending[i / 8] |= 1 << (i % 8);
+    space = next;
+  }
+}
+
+// Text replies: plain lines in text mode, FRAME_TEXT frames in binary mode
+void sendText(const String &text) {
+  if (binaryMode) {
+    sendFrame(FRAME_TEXT, (const uint8_t*)text.c_str(), min((unsigned int)text.length(), 255u));
+  } else {
+    Serial.println(text);
+  }
+}
+
+
 void initCamera() {
   camera_config_t config;
   config.ledc_channel = LEDC_CHANNEL_0;
@@ -97,6 +244,7 @@ void initCamera() {
 
 
 void setup() {
+  Serial.setTxBufferSize(TX_BUFFER_SIZE);  // must come before begin()
   Serial.begin(115200);
   delay(1000);
 
@@ -104,6 +252,8 @@ void setup() {
 
   Serial.println("Initializing DS18B20 sensor...");
   sensors.begin();
+  sensors.setWaitForConversion(false);  // requestTemperatures() must not block the 100 Hz IMU loop
+  sensors.requestTemperatures();
 
   // Attach the servo to the correct pin
   myServo.attach(SERVO_PIN);
@@ -125,33 +275,26 @@ void setup() {
   Serial.println("Ready"); // Send "Ready" to indicate Arduino is ready
 }
 
-void loop() {
-  
-  if (Serial.available()) {
-    // Handle some serial input for disengaging or other actions
-    String input = Serial.readStringUntil('\n');
-    input.trim();
-    if (input == "SNAP") {
-      Serial.println("SNAP command received, taking photo...");
-      delay(2000);
-
-      // Take a photo when the SNAP command is received
-      camera_fb_t *fb = esp_camera_fb_get();
-      if (!fb) {
-        Serial.println("Camera capture failed");
-        return;
-      }
-
-      // Send photo size first
-      Serial.println("PHOTO_START");
-
-      // Send the photo data over serial
-      Serial.write((const uint8_t*)fb->buf, fb->len);
-
-      Serial.println("\nPHOTO_END");
-
-      // Return the frame buffer to free memory
-      esp_camera_fb_return(fb);
+void handleCommand(String input) {
+    if (input == "BIN") {
+      Serial.println("BIN_OK");  // last text line; everything after this is framed
+      binaryMode = true;
+    }
+    else if (input == "TXT") {
+      sendText("TXT_OK");
+      binaryMode = false;
+    }
+    else if (input == "SNAP") {
+      // Acknowledge now, capture later from pollSerial(): telemetry and commands keep flowing
+      sendText("SNAP command received, taking photo...");
+      snapPending = true;
+      snapAt = millis() + SNAP_DELAY_MS;
+    }
+    else if (input.startsWith("PHOTO_RESEND ")) {
+      handlePhotoResend(input.substring(13));
+    }
+    else if (input.startsWith("PHOTO_ACK ")) {
+      if (input.substring(10).toInt() == photoId) releasePhoto();
     }
     // Command to turn the servo left by 15 degrees
     else if (input == "LEFT") {
@@ -159,8 +302,7 @@ void loop() {
       int newAngle = currentAngle - 15;
       if (newAngle < 0) newAngle = 0;  // Ensure the servo doesn't rotate beyond its limits
       myServo.write(newAngle);
-      Serial.print("Servo turned left to: ");
-      Serial.println(newAngle);
+      sendText("Servo turned left to: " + String(newAngle));
     }
 
     // Command to turn the servo right by 15 degrees
@@ -169,23 +311,76 @@ void loop() {
       int newAngle = currentAngle + 15;
       if (newAngle > 180) newAngle = 180;  // Ensure the servo doesn't rotate beyond its limits
       myServo.write(newAngle);
-      Serial.print("Servo turned right to: ");
-      Serial.println(newAngle);
+      sendText("Servo turned right to: " + String(newAngle));
     }
+}
+
+void takePhoto() {
+  camera_fb_t *fb = esp_camera_fb_get();
+  if (!fb) {
+    sendText("Camera capture failed");
+    return;
+  }
+
+  if (binaryMode) {
+    // Chunks are streamed between telemetry frames by pumpPhoto()
+    startPhotoTransfer(fb);
+    return;
+  }
+
+  // Send photo size first
+  sendText("PHOTO_START");
+
+  // Send the photo data over serial
+  Serial.write((const uint8_t*)fb->buf, fb->len);
+
+  Serial.println("\nPHOTO_END");
+
+  // Return the frame buffer to free memory
+  esp_camera_fb_return(fb);
+}
+
+void pollSerial() {
+  if (snapPending && (long)(millis() - snapAt) >= 0) {
+    snapPending = false;
+    takePhoto();
   }
+  if (Serial.available()) {
+    // Handle some serial input for disengaging or other actions
+    String input = Serial.readStringUntil('\n');
+    input.trim();
+    handleCommand(input);
+  }
+}
 
-  sensors.requestTemperatures();  // Request temperature readings
-  float tempC = sensors.getTempCByIndex(0);  // Read temperature from the first sensor
+// Sensor readings. The IMU is sampled every IMU_PERIOD_MS; the DS18B20 needs
+// 750 ms per conversion, so it is started without waiting and read (with TDS
+// and flex) every ENV_PERIOD_MS. Frames carry NaN for the environment values
+// between those readings, and text mode only prints them when they are new.
+float tempC = NAN, tdsValue = NAN, flex_voltage = NAN;
+int tdsADC = 0;
+float voltage = 0, flex = 0;
+bool envFresh = false;
+unsigned long envAt = 0;
+unsigned long imuAt = 0;
+bool photoSlot = false;   // one photo chunk may follow each IMU frame
+
+void readEnv() {
+  tempC = sensors.getTempCByIndex(0);  // conversion started ENV_PERIOD_MS ago
+  sensors.requestTemperatures();       // returns at once: setWaitForConversion(false)
 
   // --- TDS Reading ---
-  int tdsADC = analogRead(TDS_PIN);         // Raw analog reading (0–4095 on ESP32)
-  float voltage = tdsADC * (3.3 / 4095.0); // Convert to voltage
-  float tdsValue = (133.42 * voltage * voltage * voltage - 255.86 * voltage * voltage + 857.39 * voltage) * 0.5;
+  tdsADC = analogRead(TDS_PIN);         // Raw analog reading (0–4095 on ESP32)
+  voltage = tdsADC * (3.3 / 4095.0); // Convert to voltage
+  tdsValue = (133.42 * voltage * voltage * voltage - 255.86 * voltage * voltage + 857.39 * voltage) * 0.5;
 
   // --- Flex Sensor Reading ---
-  float flex = analogRead(FLEX_PIN);
-  float flex_voltage = flex * (3.3 / 4095.0); // Convert flex value to voltage
+  flex = analogRead(FLEX_PIN);
+  flex_voltage = flex * (3.3 / 4095.0); // Convert flex value to voltage
+  envFresh = true;
+}
 
+void sendImu() {
   // --- MPU6050 Reading ---
   // Get raw accelerometer and gyroscope values
   int16_t ax, ay, az;
@@ -204,20 +399,34 @@ void loop() {
   float gyroY = gy / 131.0 - gyroY_offset;
   float gyroZ = gz / 131.0 - gyroZ_offset;
 
+  if (binaryMode) {
+    TelemetryPayload p = {
+      millis(),
+      envFresh ? tempC : NAN, envFresh ? tdsValue : NAN, envFresh ? flex_voltage : NAN,
+      gyroX, gyroY, gyroZ,
+      accelX, accelY, accelZ,
+    };
+    sendFrame(FRAME_TELEMETRY, (const uint8_t*)&p, sizeof(p));
+    envFresh = false;
+    return;
+  }
+
   // Print the data in a comma-separated format, include a label
-  Serial.print("Temperature_C:");
-  Serial.println(tempC);
-  Serial.print("TDS_ADC:");
-  Serial.println(tdsADC);
-  Serial.print("Voltage:");
-  Serial.println(voltage, 2);
-  Serial.print("TDS_ppm:");
-  Serial.println(tdsValue, 2);
-  Serial.print("Flex Value:");
-  Serial.println(flex);
-  Serial.print("Flex Voltage:");
-  Serial.println(flex_voltage, 2);
-  
+  if (envFresh) {
+    Serial.print("Temperature_C:");
+    Serial.println(tempC);
+    Serial.print("TDS_ADC:");
+    Serial.println(tdsADC);
+    Serial.print("Voltage:");
+    Serial.println(voltage, 2);
+    Serial.print("TDS_ppm:");
+    Serial.println(tdsValue, 2);
+    Serial.print("Flex Value:");
+    Serial.println(flex);
+    Serial.print("Flex Voltage:");
+    Serial.println(flex_voltage, 2);
+    envFresh = false;
+  }
 
   // Print MPU6050 data (acceleration and gyroscope)
   Serial.print("AccelX:");
@@ -234,6 +443,24 @@ void loop() {
   Serial.println(gyroY, 2);
   Serial.print("GyroZ:");
   Serial.println(gyroZ, 2);
+}
+
+void loop() {
 
-  delay(500);  // Wait 500 milliseconds between readings
+  pollSerial();
+
+  unsigned long now = millis();
+  if (now - envAt >= ENV_PERIOD_MS) {
+    envAt = now;
+    readEnv();
+  }
+  if (now - imuAt >= IMU_PERIOD_MS) {
+    imuAt = now;
+    sendImu();
+    photoSlot = true;
+  } else if (photoSlot && photoFits() && pumpPhoto()) {
+    photoSlot = false;  // at most one chunk per IMU tick, so the IMU keeps its rate
+  } else {
+    delay(1);
+  }
 }